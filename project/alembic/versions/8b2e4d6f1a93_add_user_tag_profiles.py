@@ -0,0 +1,42 @@
+"""add user_profiles and user_tag_weights
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3f9a1c2d7b40
+Create Date: 2026-10-16 22:35:49
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1a93'
+down_revision = '3f9a1c2d7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_profiles',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('weights_key', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    # Profiles are read and rebuilt per user; the (user_id, tag_id) primary key serves both
+    op.create_table(
+        'user_tag_weights',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'tag_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_tag_weights')
+    op.drop_table('user_profiles')
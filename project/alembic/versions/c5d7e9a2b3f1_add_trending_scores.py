@@ -0,0 +1,42 @@
+"""add trending_scores
+
+Revision ID: c5d7e9a2b3f1
+Revises: 8b2e4d6f1a93
+Create Date: 2026-10-16 22:57:34
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d7e9a2b3f1'
+down_revision = '8b2e4d6f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'trending_scores',
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('listed', sa.Boolean(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.PrimaryKeyConstraint('post_id'),
+    )
+    # Keyset pages of /trending walk these in (score, post_id) order; the window
+    # on created_at is filtered along the walk
+    op.create_index('ix_trending_scores_rank', 'trending_scores', ['listed', 'score', 'post_id'], unique=False)
+    op.create_index(
+        'ix_trending_scores_category_rank', 'trending_scores',
+        ['category', 'listed', 'score', 'post_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trending_scores_category_rank', table_name='trending_scores')
+    op.drop_index('ix_trending_scores_rank', table_name='trending_scores')
+    op.drop_table('trending_scores')
@@ -0,0 +1,222 @@
+"""
+Result cache for feed endpoints.
+
+Two tiers: an in-process LRU in front of an optional shared store that speaks
+the Redis protocol (anything with redis-py's get/set/incr works, so tests can
+plug in a local stand-in). Entries are keyed by user, endpoint parameters and
+the user's cache generation; writing an interaction bumps the generation, which
+makes every cached feed of that user unreachable at once. Entries past
+CACHE_TTL are still served for CACHE_STALE_TTL seconds while a background
+refresh recomputes them.
+
+With the "local" backend, generations live in this process only, and
+interactions are written by other processes (the collection scripts), whose
+invalidations never reach this one. Entries are then kept for at most
+CACHE_LOCAL_TTL fresh plus CACHE_LOCAL_TTL stale, which bounds how long a feed
+can miss new interactions. Use the "redis" backend to share entries and
+invalidations across processes and keep the full CACHE_TTL.
+"""
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "feed"
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class RedisTier:
+    """
+    Shared tier over a Redis-protocol client. Errors are logged and treated as
+    misses; after one, the tier is skipped for ``retry_after`` seconds so a
+    down server does not add a timeout to every request.
+    """
+
+    def __init__(self, client, retry_after: float = 30.0):
+        self.client = client
+        self.retry_after = retry_after
+        self._down_until = 0.0
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisTier":
+        import redis  # optional dependency, only needed for the redis backend
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _call(self, method: str, *args, **kwargs):
+        if not self.available:
+            return None
+        try:
+            return getattr(self.client, method)(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Cache store unavailable ({method}): {e}")
+            self._down_until = time.monotonic() + self.retry_after
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call("get", key)
+
+    def set(self, key: str, value: str, ttl: int):
+        self._call("set", key, value, ex=ttl)
+
+    def generation(self, key: str) -> Optional[int]:
+        value = self._call("get", key)
+        if value is None:
+            return 0 if self.available else None
+        return int(value)
+
+    def incr(self, key: str):
+        self._call("incr", key)
+
+class ResultCache:
+    """LRU + optional shared tier with per-user invalidation and stale-while-revalidate."""
+
+    def __init__(
+        self,
+        ttl: int,
+        stale_ttl: int = 0,
+        local_size: int = 10000,
+        shared: Optional[RedisTier] = None,
+        refresh_workers: int = 2,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local = LRUCache(local_size)
+        self.shared = shared
+        self._generations: Dict[Any, int] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+
+    def generation(self, user: Any) -> int:
+        if user is None:
+            return 0
+        if self.shared is not None:
+            generation = self.shared.generation(f"{KEY_PREFIX}:gen:{user}")
+            if generation is not None:
+                return generation
+        # Local generations also cover the time the shared store is down
+        return self._generations.get(user, 0)
+
+    def invalidate_user(self, user: Any):
+        """Drop every cached result of ``user`` by moving it to a new generation."""
+        with self._lock:
+            self._generations[user] = self._generations.get(user, 0) + 1
+        if self.shared is not None:
+            self.shared.incr(f"{KEY_PREFIX}:gen:{user}")
+
+    def key(self, user: Any, params: Tuple) -> str:
+        return f"{KEY_PREFIX}:{user}:{self.generation(user)}:{json.dumps(params)}"
+
+    def get_or_compute(self, user: Any, params: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Cached result of ``compute()`` for ``user`` and ``params``. Results for
+        ``user=None`` are shared by everyone and never invalidated.
+        """
+        key = self.key(user, params)
+        entry = self._lookup(key)
+        now = time.time()
+        if entry is not None:
+            if now >= entry["stale"]:
+                entry = None
+            elif now >= entry["fresh"]:
+                self._revalidate(key, compute)
+        if entry is not None:
+            return entry["value"]
+        value = compute()
+        self._store(key, value)
+        return value
+
+    def clear(self):
+        self.local.clear()
+        with self._lock:
+            self._generations.clear()
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.local.get(key)
+        if entry is None and self.shared is not None:
+            raw = self.shared.get(key)
+            if raw is not None:
+                entry = json.loads(raw)
+                self.local.set(key, entry)
+        return entry
+
+    def _store(self, key: str, value: Any):
+        now = time.time()
+        entry = {"value": value, "fresh": now + self.ttl, "stale": now + self.ttl + self.stale_ttl}
+        self.local.set(key, entry)
+        if self.shared is not None:
+            self.shared.set(key, json.dumps(entry), self.ttl + self.stale_ttl)
+
+    def _revalidate(self, key: str, compute: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, compute())
+            except Exception as e:
+                logger.error(f"Error refreshing cached result {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+def build_cache() -> ResultCache:
+    shared = None
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            shared = RedisTier.from_url(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the redis package is not installed; using the local cache only")
+    ttl, stale_ttl = settings.CACHE_TTL, settings.CACHE_STALE_TTL
+    if shared is None:
+        # Invalidations from other processes cannot reach a local-only cache
+        ttl, stale_ttl = min(ttl, settings.CACHE_LOCAL_TTL), min(stale_ttl, settings.CACHE_LOCAL_TTL)
+    return ResultCache(
+        ttl=ttl,
+        stale_ttl=stale_ttl,
+        local_size=settings.CACHE_LOCAL_SIZE,
+        shared=shared,
+    )
+
+feed_cache = build_cache()
@@ -0,0 +1,499 @@
+import os, json, time, threading
+from collections import defaultdict
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Set
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, exists
+from app.database import models
+
+# Full reload picks up counter changes on existing rows; in between we only
+# poll for newly inserted posts.
+CATALOG_TTL_SECONDS = float(os.getenv("CATALOG_TTL_SECONDS", "300"))
+CATALOG_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", "5"))
+# Filter bitsets kept per snapshot; oldest are evicted first
+BITMAP_CACHE_SIZE = int(os.getenv("CATALOG_BITMAP_CACHE_SIZE", "256"))
+# Tags with the most posts get a precomputed cold-start ranking
+POPULAR_TAG_RANKINGS = int(os.getenv("CATALOG_POPULAR_TAG_RANKINGS", "200"))
+
+POST_COLUMNS = (
+    models.Post.id,
+    models.Post.title,
+    models.Post.slug,
+    models.Post.view_count,
+    models.Post.upvote_count,
+    models.Post.bookmark_count,
+    models.Post.average_rating,
+    models.Post.project_code,
+    models.Post.video_link,
+    models.Post.thumbnail_url,
+    models.Post.category,
+    models.Post.topic,
+)
+
+class Vocabulary:
+    """Interns normalized strings to dense integer ids."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._ids[value] = idx
+            self.values.append(value)
+        return idx
+
+    def get(self, value: str) -> int:
+        return self._ids.get(value, -1)
+
+def normalize_tags(tags) -> Set[str]:
+    if not tags:
+        return set()
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except Exception:
+            tags = [t.strip() for t in tags.split(",") if t.strip()]
+    return {str(t).strip().lower() for t in tags if t is not None}
+
+def sync_post_tags(db: Session, posts: Iterable[models.Post]):
+    """
+    Persist the normalized tags of ``posts`` to the tags/post_tags side tables
+    so readers never reparse Post.tags. Flushes but does not commit.
+    """
+    db.flush()
+    normalized = {p.id: normalize_tags(p.tags) for p in posts}
+    if not normalized:
+        return
+    names = set().union(*normalized.values())
+    tag_ids: Dict[str, int] = {}
+    for chunk in chunked(sorted(names)):
+        tag_ids.update(db.execute(
+            select(models.Tag.name, models.Tag.id).where(models.Tag.name.in_(chunk))
+        ).all())
+    missing = [models.Tag(name=name) for name in names if name not in tag_ids]
+    if missing:
+        db.add_all(missing)
+        db.flush()
+        tag_ids.update((t.name, t.id) for t in missing)
+    for chunk in chunked(list(normalized)):
+        db.execute(delete(models.PostTag).where(models.PostTag.post_id.in_(chunk)))
+    db.add_all(
+        models.PostTag(post_id=post_id, tag_id=tag_ids[name])
+        for post_id, tag_names in normalized.items() for name in tag_names
+    )
+    db.flush()
+
+def load_post_tags(db: Session, after_id: int = 0) -> Dict[int, Set[str]]:
+    """
+    Normalized tags of every post with id > ``after_id``, read from post_tags.
+    Posts that were never synced fall back to parsing Post.tags.
+    """
+    tags: Dict[int, Set[str]] = defaultdict(set)
+    rows = db.execute(
+        select(models.PostTag.post_id, models.Tag.name)
+        .join(models.Tag, models.Tag.id == models.PostTag.tag_id)
+        .where(models.PostTag.post_id > after_id)
+    ).all()
+    for post_id, name in rows:
+        tags[post_id].add(name)
+    unsynced = db.execute(
+        select(models.Post.id, models.Post.tags).where(
+            models.Post.id > after_id,
+            ~exists().where(models.PostTag.post_id == models.Post.id),
+        )
+    ).all()
+    for post_id, raw in unsynced:
+        tags[post_id] = normalize_tags(raw)
+    return tags
+
+def chunked(values: List[Any], size: int = 500):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def category_name(category) -> str:
+    if isinstance(category, dict):
+        return (category.get("name", "") or "").strip().lower()
+    if isinstance(category, str):
+        return category.strip().lower()
+    return ""
+
+def popularity(view_count: np.ndarray, upvote_count: np.ndarray, bookmark_count: np.ndarray) -> np.ndarray:
+    """Vectorized form of recommend.popularity_score_for_post."""
+    pop = view_count + 2 * upvote_count + 3 * bookmark_count
+    return np.where(pop > 0, np.log1p(np.maximum(pop, 0)), 0.0)
+
+class PostCatalog:
+    """
+    Columnar snapshot of the posts table.
+
+    Counters and popularity live in NumPy arrays indexed by catalog position;
+    tags, category names and project codes are interned to integer ids. The
+    response fields of each post are kept as a plain dict so feeds never need
+    to materialize ORM objects. A published snapshot is never mutated: updates
+    are applied to a copy which then replaces it (see ``upsert_posts``).
+    """
+
+    def __init__(self):
+        self.tags = Vocabulary()
+        self.categories = Vocabulary()
+        self.project_codes = Vocabulary()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.view_count = np.empty(0, dtype=np.int64)
+        self.upvote_count = np.empty(0, dtype=np.int64)
+        self.bookmark_count = np.empty(0, dtype=np.int64)
+        self.popularity = np.empty(0, dtype=np.float64)
+        self.category_ids = np.empty(0, dtype=np.int32)
+        self.project_code_ids = np.empty(0, dtype=np.int32)
+        self.post_tag_ids: List[np.ndarray] = []
+        # Inverted index: tag id -> sorted positions of posts carrying it
+        self.postings: Dict[int, np.ndarray] = {}
+        self._popularity_order: Optional[np.ndarray] = None
+        self._popularity_rank: Optional[np.ndarray] = None
+        self._rankings: Optional[Dict[tuple, np.ndarray]] = None
+        self._tag_matrix: Optional[csr_matrix] = None
+        self._bitmaps: Dict[tuple, np.ndarray] = {}
+        self.records: List[Dict[str, Any]] = []
+        self._pos_by_id: Dict[int, int] = {}
+        self.max_id = 0
+        self.loaded_at: Optional[float] = None
+        self.polled_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, post_id: int) -> int:
+        return self._pos_by_id.get(post_id, -1)
+
+    @classmethod
+    def load(cls, db: Session) -> "PostCatalog":
+        catalog = cls()
+        catalog._apply(_with_tags(db, db.execute(select(*POST_COLUMNS).order_by(models.Post.id)).all()))
+        catalog.loaded_at = catalog.polled_at = time.monotonic()
+        return catalog
+
+    def copy(self) -> "PostCatalog":
+        # Vocabularies are append-only, so copies share them.
+        other = PostCatalog.__new__(PostCatalog)
+        other.__dict__.update(self.__dict__)
+        for name in ("ids", "view_count", "upvote_count", "bookmark_count",
+                     "popularity", "category_ids", "project_code_ids"):
+            setattr(other, name, getattr(self, name).copy())
+        other.post_tag_ids = list(self.post_tag_ids)
+        other.postings = dict(self.postings)
+        other.records = list(self.records)
+        other._pos_by_id = dict(self._pos_by_id)
+        other._bitmaps = {}
+        return other
+
+    def tag_candidates(self, tag_ids: Iterable[int]) -> np.ndarray:
+        """Sorted union of the posting lists of ``tag_ids``."""
+        lists = [self.postings[t] for t in tag_ids if t in self.postings]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(lists))
+
+    def tag_matrix(self) -> csr_matrix:
+        """Binary post x tag CSR matrix, rows in catalog order."""
+        if self._tag_matrix is None:
+            lengths = np.fromiter((len(t) for t in self.post_tag_ids), dtype=np.int64, count=len(self.post_tag_ids))
+            indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=indptr[1:])
+            indices = np.concatenate(self.post_tag_ids) if self.post_tag_ids else np.empty(0, dtype=np.int32)
+            self._tag_matrix = csr_matrix(
+                (np.ones(len(indices)), indices, indptr), shape=(len(lengths), len(self.tags))
+            )
+        return self._tag_matrix
+
+    def seen_vector(self, seen_counts: Dict[int, int]) -> np.ndarray:
+        """Per-position interaction counts from a post id -> count mapping."""
+        seen = np.zeros(len(self), dtype=np.float64)
+        for post_id, count in seen_counts.items():
+            pos = self._pos_by_id.get(post_id)
+            if pos is not None:
+                seen[pos] = count
+        return seen
+
+    def bitmap(self, field: str, value: str) -> np.ndarray:
+        """
+        Packed bitset (np.packbits) over catalog positions of the posts whose
+        ``field`` -- "category", "tag" or "project_code" -- equals the
+        normalized ``value``.
+        """
+        key = (field, value)
+        bits = self._bitmaps.get(key)
+        if bits is None:
+            if field == "category":
+                mask = self.category_ids == self.categories.get(value)
+            elif field == "project_code":
+                mask = self.project_code_ids == self.project_codes.get(value)
+            elif field == "tag":
+                mask = np.zeros(len(self), dtype=bool)
+                postings = self.postings.get(self.tags.get(value))
+                if postings is not None:
+                    mask[postings] = True
+            else:
+                raise ValueError(f"Unknown filter field: {field}")
+            bits = np.packbits(mask)
+            if len(self._bitmaps) >= BITMAP_CACHE_SIZE:
+                self._bitmaps.pop(next(iter(self._bitmaps)), None)
+            self._bitmaps[key] = bits
+        return bits
+
+    def filter_positions(self, filters: Dict[str, str]) -> np.ndarray:
+        """Positions matching every ``field -> value`` filter: an AND of bitsets."""
+        bits = None
+        for field, value in filters.items():
+            other = self.bitmap(field, value)
+            bits = other if bits is None else bits & other
+        if bits is None:
+            return np.arange(len(self))
+        return np.flatnonzero(np.unpackbits(bits, count=len(self)))
+
+    def popularity_order(self) -> np.ndarray:
+        """Positions by descending popularity, ties by ascending post id."""
+        if self._popularity_order is None:
+            self._popularity_order = np.lexsort((self.ids, -self.popularity))
+        return self._popularity_order
+
+    def popularity_rank(self) -> np.ndarray:
+        """Rank of each position in ``popularity_order``."""
+        if self._popularity_rank is None:
+            rank = np.empty(len(self), dtype=np.int64)
+            rank[self.popularity_order()] = np.arange(len(self))
+            self._popularity_rank = rank
+        return self._popularity_rank
+
+    def popularity_rankings(self) -> Dict[tuple, np.ndarray]:
+        """
+        Precomputed cold-start rankings keyed by (field, vocabulary id): the
+        positions of every category, every project code and the
+        POPULAR_TAG_RANKINGS largest tags in ``popularity_order``. Built once
+        per snapshot.
+        """
+        if self._rankings is None:
+            order = self.popularity_order()
+            rankings: Dict[tuple, np.ndarray] = {}
+            for field, values in (("category", self.category_ids), ("project_code", self.project_code_ids)):
+                # A stable sort by value keeps each group in popularity order
+                grouped = order[np.argsort(values[order], kind="stable")]
+                keys, starts = np.unique(values[grouped], return_index=True)
+                for key, group in zip(keys.tolist(), np.split(grouped, starts[1:])):
+                    rankings[(field, key)] = group
+            largest = sorted(self.postings, key=lambda t: len(self.postings[t]), reverse=True)
+            for t in largest[:POPULAR_TAG_RANKINGS]:
+                rankings[("tag", t)] = self._rank_positions(self.postings[t])
+            self._rankings = rankings
+        return self._rankings
+
+    def popularity_ranking(self, field: str, value: str) -> np.ndarray:
+        """Positions whose ``field`` equals the normalized ``value``, most popular first."""
+        vocabulary = {"category": self.categories, "project_code": self.project_codes, "tag": self.tags}.get(field)
+        if vocabulary is None:
+            raise ValueError(f"Unknown filter field: {field}")
+        value_id = vocabulary.get(value)
+        ranking = self.popularity_rankings().get((field, value_id))
+        if ranking is None:
+            postings = self.postings.get(value_id) if field == "tag" else None
+            if postings is None:
+                return np.empty(0, dtype=np.int64)
+            ranking = self._rank_positions(postings)
+        return ranking
+
+    def popular_positions(self, filters: Dict[str, str], top_k: int) -> np.ndarray:
+        """
+        The ``top_k`` most popular positions matching every filter, sliced from
+        the precomputed rankings; further filters are applied as bitsets to
+        the shortest ranking.
+        """
+        if not filters:
+            return self.popularity_order()[:top_k]
+        rankings = sorted(
+            ((self.popularity_ranking(field, value), field, value) for field, value in filters.items()),
+            key=lambda r: len(r[0]),
+        )
+        ranking = rankings[0][0]
+        if len(rankings) > 1 and len(ranking):
+            others = self.filter_positions({field: value for _, field, value in rankings[1:]})
+            mask = np.zeros(len(self), dtype=bool)
+            mask[others] = True
+            ranking = ranking[mask[ranking]]
+        return ranking[:top_k]
+
+    def _rank_positions(self, positions: np.ndarray) -> np.ndarray:
+        return positions[np.argsort(self.popularity_rank()[positions], kind="stable")]
+
+    def result(self, pos: int, score: float) -> Dict[str, Any]:
+        """Feed response dict for the post at ``pos``."""
+        record = self.records[pos]
+        out = {k: record[k] for k in ("post_id", "title", "slug")}
+        out["score"] = round(float(score), 4)
+        out.update((k, v) for k, v in record.items() if k not in out)
+        out["tags"] = list(record["tags"])
+        return out
+
+    def _apply(self, rows: Sequence[Sequence[Any]]):
+        """
+        Insert or update posts given tuples in POST_COLUMNS order followed by
+        the post's normalized tag names.
+        """
+        n = len(self.ids)
+        new_ids, new_views, new_upvotes, new_bookmarks = [], [], [], []
+        new_cats, new_pcs = [], []
+        touched = []
+        added: Dict[int, List[int]] = defaultdict(list)
+        removed: Dict[int, List[int]] = defaultdict(list)
+        for (post_id, title, slug, views, upvotes, bookmarks, avg_rating,
+             project_code, video_link, thumbnail_url, category, topic, tags) in rows:
+            if post_id is None:
+                continue
+            record = {
+                "post_id": post_id,
+                "title": title,
+                "slug": slug,
+                "tags": sorted(tags),
+                "view_count": views,
+                "upvote_count": upvotes,
+                "bookmark_count": bookmarks,
+                "average_rating": avg_rating,
+                "project_code": project_code,
+                "video_link": video_link,
+                "thumbnail_url": thumbnail_url,
+                "category": category,
+                "topic": topic,
+            }
+            tag_ids = np.array(sorted(self.tags.intern(t) for t in tags), dtype=np.int32)
+            cat_id = self.categories.intern(category_name(category))
+            pc_id = self.project_codes.intern((project_code or "").strip().lower())
+
+            pos = self._pos_by_id.get(post_id)
+            if pos is None:
+                pos = n + len(new_ids)
+                self._pos_by_id[post_id] = pos
+                for t in tag_ids.tolist():
+                    added[t].append(pos)
+                self.records.append(record)
+                self.post_tag_ids.append(tag_ids)
+                new_ids.append(post_id)
+                new_views.append(views or 0)
+                new_upvotes.append(upvotes or 0)
+                new_bookmarks.append(bookmarks or 0)
+                new_cats.append(cat_id)
+                new_pcs.append(pc_id)
+            else:
+                old = set(self.post_tag_ids[pos].tolist())
+                new = set(tag_ids.tolist())
+                for t in new - old:
+                    added[t].append(pos)
+                for t in old - new:
+                    removed[t].append(pos)
+                self.records[pos] = record
+                self.post_tag_ids[pos] = tag_ids
+                self.view_count[pos] = views or 0
+                self.upvote_count[pos] = upvotes or 0
+                self.bookmark_count[pos] = bookmarks or 0
+                self.category_ids[pos] = cat_id
+                self.project_code_ids[pos] = pc_id
+                touched.append(pos)
+            self.max_id = max(self.max_id, post_id)
+
+        for t in set(added) | set(removed):
+            postings = self.postings.get(t)
+            if t in removed:
+                postings = np.setdiff1d(postings, removed[t], assume_unique=True)
+            if t in added:
+                fresh = np.array(sorted(added[t]), dtype=np.int64)
+                postings = fresh if postings is None else np.union1d(postings, fresh)
+            self.postings[t] = postings
+        self._popularity_order = None
+        self._popularity_rank = None
+        self._rankings = None
+        self._tag_matrix = None
+        self._bitmaps = {}
+        if touched:
+            idx = np.array(touched, dtype=np.int64)
+            self.popularity[idx] = popularity(
+                self.view_count[idx], self.upvote_count[idx], self.bookmark_count[idx]
+            )
+        if new_ids:
+            views = np.array(new_views, dtype=np.int64)
+            upvotes = np.array(new_upvotes, dtype=np.int64)
+            bookmarks = np.array(new_bookmarks, dtype=np.int64)
+            self.ids = np.concatenate([self.ids, np.array(new_ids, dtype=np.int64)])
+            self.view_count = np.concatenate([self.view_count, views])
+            self.upvote_count = np.concatenate([self.upvote_count, upvotes])
+            self.bookmark_count = np.concatenate([self.bookmark_count, bookmarks])
+            self.popularity = np.concatenate([self.popularity, popularity(views, upvotes, bookmarks)])
+            self.category_ids = np.concatenate([self.category_ids, np.array(new_cats, dtype=np.int32)])
+            self.project_code_ids = np.concatenate([self.project_code_ids, np.array(new_pcs, dtype=np.int32)])
+
+def _with_tags(db: Session, rows: Sequence[Sequence[Any]], after_id: int = 0) -> List[tuple]:
+    tags = load_post_tags(db, after_id)
+    return [(*row, tags.get(row[0], ())) for row in rows]
+
+_catalog = PostCatalog()
+_catalog_lock = threading.Lock()
+
+def get_catalog(db: Session, force: bool = False) -> PostCatalog:
+    """
+    Process-wide catalog snapshot. Reloaded in full once older than
+    CATALOG_TTL_SECONDS; in between, new posts are polled every
+    CATALOG_POLL_SECONDS. Callers keep a consistent view for as long as they
+    hold the returned object.
+    """
+    global _catalog
+    now = time.monotonic()
+    catalog = _catalog
+    if force or catalog.loaded_at is None or now - catalog.loaded_at >= CATALOG_TTL_SECONDS:
+        with _catalog_lock:
+            if _catalog is catalog:
+                fresh = PostCatalog.load(db)
+                fresh.popularity_rankings()
+                _catalog = fresh
+            return _catalog
+    if now - catalog.polled_at >= CATALOG_POLL_SECONDS:
+        with _catalog_lock:
+            if _catalog is catalog:
+                rows = db.execute(
+                    select(*POST_COLUMNS).where(models.Post.id > catalog.max_id).order_by(models.Post.id)
+                ).all()
+                fresh = catalog
+                if rows:
+                    fresh = catalog.copy()
+                    fresh._apply(_with_tags(db, rows, catalog.max_id))
+                    fresh.popularity_rankings()
+                fresh.polled_at = now
+                _catalog = fresh
+            return _catalog
+    return catalog
+
+def upsert_posts(posts: Iterable[models.Post]):
+    """
+    Apply freshly written Post rows to the in-process catalog, if loaded.
+    Only useful to writers inside the API process; other processes' writes
+    reach it through get_catalog's poll and reload.
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog.loaded_at is None:
+            return
+        rows = [(*(getattr(p, c.key) for c in POST_COLUMNS), normalize_tags(p.tags)) for p in posts]
+        if not rows:
+            return
+        fresh = _catalog.copy()
+        fresh._apply(rows)
+        # Refresh cold-start rankings before readers see the new snapshot
+        fresh.popularity_rankings()
+        _catalog = fresh
+
+def reset_catalog():
+    """Drop the snapshot so the next request reloads it."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = PostCatalog()
@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from app.database.database import SessionLocal
 from app.database import models
+from app.catalog import sync_post_tags
 import requests
 
 # Load variables from .env at project root
@@ -32,6 +33,7 @@ def save_posts():
     db: Session = SessionLocal()
     posts = fetch_posts()
     saved = 0
+    written = []
     for post in posts:
         slug = post.get("slug") or f"post-{post.get('id')}"
         title = post.get("title") or slug
@@ -67,9 +69,14 @@ def save_posts():
             existing.project_code = existing.topic.get("project_code")
 
         db.add(existing)
+        written.append(existing)
         saved += 1
 
+    sync_post_tags(db, written)
     db.commit()
+    # This script has no catalog loaded; the API process polls new posts within
+    # CATALOG_POLL_SECONDS, while counter/tag edits to known posts wait for its
+    # next full reload (CATALOG_TTL_SECONDS)
     db.close()
     print(f"Saved {saved} posts.")
 
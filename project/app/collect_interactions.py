@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.database.database import SessionLocal
 from app.database import models
+from app.profiles import apply_interaction
+from app.cache import feed_cache
 import requests
 
 load_dotenv()
@@ -36,6 +38,7 @@ def save_interactions_from_api():
     db: Session = SessionLocal()
     items = fetch_interactions_from_api()
     saved = 0
+    touched = set()
     for it in items:
         user_id = it.get("user_id") or it.get("userId")
         post_id = it.get("post_id") or it.get("postId")
@@ -49,9 +52,15 @@ def save_interactions_from_api():
             continue
         exists = db.query(models.Interaction).filter_by(user_id=user_id, post_id=post_id, type=typ).first()
         if not exists:
-            db.add(models.Interaction(user_id=user_id, post_id=post_id, type=typ, value=val))
+            interaction = models.Interaction(user_id=user_id, post_id=post_id, type=typ, value=val)
+            db.add(interaction)
+            apply_interaction(db, interaction)
+            touched.add(user_id)
             saved += 1
     db.commit()
+    # Reaches the API's cached feeds only with CACHE_BACKEND=redis
+    for user_id in touched:
+        feed_cache.invalidate_user(user_id)
     db.close()
     print(f"[real] saved {saved} interactions")
     return saved
@@ -71,6 +80,7 @@ def save_interactions_synthetic():
         return 0
 
     total_saved = 0
+    touched = set()
     for post in posts:
         user_ids = _random_users(db, MAX_USERS_PER_POST)
         if not user_ids:
@@ -126,15 +136,20 @@ def save_interactions_synthetic():
                 user_id=uid, post_id=post.id, type=typ
             ).first()
             if not exists:
-                db.add(models.Interaction(
+                interaction = models.Interaction(
                     user_id=uid,
                     post_id=post.id,
                     type=typ,
                     value=val
-                ))
+                )
+                db.add(interaction)
+                apply_interaction(db, interaction)
+                touched.add(uid)
                 total_saved += 1
 
     db.commit()
+    for uid in touched:
+        feed_cache.invalidate_user(uid)
     db.close()
     print(f"[synthetic] saved {total_saved} interactions")
     return total_saved
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 class Settings(BaseSettings):
@@ -16,16 +16,50 @@ class Settings(BaseSettings):
     # ML Model Configuration
     MODEL_PATH: str = "./models"
     EMBEDDING_DIM: int = 128
+    EMBEDDING_MODEL_VERSION: str = "v1.0"
     BATCH_SIZE: int = 32
     LEARNING_RATE: float = 0.001
+    MODEL_RELOAD_SECONDS: float = 30.0  # model file polling for hot swap; 0 disables
+    CF_REFRESH_SECONDS: float = 300.0  # rebuild of the collaborative-filtering matrices from interactions; 0 disables
+    EMBEDDING_UPDATE_WINDOW: float = 10.0  # seconds interactions are coalesced per user before re-embedding
+    EMBEDDING_UPDATE_BATCH: int = 100  # users re-embedded per batch
+    USER_EMBEDDING_MODE: str = "profile"  # "profile" or "running_mean" (decayed mean of interacted items)
+    USER_EMBEDDING_HALF_LIFE_DAYS: float = 14.0  # running_mean: an interaction's weight halves this often
     
     # Recommendation Configuration
     MAX_RECOMMENDATIONS: int = 50
     COLD_START_THRESHOLD: int = 5
     SIMILARITY_THRESHOLD: float = 0.3
+    SCORING_WORKERS: int = 4  # threads running the deep/CF/content scorers concurrently
+    SCORING_PROCESS_WORKERS: int = 0  # >0 runs process-safe scorers in a process pool
+    # Candidates per retrieval source handed to the ranking models
+    CANDIDATE_QUOTAS: Dict[str, int] = {"ann": 200, "collaborative": 100, "trending": 50, "tags": 50}
+    
+    # Similar-content index (IVF) Configuration
+    ANN_NLIST: int = 0  # inverted lists; 0 picks about 4 * sqrt(posts)
+    ANN_NPROBE: int = 16  # lists scanned per query: higher is better recall, slower
+    ANN_TRAIN_SAMPLE: int = 100000  # embeddings sampled to train the centroids
+    ANN_OVERFETCH: int = 2  # candidates fetched per result to survive post filtering
+    
+    # Trending Configuration
+    TRENDING_HALF_LIFE_HOURS: float = 24.0  # engagement counts half as much per half-life of post age
+    TRENDING_WINDOW_DAYS: int = 7  # only posts this recent are trending
     
     # Cache Configuration
     CACHE_TTL: int = 3600  # 1 hour
+    CACHE_STALE_TTL: int = 300  # served past CACHE_TTL while refreshing
+    CACHE_LOCAL_SIZE: int = 10000  # entries in the in-process tier
+    CACHE_BACKEND: str = "local"  # "local" or "redis" (shared via REDIS_URL); invalidations from the collect scripts need "redis"
+    CACHE_LOCAL_TTL: int = 30  # caps CACHE_TTL and CACHE_STALE_TTL without a shared store
+    RANKING_CACHE_TTL: int = 300  # seconds a ranked feed is paged through before re-ranking
+    RANKING_PREFETCH: bool = True  # load the next page in the background
+    POST_RESPONSE_CACHE_TTL: int = 60  # seconds a post's response payload is reused
+    
+    # Recommendation log buffer
+    LOG_BUFFER_SIZE: int = 10000  # rows held in memory before the overflow policy applies
+    LOG_FLUSH_SIZE: int = 500  # rows per bulk insert
+    LOG_FLUSH_SECONDS: float = 2.0  # longest a row waits to be written
+    LOG_BUFFER_POLICY: str = "drop_newest"  # "drop_newest", "drop_oldest" or "block"
     
     # Development Configuration
     DEBUG: bool = True
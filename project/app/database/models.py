@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Float, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Float, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 
@@ -44,4 +44,39 @@ class Interaction(Base):
     value = Column(Float, nullable=True)
     timestamp = Column(DateTime, server_default=func.now(), nullable=False)
     user = relationship("User", back_populates="interactions")
-    post = relationship("Post", back_populates="interactions")
\ No newline at end of file
+    post = relationship("Post", back_populates="interactions")
+
+class Tag(Base):
+    __tablename__ = "tags"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)  # normalized (see app.catalog.normalize_tags)
+
+class PostTag(Base):
+    __tablename__ = "post_tags"
+    post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True, index=True)
+
+class UserProfile(Base):
+    __tablename__ = "user_profiles"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    weights_key = Column(String, nullable=False)  # WEIGHTS the tag weights were built with
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+class UserTagWeight(Base):
+    __tablename__ = "user_tag_weights"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True)
+    weight = Column(Float, nullable=False, default=0.0)
+
+class TrendingScore(Base):
+    """Precomputed trending rank of a post (see app.services.trending)."""
+    __tablename__ = "trending_scores"
+    post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    category = Column(String, nullable=True)  # category name, for per-category trending
+    listed = Column(Boolean, nullable=False, default=True)  # public and unlocked
+    score = Column(Float, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    __table_args__ = (
+        Index("ix_trending_scores_rank", "listed", "score", "post_id"),
+        Index("ix_trending_scores_category_rank", "category", "listed", "score", "post_id"),
+    )
\ No newline at end of file
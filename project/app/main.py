@@ -3,13 +3,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import Response
-from typing import Optional
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from app.recommend import (
     recommend_for_user,
     recommend_for_user_by_category,
-    recommend_for_username,
-    recommend_for_username_by_category,
+    recommend_for_usernames,
+    recommend_popular,
+    resolve_user_id,
 )
+from app.cache import feed_cache
 
 app = FastAPI(title="Video Recommendation Engine")
 
@@ -31,16 +34,23 @@ def feed(
     tag: Optional[str] = Query(None, description="Tag filter")
 ):
     try:
-        if project_code or category or tag:
-            results = recommend_for_username_by_category(
-                username=username,
-                top_k=top_k,
-                category=category,
-                tag=tag,
-                project_code=project_code
-            )
-        else:
-            results = recommend_for_username(username=username, top_k=top_k)
+        user_id = resolve_user_id(username)
+
+        def compute():
+            if user_id is None:
+                # Cold start: every unknown username gets the same popular feed
+                return recommend_popular(top_k=top_k, category=category, tag=tag, project_code=project_code)
+            if project_code or category or tag:
+                return recommend_for_user_by_category(
+                    user_id=user_id,
+                    top_k=top_k,
+                    category=category,
+                    tag=tag,
+                    project_code=project_code
+                )
+            return recommend_for_user(user_id=user_id, top_k=top_k)
+
+        results = feed_cache.get_or_compute(user_id, ("feed", top_k, project_code, category, tag), compute)
         
         return {
             "username": username,
@@ -53,11 +63,41 @@ def feed(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class BatchFeedRequest(BaseModel):
+    usernames: List[str] = Field(..., min_length=1, max_length=1000)
+    top_k: int = Field(5, ge=1, le=100)
+    project_code: Optional[str] = None
+    category: Optional[str] = None
+    tag: Optional[str] = None
+
+# Feeds for many users with shared filters, in request order
+@app.post("/feed/batch")
+def feed_batch(request: BatchFeedRequest):
+    try:
+        feeds = recommend_for_usernames(
+            usernames=request.usernames,
+            top_k=request.top_k,
+            category=request.category,
+            tag=request.tag,
+            project_code=request.project_code
+        )
+        return {
+            "top_k": request.top_k,
+            "project_code": request.project_code,
+            "category": request.category,
+            "tag": request.tag,
+            "feeds": [{"username": u, "results": feeds[u]} for u in request.usernames]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Keep existing endpoint for backward compatibility
 @app.get("/recommend/{user_id}")
 def recommend(user_id: int, top_k: int = 5):
     try:
-        recs = recommend_for_user(user_id=user_id, top_k=top_k)
+        recs = feed_cache.get_or_compute(
+            user_id, ("recommend", top_k), lambda: recommend_for_user(user_id=user_id, top_k=top_k)
+        )
         return {"user_id": user_id, "top_k": top_k, "results": recs}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,137 @@
+import json, hashlib
+from collections import defaultdict
+from typing import List, Optional, Dict, Iterable
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete
+from app.database import models
+from app.catalog import sync_post_tags, chunked
+
+# Weights for interaction types
+WEIGHTS = {
+    "view": 0.2,
+    "like": 1.0,
+    "bookmark": 1.2,
+    "rating": 1.5,  # if ratings are 0–100, scaled below
+}
+
+# Stored profiles built with other weights are ignored until rebuilt
+WEIGHTS_KEY = hashlib.sha1(json.dumps(WEIGHTS, sort_keys=True).encode()).hexdigest()[:12]
+
+def interaction_weight(typ: str, value: Optional[float]) -> float:
+    w = WEIGHTS.get(typ, 0.0)
+    if typ == "rating" and value is not None:
+        val = float(value)
+        w *= (val / 5.0) if val <= 5.0 else (val / 100.0)
+    return w
+
+def load_user_profile(db: Session, user_id: int) -> Optional[Dict[str, float]]:
+    """Stored tag profile of a user, or None if it is missing or built with other WEIGHTS."""
+    key = db.execute(
+        select(models.UserProfile.weights_key).where(models.UserProfile.user_id == user_id)
+    ).scalar_one_or_none()
+    if key != WEIGHTS_KEY:
+        return None
+    rows = db.execute(
+        select(models.Tag.name, models.UserTagWeight.weight)
+        .join(models.Tag, models.Tag.id == models.UserTagWeight.tag_id)
+        .where(models.UserTagWeight.user_id == user_id)
+    ).all()
+    return {name: weight for name, weight in rows}
+
+def load_user_profiles(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[str, float]]:
+    """load_user_profile for many users; users without a current profile are left out."""
+    profiles: Dict[int, Dict[str, float]] = {}
+    for chunk in chunked(list(user_ids)):
+        current = db.execute(
+            select(models.UserProfile.user_id).where(
+                models.UserProfile.user_id.in_(chunk), models.UserProfile.weights_key == WEIGHTS_KEY
+            )
+        ).scalars().all()
+        profiles.update((user_id, {}) for user_id in current)
+        rows = db.execute(
+            select(models.UserTagWeight.user_id, models.Tag.name, models.UserTagWeight.weight)
+            .join(models.Tag, models.Tag.id == models.UserTagWeight.tag_id)
+            .where(models.UserTagWeight.user_id.in_(current))
+        ).all()
+        for user_id, name, weight in rows:
+            profiles[user_id][name] = weight
+    return profiles
+
+def apply_interaction(db: Session, interaction: models.Interaction):
+    """
+    Add a newly written interaction to its user's stored profile: one update
+    per tag of the post. Users without a current profile are rebuilt from
+    their full history instead. Flushes but does not commit.
+    """
+    db.flush()
+    user_id = interaction.user_id
+    key = db.execute(
+        select(models.UserProfile.weights_key).where(models.UserProfile.user_id == user_id)
+    ).scalar_one_or_none()
+    if key != WEIGHTS_KEY:
+        rebuild_user_profiles(db, [user_id])
+        return
+    w = interaction_weight(interaction.type, interaction.value)
+    for tag_id in _post_tag_ids(db, interaction.post_id):
+        updated = db.execute(
+            update(models.UserTagWeight)
+            .where(models.UserTagWeight.user_id == user_id, models.UserTagWeight.tag_id == tag_id)
+            .values(weight=models.UserTagWeight.weight + w)
+        ).rowcount
+        if not updated:
+            db.add(models.UserTagWeight(user_id=user_id, tag_id=tag_id, weight=w))
+    db.flush()
+
+def rebuild_user_profiles(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute stored profiles from interaction history, for ``user_ids`` or
+    every user. Run after changing WEIGHTS. Flushes but does not commit.
+    """
+    if user_ids is None:
+        user_ids = db.execute(select(models.User.id)).scalars().all()
+    user_ids = list(user_ids)
+    for chunk in chunked(user_ids):
+        _sync_unsynced_posts(db, chunk)
+        weights: Dict[int, Dict[int, float]] = {u: defaultdict(float) for u in chunk}
+        rows = db.execute(
+            select(models.Interaction.user_id, models.Interaction.type, models.Interaction.value, models.PostTag.tag_id)
+            .join(models.PostTag, models.PostTag.post_id == models.Interaction.post_id)
+            .where(models.Interaction.user_id.in_(chunk))
+        ).all()
+        for user_id, typ, value, tag_id in rows:
+            weights[user_id][tag_id] += interaction_weight(typ, value)
+        db.execute(delete(models.UserTagWeight).where(models.UserTagWeight.user_id.in_(chunk)))
+        db.execute(delete(models.UserProfile).where(models.UserProfile.user_id.in_(chunk)))
+        db.add_all(
+            models.UserTagWeight(user_id=user_id, tag_id=tag_id, weight=w)
+            for user_id, tags in weights.items() for tag_id, w in tags.items()
+        )
+        db.add_all(models.UserProfile(user_id=user_id, weights_key=WEIGHTS_KEY) for user_id in chunk)
+        db.flush()
+    return len(user_ids)
+
+def _post_tag_ids(db: Session, post_id: int) -> List[int]:
+    tag_ids = db.execute(
+        select(models.PostTag.tag_id).where(models.PostTag.post_id == post_id)
+    ).scalars().all()
+    if not tag_ids:
+        post = db.get(models.Post, post_id)
+        if post is not None and post.tags:
+            sync_post_tags(db, [post])
+            tag_ids = db.execute(
+                select(models.PostTag.tag_id).where(models.PostTag.post_id == post_id)
+            ).scalars().all()
+    return tag_ids
+
+def _sync_unsynced_posts(db: Session, user_ids: List[int]):
+    """Make sure every post these users touched has its post_tags rows."""
+    posts = db.execute(
+        select(models.Post)
+        .where(models.Post.id.in_(
+            select(models.Interaction.post_id).where(models.Interaction.user_id.in_(user_ids))
+        ))
+        .where(~models.Post.id.in_(select(models.PostTag.post_id)))
+    ).scalars().all()
+    posts = [p for p in posts if p.tags]
+    if posts:
+        sync_post_tags(db, posts)
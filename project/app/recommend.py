@@ -1,45 +1,56 @@
-import os, sys, math, json
-from typing import List, Optional, Dict, Any, Iterable, Set
+import os, math
+import numpy as np
+from typing import List, Optional, Dict, Any, Iterable
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from app.database.database import SessionLocal
 from app.database import models
+from app.catalog import PostCatalog, get_catalog, normalize_tags, chunked
+from app.profiles import interaction_weight, load_user_profile, load_user_profiles
+from app.cache import LRUCache
 
-# Weights for interaction types
-WEIGHTS = {
-    "view": 0.2,
-    "like": 1.0,
-    "bookmark": 1.2,
-    "rating": 1.5,  # if ratings are 0–100, scaled below
-}
+def get_user_profile(db: Session, user_id: int) -> Dict[str, float]:
+    """
+    Weighted tag profile from user's interactions. Served from the stored
+    profile (app.profiles) when it is current, otherwise computed from the
+    full interaction history.
+    """
+    stored = load_user_profile(db, user_id)
+    if stored is not None:
+        return stored
+    return compute_user_profile(db, user_id)
 
-def normalize_tags(tags) -> Set[str]:
-    if not tags:
-        return set()
-    if isinstance(tags, str):
-        try:
-            tags = json.loads(tags)
-        except Exception:
-            tags = [t.strip() for t in tags.split(",") if t.strip()]
-    return {str(t).strip().lower() for t in tags if t is not None}
+def get_user_profiles(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[str, float]]:
+    """get_user_profile for many users with a fixed number of queries."""
+    user_ids = list(user_ids)
+    profiles = load_user_profiles(db, user_ids)
+    missing = [u for u in user_ids if u not in profiles]
+    if missing:
+        profiles.update(compute_user_profiles(db, missing))
+    return profiles
 
-def get_user_profile(db: Session, user_id: int) -> Dict[str, float]:
-    """Weighted tag profile from user's interactions."""
-    interactions = db.execute(
-        select(models.Interaction, models.Post.tags)
-        .join(models.Post, models.Post.id == models.Interaction.post_id)
-        .where(models.Interaction.user_id == user_id)
-    ).all()
+def compute_user_profile(db: Session, user_id: int) -> Dict[str, float]:
+    """Weighted tag profile from all of a user's interactions, using the catalog's normalized tags."""
+    return compute_user_profiles(db, [user_id])[user_id]
 
-    tag_weights: Dict[str, float] = {}
-    for inter, tags in interactions:
-        w = WEIGHTS.get(inter.type, 0.0)
-        if inter.type == "rating" and inter.value is not None:
-            val = float(inter.value)
-            w *= (val / 5.0) if val <= 5.0 else (val / 100.0)
-        for tag in normalize_tags(tags):
-            tag_weights[tag] = tag_weights.get(tag, 0.0) + w
-    return tag_weights
+def compute_user_profiles(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[str, float]]:
+    catalog = get_catalog(db)
+    profiles: Dict[int, Dict[str, float]] = {u: {} for u in user_ids}
+    for chunk in chunked(list(profiles)):
+        interactions = db.execute(
+            select(models.Interaction.user_id, models.Interaction.post_id,
+                   models.Interaction.type, models.Interaction.value)
+            .where(models.Interaction.user_id.in_(chunk))
+        ).all()
+        for user_id, post_id, typ, value in interactions:
+            pos = catalog.position(post_id)
+            if pos < 0:
+                continue
+            w = interaction_weight(typ, value)
+            tag_weights = profiles[user_id]
+            for tag in catalog.records[pos]["tags"]:
+                tag_weights[tag] = tag_weights.get(tag, 0.0) + w
+    return profiles
 
 def popularity_score_for_post(p: models.Post) -> float:
     pop = (p.view_count or 0) + 2 * (p.upvote_count or 0) + 3 * (p.bookmark_count or 0)
@@ -52,6 +63,28 @@ def seen_penalty(db: Session, user_id: int, post_id: int) -> float:
     ).scalar_one()
     return 0.5 * float(seen_weight)
 
+def get_seen_counts(db: Session, user_id: int) -> Dict[int, int]:
+    """Interaction count per post for a user, in a single GROUP BY query."""
+    rows = db.execute(
+        select(models.Interaction.post_id, func.count(models.Interaction.id))
+        .where(models.Interaction.user_id == user_id)
+        .group_by(models.Interaction.post_id)
+    ).all()
+    return {post_id: count for post_id, count in rows}
+
+def get_seen_counts_for_users(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[int, int]]:
+    """get_seen_counts for many users, grouped by (user, post)."""
+    counts: Dict[int, Dict[int, int]] = {}
+    for chunk in chunked(list(user_ids)):
+        rows = db.execute(
+            select(models.Interaction.user_id, models.Interaction.post_id, func.count(models.Interaction.id))
+            .where(models.Interaction.user_id.in_(chunk))
+            .group_by(models.Interaction.user_id, models.Interaction.post_id)
+        ).all()
+        for user_id, post_id, count in rows:
+            counts.setdefault(user_id, {})[post_id] = count
+    return counts
+
 def score_post_for_user(
     db: Session,
     user_id: int,
@@ -59,11 +92,21 @@ def score_post_for_user(
     user_tag_profile: Dict[str, float],
     popularity_weight: float = 0.3,
     apply_seen_penalty: bool = True,
+    seen_counts: Optional[Dict[int, int]] = None,
 ) -> float:
+    """
+    Pass ``seen_counts`` from get_seen_counts when scoring many posts; without
+    it the seen penalty costs one query per post.
+    """
     post_tags = normalize_tags(post.tags)
     content_score = sum(user_tag_profile.get(t, 0.0) for t in post_tags)
     popularity = popularity_score_for_post(post)
-    penalty = seen_penalty(db, user_id, post.id) if apply_seen_penalty else 0.0
+    if not apply_seen_penalty:
+        penalty = 0.0
+    elif seen_counts is not None:
+        penalty = 0.5 * float(seen_counts.get(post.id, 0))
+    else:
+        penalty = seen_penalty(db, user_id, post.id)
     return content_score + popularity_weight * popularity - penalty
 
 def fetch_posts(db: Session) -> List[models.Post]:
@@ -107,31 +150,135 @@ def filter_posts_by_category(
             filtered.append(p)
     return filtered
 
+def score_catalog_for_user(
+    catalog: PostCatalog,
+    tag_weights: Dict[int, float],
+    seen_counts: Dict[int, int],
+    positions: Optional[np.ndarray] = None,
+    popularity_weight: float = 0.3,
+    apply_seen_penalty: bool = True,
+) -> np.ndarray:
+    """
+    Vectorized score_post_for_user for ``positions`` (default: every post):
+    one sparse mat-vec of the post x tag matrix with the profile vector, plus
+    popularity and seen-penalty terms. ``tag_weights`` is keyed by tag id and
+    ``seen_counts`` comes from get_seen_counts.
+    """
+    matrix = catalog.tag_matrix()
+    profile = np.zeros(matrix.shape[1], dtype=np.float64)
+    for tag_id, w in tag_weights.items():
+        if tag_id < len(profile):
+            profile[tag_id] = w
+    if positions is None:
+        scores = matrix @ profile + popularity_weight * catalog.popularity
+    else:
+        scores = matrix[positions] @ profile + popularity_weight * catalog.popularity[positions]
+    if apply_seen_penalty and seen_counts:
+        seen = catalog.seen_vector(seen_counts)
+        scores -= 0.5 * (seen if positions is None else seen[positions])
+    return scores
+
+def select_top_k(scores: np.ndarray, k: int, tiebreak: np.ndarray) -> np.ndarray:
+    """
+    Indices of the ``k`` highest ``scores``, best first, in O(n + k log k).
+    Equal scores are ordered by ascending ``tiebreak`` (e.g. post ids), so
+    results are deterministic.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        idx = np.flatnonzero(scores >= kth)
+    else:
+        idx = np.arange(n)
+    order = np.lexsort((tiebreak[idx], -scores[idx]))[:k]
+    return idx[order]
+
+def profile_tag_weights(catalog: PostCatalog, user_tag_profile: Dict[str, float]) -> Dict[int, float]:
+    """Re-key a tag profile by catalog tag id, dropping tags no post carries."""
+    weights: Dict[int, float] = {}
+    for tag, w in user_tag_profile.items():
+        tag_id = catalog.tags.get(tag)
+        if tag_id >= 0:
+            weights[tag_id] = w
+    return weights
+
+def candidate_positions(catalog: PostCatalog, tag_weights: Dict[int, float], backfill: int) -> np.ndarray:
+    """
+    Positions worth scoring for a user: every post tagged with one of the
+    user's positively weighted profile tags, plus the ``backfill`` most
+    popular posts. Profile weights are never negative, so posts outside that
+    set have a content score of 0 and none of them can outrank the unseen
+    backfill posts; with ``backfill`` >= top_k + number of seen posts the
+    top_k is the same as scoring the whole catalog.
+    """
+    profile_tags = [tag_id for tag_id, w in tag_weights.items() if w > 0]
+    return np.union1d(catalog.tag_candidates(profile_tags), catalog.popularity_order()[:backfill])
+
+def filter_catalog_positions(
+    catalog: PostCatalog,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    project_code: Optional[str] = None
+) -> np.ndarray:
+    """
+    Catalog positions matching every given filter (see filter_posts_by_category),
+    computed as an AND of the catalog's per-value bitsets.
+    """
+    return catalog.filter_positions(catalog_filters(category, tag, project_code))
+
+def catalog_filters(
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    project_code: Optional[str] = None
+) -> Dict[str, str]:
+    """Normalized ``field -> value`` filters understood by PostCatalog."""
+    filters: Dict[str, str] = {}
+    if category:
+        filters["category"] = category.strip().lower()
+    if tag:
+        filters["tag"] = tag.strip().lower()
+    if project_code:
+        filters["project_code"] = project_code.strip().lower()
+    return filters
+
+def rank_for_user(
+    catalog: PostCatalog,
+    user_tag_profile: Dict[str, float],
+    seen_counts: Dict[int, int],
+    top_k: int,
+    candidates: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    """Top ``top_k`` feed results among ``candidates`` (default: tag-index candidates)."""
+    tag_weights = profile_tag_weights(catalog, user_tag_profile)
+    if candidates is None:
+        candidates = candidate_positions(catalog, tag_weights, top_k + len(seen_counts))
+    if not len(candidates):
+        return []
+    scores = score_catalog_for_user(catalog, tag_weights, seen_counts, candidates)
+    best = select_top_k(scores, top_k, catalog.ids[candidates])
+    return [catalog.result(pos, s) for pos, s in zip(candidates[best].tolist(), scores[best].tolist())]
+
+def rank_by_popularity(
+    catalog: PostCatalog,
+    top_k: int,
+    filters: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Cold-start results: the most popular posts matching ``filters`` (see
+    catalog_filters), sliced from rankings precomputed per catalog snapshot.
+    """
+    best = catalog.popular_positions(filters or {}, top_k)
+    return [catalog.result(pos, s) for pos, s in zip(best.tolist(), catalog.popularity[best].tolist())]
+
 def recommend_for_user(user_id: int, top_k: int = 5) -> List[Dict[str, Any]]:
     db: Session = SessionLocal()
     try:
-        tag_profile = get_user_profile(db, user_id)
-        posts = fetch_posts(db)
-        if not posts:
+        catalog = get_catalog(db)
+        if not len(catalog):
             return []
-        scored = [(score_post_for_user(db, user_id, p, tag_profile), p) for p in posts]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [{
-            "post_id": p.id,
-            "title": p.title,
-            "slug": p.slug,
-            "score": round(s, 4),
-            "tags": sorted(list(normalize_tags(p.tags))),
-            "view_count": p.view_count,
-            "upvote_count": p.upvote_count,
-            "bookmark_count": p.bookmark_count,
-            "average_rating": p.average_rating,
-            "project_code": getattr(p, "project_code", None),
-            "video_link": p.video_link,
-            "thumbnail_url": p.thumbnail_url,
-            "category": p.category,
-            "topic": p.topic
-        } for s, p in scored[:top_k]]
+        return rank_for_user(catalog, get_user_profile(db, user_id), get_seen_counts(db, user_id), top_k)
     finally:
         db.close()
 
@@ -146,29 +293,13 @@ def recommend_for_user_by_category(
     try:
         if not any([category, tag, project_code]):
             return []
-        tag_profile = get_user_profile(db, user_id)
-        posts = fetch_posts(db)
-        candidates = filter_posts_by_category(posts, category=category, tag=tag, project_code=project_code)
-        if not candidates:
+        catalog = get_catalog(db)
+        candidates = filter_catalog_positions(catalog, category=category, tag=tag, project_code=project_code)
+        if not len(candidates):
             return []
-        scored = [(score_post_for_user(db, user_id, p, tag_profile), p) for p in candidates]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [{
-            "post_id": p.id,
-            "title": p.title,
-            "slug": p.slug,
-            "score": round(s, 4),
-            "tags": sorted(list(normalize_tags(p.tags))),
-            "view_count": p.view_count,
-            "upvote_count": p.upvote_count,
-            "bookmark_count": p.bookmark_count,
-            "average_rating": p.average_rating,
-            "project_code": getattr(p, "project_code", None),
-            "video_link": p.video_link,
-            "thumbnail_url": p.thumbnail_url,
-            "category": p.category,
-            "topic": p.topic
-        } for s, p in scored[:top_k]]
+        return rank_for_user(
+            catalog, get_user_profile(db, user_id), get_seen_counts(db, user_id), top_k, candidates
+        )
     finally:
         db.close()
 
@@ -178,34 +309,52 @@ def get_user_id_by_username(db: Session, username: str) -> Optional[int]:
     ).first()
     return row[0] if row else None
 
+# Usernames never change owner, so resolved ids can be kept
+_user_ids = LRUCache(int(os.getenv("USER_ID_CACHE_SIZE", "100000")))
+
+def resolve_user_id(username: str) -> Optional[int]:
+    """get_user_id_by_username with its own session; known ids are served from memory."""
+    user_id = _user_ids.get(username)
+    if user_id is None:
+        db: Session = SessionLocal()
+        try:
+            user_id = get_user_id_by_username(db, username)
+        finally:
+            db.close()
+        if user_id is not None:
+            _user_ids.set(username, user_id)
+    return user_id
+
+def get_user_ids_by_usernames(db: Session, usernames: Iterable[str]) -> Dict[str, int]:
+    """username -> user id for the usernames that exist."""
+    ids: Dict[str, int] = {}
+    for chunk in chunked(sorted(set(usernames))):
+        ids.update(db.execute(
+            select(models.User.username, models.User.id).where(models.User.username.in_(chunk))
+        ).all())
+    return ids
+
+def recommend_popular(
+    top_k: int = 5,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    project_code: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Cold-start feed: the most popular posts, optionally filtered."""
+    db: Session = SessionLocal()
+    try:
+        catalog = get_catalog(db)
+        return rank_by_popularity(catalog, top_k, catalog_filters(category, tag, project_code))
+    finally:
+        db.close()
+
 def recommend_for_username(username: str, top_k: int = 5):
     db: Session = SessionLocal()
     try:
         user_id = get_user_id_by_username(db, username)
         if user_id is None:
             # Cold start: return popular posts for new users
-            posts = fetch_posts(db)
-            if not posts:
-                return []
-            # Sort by popularity score
-            scored = [(popularity_score_for_post(p), p) for p in posts]
-            scored.sort(key=lambda x: x[0], reverse=True)
-            return [{
-                "post_id": p.id,
-                "title": p.title,
-                "slug": p.slug,
-                "score": round(s, 4),
-                "tags": sorted(list(normalize_tags(p.tags))),
-                "view_count": p.view_count,
-                "upvote_count": p.upvote_count,
-                "bookmark_count": p.bookmark_count,
-                "average_rating": p.average_rating,
-                "project_code": getattr(p, "project_code", None),
-                "video_link": p.video_link,
-                "thumbnail_url": p.thumbnail_url,
-                "category": p.category,
-                "topic": p.topic
-            } for s, p in scored[:top_k]]
+            return recommend_popular(top_k)
         return recommend_for_user(user_id=user_id, top_k=top_k)
     finally:
         db.close()
@@ -224,29 +373,7 @@ def recommend_for_username_by_category(
             # Cold start: return popular posts filtered by category for new users
             if not any([category, tag, project_code]):
                 return []
-            posts = fetch_posts(db)
-            candidates = filter_posts_by_category(posts, category=category, tag=tag, project_code=project_code)
-            if not candidates:
-                return []
-            # Sort by popularity score
-            scored = [(popularity_score_for_post(p), p) for p in candidates]
-            scored.sort(key=lambda x: x[0], reverse=True)
-            return [{
-                "post_id": p.id,
-                "title": p.title,
-                "slug": p.slug,
-                "score": round(s, 4),
-                "tags": sorted(list(normalize_tags(p.tags))),
-                "view_count": p.view_count,
-                "upvote_count": p.upvote_count,
-                "bookmark_count": p.bookmark_count,
-                "average_rating": p.average_rating,
-                "project_code": getattr(p, "project_code", None),
-                "video_link": p.video_link,
-                "thumbnail_url": p.thumbnail_url,
-                "category": p.category,
-                "topic": p.topic
-            } for s, p in scored[:top_k]]
+            return recommend_popular(top_k, category=category, tag=tag, project_code=project_code)
         return recommend_for_user_by_category(
             user_id=user_id,
             top_k=top_k,
@@ -255,4 +382,44 @@ def recommend_for_username_by_category(
             project_code=project_code
         )
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def recommend_for_usernames(
+    usernames: List[str],
+    top_k: int = 5,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    project_code: Optional[str] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Feeds for many users at once, with the semantics of
+    recommend_for_username(_by_category) for each. User ids, profiles and
+    seen counts are loaded in bulk; the catalog, filter candidates and the
+    cold-start feed are computed once for the whole batch.
+    """
+    db: Session = SessionLocal()
+    try:
+        catalog = get_catalog(db)
+        filtered = any([category, tag, project_code])
+        candidates = None
+        if filtered:
+            candidates = filter_catalog_positions(catalog, category=category, tag=tag, project_code=project_code)
+        if not len(catalog) or (candidates is not None and not len(candidates)):
+            return {username: [] for username in usernames}
+
+        user_ids = get_user_ids_by_usernames(db, usernames)
+        profiles = get_user_profiles(db, user_ids.values())
+        seen = get_seen_counts_for_users(db, user_ids.values())
+        cold_start = rank_by_popularity(catalog, top_k, catalog_filters(category, tag, project_code))
+        feeds: Dict[str, List[Dict[str, Any]]] = {}
+        for username in usernames:
+            user_id = user_ids.get(username)
+            if user_id is None:
+                feeds[username] = [dict(r) for r in cold_start]
+            elif username not in feeds:
+                feeds[username] = rank_for_user(
+                    catalog, profiles.get(user_id, {}), seen.get(user_id, {}), top_k, candidates
+                )
+        return feeds
+    finally:
+        db.close()
@@ -6,6 +6,7 @@ import logging
 
 from app.database.database import get_db
 from app.database.models import User, Post, Category, Topic, UserInteraction, RecommendationLog
+from app.services.log_buffer import recommendation_log_buffer
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -217,6 +218,7 @@ async def get_recommendation_logs(
     
     return {
         "total_logs": len(logs),
+        "buffer": recommendation_log_buffer.status(),
         "logs": [
             {
                 "id": log.id,
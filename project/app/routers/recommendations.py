@@ -3,15 +3,58 @@ from sqlalchemy.orm import Session
 from typing import Optional, List
 import logging
 
-from app.database.database import get_db
+from app.database.database import SessionLocal, get_db
 from app.schemas.recommendation import RecommendationResponse, FeedRequest, InteractionRequest
-from app.services.recommendation_engine import RecommendationEngine
+from app.services.model_registry import model_registry
+from app.services.scoring_executor import get_scoring_executor
+from app.services.log_buffer import recommendation_log_buffer
+from app.services.embedding_updater import user_embedding_updater
 from app.services.user_service import UserService
+from app.services.trending import backfill_trending_scores
 from app.core.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+@router.on_event("startup")
+def load_models():
+    """Load and warm up the recommendation models before serving traffic."""
+    model_registry.start()
+    recommendation_log_buffer.start()
+    user_embedding_updater.start()
+    backfill_trending()
+
+def backfill_trending():
+    """Store trending keys for posts that have none, so /trending is not empty on a seeded or older database."""
+    db = SessionLocal()
+    try:
+        backfilled = backfill_trending_scores(db)
+        db.commit()
+        if backfilled:
+            logger.info(f"Backfilled trending scores for {backfilled} posts")
+    except Exception as e:
+        logger.error(f"Error backfilling trending scores: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+@router.on_event("shutdown")
+def stop_model_watcher():
+    model_registry.stop()
+    # Apply the embedding updates still pending
+    user_embedding_updater.stop()
+    get_scoring_executor().shutdown()
+    # Write the recommendation logs still buffered
+    recommendation_log_buffer.stop()
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until the recommendation models are loaded."""
+    status = model_registry.status()
+    if not status["ready"]:
+        raise HTTPException(status_code=503, detail="Models are loading")
+    return status
+
 @router.get("/feed", response_model=RecommendationResponse)
 async def get_personalized_feed(
     username: str = Query(..., description="Username for personalized recommendations"),
@@ -20,17 +63,19 @@ async def get_personalized_feed(
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
     mood: Optional[str] = Query(None, description="Mood filter"),
     category: Optional[str] = Query(None, description="Category filter"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     db: Session = Depends(get_db)
 ):
     """
     Get personalized video recommendations for a specific user.
     
     This endpoint uses deep neural networks and collaborative filtering
-    to provide highly personalized content recommendations.
+    to provide highly personalized content recommendations. Follow
+    ``next_cursor`` to scroll through the same ranking page by page.
     """
     try:
         # Initialize services
-        recommendation_engine = RecommendationEngine()
+        recommendation_engine = model_registry.get()
         user_service = UserService(db)
         
         # Get or create user
@@ -43,7 +88,8 @@ async def get_personalized_feed(
             page=page,
             page_size=page_size,
             mood=mood,
-            category=category
+            category=category,
+            cursor=cursor
         )
         
         # Get recommendations
@@ -55,6 +101,8 @@ async def get_personalized_feed(
         
         return recommendations
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting personalized feed for {username}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -74,7 +122,7 @@ async def get_category_based_feed(
     while still considering user preferences.
     """
     try:
-        recommendation_engine = RecommendationEngine()
+        recommendation_engine = model_registry.get()
         user_service = UserService(db)
         
         user = await user_service.get_or_create_user(username)
@@ -109,7 +157,7 @@ async def record_user_interaction(
     Interactions include: view, like, bookmark, share, rate
     """
     try:
-        recommendation_engine = RecommendationEngine()
+        recommendation_engine = model_registry.get()
         user_service = UserService(db)
         
         user = await user_service.get_or_create_user(interaction.username)
@@ -134,23 +182,27 @@ async def get_trending_content(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
     category: Optional[str] = Query(None, description="Category filter"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     db: Session = Depends(get_db)
 ):
     """
     Get trending video content based on engagement metrics.
     """
     try:
-        recommendation_engine = RecommendationEngine()
+        recommendation_engine = model_registry.get()
         
         recommendations = await recommendation_engine.get_trending_content(
             page=page,
             page_size=page_size,
             category=category,
-            db=db
+            db=db,
+            cursor=cursor
         )
         
         return recommendations
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting trending content: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -167,7 +219,7 @@ async def get_similar_content(
     Get content similar to a specific post using content-based filtering.
     """
     try:
-        recommendation_engine = RecommendationEngine()
+        recommendation_engine = model_registry.get()
         user_id = None
         
         if username:
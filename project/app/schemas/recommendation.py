@@ -47,6 +47,8 @@ class RecommendationResponse(BaseModel):
     page: int
     page_size: int
     confidence_scores: Optional[List[float]] = None
+    stage_timings: Optional[Dict[str, float]] = None  # milliseconds per scoring stage
+    next_cursor: Optional[str] = None  # pass as ``cursor`` to get the next page
 
 class FeedRequest(BaseModel):
     username: str
@@ -55,6 +57,7 @@ class FeedRequest(BaseModel):
     page_size: int = 20
     mood: Optional[str] = None
     category: Optional[str] = None
+    cursor: Optional[str] = None  # next_cursor of the previous page; overrides page
 
 class InteractionRequest(BaseModel):
     username: str
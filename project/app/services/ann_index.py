@@ -0,0 +1,219 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+from app.core.config import settings
+from app.services.embedding_store import EmbeddingStore, file_lock, write_json
+from app.services.similarity import SIMILARITY_BLOCK_ROWS, cosine_similarity, cosine_similarity_matrix, l2_normalize
+
+logger = logging.getLogger(__name__)
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbour index (cosine similarity)
+    over the rows of an EmbeddingStore.
+
+    Trained centroids partition the embedding space into ``nlist`` lists;
+    every store row is assigned to its nearest centroid. A query scores the
+    centroids, scans the rows of the ``nprobe`` closest lists and re-ranks
+    them exactly, so recall and latency are traded off with ``nprobe``.
+
+    On disk, under MODEL_PATH/ann/<kind>/<model_version>:
+        centroids.npy  nlist x dim float32, unit length
+        lists.i32      list of every indexed store row, in row order
+        meta.json      nlist and the number of indexed rows
+
+    Rows the store appends later (new posts) are scanned exactly until
+    ``sync`` assigns them, which ingest and the engine's data refresh do;
+    searches only read the index. Rows the store tombstones are skipped at
+    query time. Rows it
+    overwrites in place are scored with their new vector but stay in their
+    old list until the index is retrained. Until the index is trained,
+    searches scan every row exactly.
+    """
+
+    def __init__(self, store: EmbeddingStore, path: str, nprobe: Optional[int] = None):
+        self.store = store
+        self.path = path
+        self.nprobe = nprobe or settings.ANN_NPROBE
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._indexed_rows = 0
+        self._meta_stat = None
+        self._centroids_stat = None
+        self.load()
+
+    @classmethod
+    def open(cls, store: EmbeddingStore, kind: str, model_version: str) -> "IVFIndex":
+        return cls(store, os.path.join(settings.MODEL_PATH, "ann", kind, model_version))
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def load(self):
+        """(Re)load the persisted index if another process changed it."""
+        meta_path = self._file("meta.json")
+        if not os.path.exists(meta_path):
+            return
+        st = os.stat(meta_path)
+        stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat == self._meta_stat:
+            return
+        with self._lock:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            st = os.stat(self._file("centroids.npy"))
+            centroids_stat = (st.st_ino, st.st_mtime_ns)
+            if centroids_stat == self._centroids_stat and meta["rows"] >= self._indexed_rows:
+                # Same training: only rows appended since the last load are new
+                tail = np.fromfile(self._file("lists.i32"), dtype=np.int32,
+                                   count=meta["rows"] - self._indexed_rows, offset=4 * self._indexed_rows)
+                self._extend_lists(tail)
+            else:
+                centroids = np.load(self._file("centroids.npy"))
+                assignments = np.fromfile(self._file("lists.i32"), dtype=np.int32, count=meta["rows"])
+                self._set_lists(centroids, assignments)
+                self._centroids_stat = centroids_stat
+            self._meta_stat = stat
+
+    def train(self, nlist: Optional[int] = None, sample_size: Optional[int] = None,
+              iterations: int = 20, seed: int = 42):
+        """Spherical k-means on a sample of the store, then assign every row."""
+        mapping = self.store.refresh()
+        rows = np.flatnonzero(mapping.live)
+        if not len(rows):
+            raise ValueError("Cannot train an index over an empty embedding store")
+        nlist = nlist or settings.ANN_NLIST or int(4 * np.sqrt(len(rows)))
+        nlist = max(1, min(nlist, len(rows)))
+        rng = np.random.default_rng(seed)
+        sample_size = min(sample_size or settings.ANN_TRAIN_SAMPLE, len(rows))
+        sample = np.asarray(mapping.vectors[np.sort(rng.choice(rows, sample_size, replace=False))])
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(iterations):
+            assign = self._nearest(centroids, sample)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            # Empty lists restart from random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = l2_normalize(sums)
+
+        assignments = self._nearest(centroids, mapping.vectors)
+        with file_lock(self._file(".lock")):
+            np.save(self._file("centroids.npy.tmp.npy"), centroids.astype(np.float32))
+            os.replace(self._file("centroids.npy.tmp.npy"), self._file("centroids.npy"))
+            assignments.astype(np.int32).tofile(self._file("lists.i32"))
+            write_json(self._file("meta.json"), {"nlist": nlist, "rows": len(assignments)})
+        self._meta_stat = self._centroids_stat = None
+        self.load()
+        logger.info(f"Trained IVF index with {nlist} lists over {len(rows)} embeddings")
+
+    def sync(self):
+        """Assign store rows appended since the index was last written."""
+        self.load()
+        if not self.trained:
+            return
+        mapping = self.store.refresh()
+        if len(mapping.ids) <= self._indexed_rows:
+            return
+        with file_lock(self._file(".lock")):
+            with open(self._file("meta.json")) as f:
+                meta = json.load(f)
+            rows = meta["rows"]
+            new = self._nearest(self.centroids, mapping.vectors[rows:]).astype(np.int32)
+            with open(self._file("lists.i32"), "ab") as f:
+                f.truncate(rows * 4)
+                f.write(new.tobytes())
+            write_json(self._file("meta.json"), {"nlist": meta["nlist"], "rows": rows + len(new)})
+        self.load()
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        exclude: Iterable[int] = (),
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and cosine similarities of the ``k`` nearest live rows, best first."""
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self.load()
+        mapping = self.store.refresh()
+        with self._lock:
+            centroids, lists, indexed_rows = self.centroids, self._lists, self._indexed_rows
+        if centroids is not None:
+            probe = np.argsort(-cosine_similarity(query, centroids, normalized=True))[:nprobe or self.nprobe]
+            # Rows not assigned to a list yet are scanned exactly
+            rows = np.concatenate([lists[l] for l in probe] + [np.arange(indexed_rows, len(mapping.ids))])
+            rows = rows[rows < len(mapping.ids)]
+        else:
+            rows = np.arange(len(mapping.ids))
+        rows = rows[mapping.live[rows] == 1]
+        excluded = np.fromiter(exclude, dtype=np.int64)
+        if len(excluded):
+            rows = rows[~np.isin(mapping.ids[rows], excluded)]
+
+        # Store rows are unit length, so each block is one mat-vec
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SIMILARITY_BLOCK_ROWS):
+            block = rows[start:start + SIMILARITY_BLOCK_ROWS]
+            scores[start:start + len(block)] = cosine_similarity(query, mapping.vectors[block], normalized=True)
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return np.asarray(mapping.ids[rows[top]]), scores[top]
+
+    def _set_lists(self, centroids: np.ndarray, assignments: np.ndarray):
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(len(centroids))]
+        self._indexed_rows = 0
+        self.centroids = centroids
+        self._extend_lists(assignments)
+
+    def _extend_lists(self, assignments: np.ndarray):
+        """Add store rows ``_indexed_rows ..`` assigned to ``assignments``."""
+        if not len(assignments):
+            return
+        order = np.argsort(assignments, kind="stable")
+        touched, starts = np.unique(assignments[order], return_index=True)
+        rows = order + self._indexed_rows
+        lists = list(self._lists)
+        for l, group in zip(touched.tolist(), np.split(rows, starts[1:])):
+            lists[l] = np.concatenate([lists[l], group])
+        # Searches in flight keep the lists they started with
+        self._lists = lists
+        self._indexed_rows += len(assignments)
+
+    @staticmethod
+    def _nearest(centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """Index of the closest centroid for every vector, in bounded blocks."""
+        assign = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), SIMILARITY_BLOCK_ROWS):
+            block = vectors[start:start + SIMILARITY_BLOCK_ROWS]
+            assign[start:start + len(block)] = np.argmax(
+                cosine_similarity_matrix(block, centroids, normalized=True), axis=1
+            )
+        return assign
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+_indexes: Dict[Tuple[str, str], IVFIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_ann_index(store: EmbeddingStore, kind: str, model_version: str) -> IVFIndex:
+    """Process-wide index over ``store``."""
+    key = (kind, model_version)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = IVFIndex.open(store, kind, model_version)
+        return _indexes[key]
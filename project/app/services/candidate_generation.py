@@ -0,0 +1,105 @@
+import numpy as np
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, func
+from datetime import datetime, timedelta
+
+from app.database.models import Post, PostTag, TrendingScore, UserInteraction
+from app.schemas.recommendation import FeedRequest
+from app.services.ann_index import IVFIndex
+from app.services.candidate_retrieval import CandidateContext, CandidateGenerator
+from app.services.collaborative_filtering import CollaborativeFilter
+from app.core.config import settings
+
+def feed_query(request: FeedRequest, db: Session):
+    """Public, unlocked posts matching the request's project_code and category."""
+    query = db.query(Post).filter(
+        and_(
+            Post.is_available_in_public_feed == True,
+            Post.is_locked == False
+        )
+    )
+
+    if request.project_code:
+        query = query.join(Post.topic).filter(
+            Post.topic.has(project_code=request.project_code)
+        )
+
+    if request.category:
+        query = query.join(Post.category).filter(
+            Post.category.has(name=request.category)
+        )
+
+    return query
+
+class EmbeddingCandidateGenerator(CandidateGenerator):
+    """Nearest posts to the user embedding in the ANN index."""
+    name = "ann"
+
+    def __init__(self, index: IVFIndex):
+        self.index = index
+
+    async def generate(self, context: CandidateContext, limit: int, db: Session) -> List[int]:
+        if context.user_embedding is None or not np.any(context.user_embedding):
+            return []
+        ids, _ = self.index.search(context.user_embedding, limit)
+        return ids.tolist()
+
+class CollaborativeCandidateGenerator(CandidateGenerator):
+    """Posts engaged with by the user's nearest neighbours."""
+    name = "collaborative"
+
+    def __init__(self, collaborative_filter: CollaborativeFilter):
+        self.collaborative_filter = collaborative_filter
+
+    async def generate(self, context: CandidateContext, limit: int, db: Session) -> List[int]:
+        return await self.collaborative_filter.get_neighbour_items(context.user_id, limit, db)
+
+class TrendingCandidateGenerator(CandidateGenerator):
+    """Recent posts with the highest time-decayed engagement (precomputed trending keys)."""
+    name = "trending"
+
+    def __init__(self, days: Optional[int] = None):
+        self.days = days or settings.TRENDING_WINDOW_DAYS
+
+    async def generate(self, context: CandidateContext, limit: int, db: Session) -> List[int]:
+        recent_date = datetime.utcnow() - timedelta(days=self.days)
+        rows = feed_query(context.request, db).join(
+            TrendingScore, TrendingScore.post_id == Post.id
+        ).filter(
+            TrendingScore.created_at >= recent_date
+        ).order_by(desc(TrendingScore.score), desc(TrendingScore.post_id)).with_entities(
+            Post.id
+        ).limit(limit).all()
+        return [post_id for post_id, in rows]
+
+class TagCandidateGenerator(CandidateGenerator):
+    """Popular posts sharing the tags of the posts the user recently engaged with."""
+    name = "tags"
+
+    def __init__(self, history: int = 200, top_tags: int = 20):
+        self.history = history
+        self.top_tags = top_tags
+
+    async def generate(self, context: CandidateContext, limit: int, db: Session) -> List[int]:
+        recent_posts = db.query(UserInteraction.post_id).filter(
+            UserInteraction.user_id == context.user_id
+        ).order_by(desc(UserInteraction.timestamp)).limit(self.history).subquery()
+
+        tag_ids = [
+            tag_id for tag_id, _ in db.query(PostTag.tag_id, func.count(PostTag.post_id)).filter(
+                PostTag.post_id.in_(recent_posts)
+            ).group_by(PostTag.tag_id).order_by(desc(func.count(PostTag.post_id))).limit(self.top_tags).all()
+        ]
+        if not tag_ids:
+            return []
+
+        # Posts matching more of the user's tags first, then the most viewed
+        matches = func.count(PostTag.tag_id)
+        rows = feed_query(context.request, db).join(PostTag, PostTag.post_id == Post.id).filter(
+            PostTag.tag_id.in_(tag_ids),
+            ~Post.id.in_(recent_posts)
+        ).group_by(Post.id).order_by(desc(matches), desc(Post.view_count)).with_entities(
+            Post.id
+        ).limit(limit).all()
+        return [post_id for post_id, in rows]
@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+import logging
+
+from app.schemas.recommendation import FeedRequest
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CandidateContext(NamedTuple):
+    user_id: int
+    user_profile: Dict
+    user_embedding: Optional[np.ndarray]
+    request: FeedRequest
+
+class CandidateGenerator(ABC):
+    """
+    A fast source of candidate post ids for the ranking stage. ``generate``
+    returns at most ``limit`` ids, best first; it may ignore the request
+    filters, which are applied when the merged candidates are loaded.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, context: CandidateContext, limit: int, db: Session) -> List[int]:
+        ...
+
+class CandidateRetriever:
+    """
+    Retrieval stage of the feed: merges the ids of several generators into
+    one deduplicated candidate set for the ranking models.
+
+    Each generator fills up to its quota (CANDIDATE_QUOTAS) with ids not
+    already taken by an earlier generator; quota a generator leaves unused
+    is handed to the overflow of the others, in generator order. A failing
+    generator contributes nothing instead of failing the request.
+
+    Generators run one after another on the request's session, so
+    retrieval latency is the sum of theirs; keep each one index- or
+    key-backed rather than scanning posts.
+    """
+
+    def __init__(self, generators: Sequence[CandidateGenerator], quotas: Optional[Dict[str, int]] = None):
+        self.generators = list(generators)
+        self.quotas = quotas if quotas is not None else settings.CANDIDATE_QUOTAS
+
+    async def retrieve(self, context: CandidateContext, db: Session) -> Tuple[List[int], Dict[str, int]]:
+        """Candidate ids in merge order and the number contributed by each source."""
+        # Over-fetch so dedup and backfill have ids to spare
+        proposals = []
+        for generator in self.generators:
+            quota = self.quotas.get(generator.name, 0)
+            if quota <= 0:
+                continue
+            try:
+                ids = await generator.generate(context, quota * settings.ANN_OVERFETCH, db)
+            except Exception as e:
+                logger.error(f"Error in {generator.name} candidate generator: {str(e)}")
+                ids = []
+            proposals.append((generator.name, quota, ids))
+
+        candidates: List[int] = []
+        seen = set()
+        sources: Dict[str, int] = {}
+        overflow = []
+        for name, quota, ids in proposals:
+            taken = 0
+            for i, post_id in enumerate(ids):
+                if taken == quota:
+                    overflow.append((name, ids[i:]))
+                    break
+                if post_id not in seen:
+                    seen.add(post_id)
+                    candidates.append(post_id)
+                    taken += 1
+            sources[name] = taken
+
+        budget = sum(quota for _, quota, _ in proposals) - len(candidates)
+        for name, ids in overflow:
+            for post_id in ids:
+                if budget <= 0:
+                    break
+                if post_id not in seen:
+                    seen.add(post_id)
+                    candidates.append(post_id)
+                    sources[name] += 1
+                    budget -= 1
+
+        return candidates, sources
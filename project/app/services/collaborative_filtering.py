@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, NamedTuple, Tuple, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 import logging
@@ -9,16 +9,43 @@ from sklearn.decomposition import TruncatedSVD
 from scipy.sparse import csr_matrix
 import pickle
 import os
+import threading
+import time
 
+from app.database.database import SessionLocal
 from app.database.models import User, Post, UserInteraction
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Relative strength of each interaction type as implicit feedback
+INTERACTION_WEIGHTS = {
+    'view': 1.0,
+    'like': 2.0,
+    'share': 3.0,
+    'bookmark': 2.5,
+    'rate': 2.0,
+    'comment': 1.5
+}
+
+class CollaborativeState(NamedTuple):
+    """One build of the interaction matrix, its index maps and user similarities."""
+    user_item_matrix: csr_matrix
+    user_to_idx: Dict[int, int]
+    item_to_idx: Dict[int, int]
+    idx_to_item: Dict[int, int]
+    user_similarity_matrix: np.ndarray
+
 class CollaborativeFilter:
     """
     Collaborative Filtering implementation for video recommendations.
     Supports both user-based and item-based collaborative filtering.
+    
+    The interaction matrix and user similarities are built by ``refresh``
+    (at warm-up and then on a schedule) and published together as one
+    CollaborativeState; a request reads ``state`` once and scores against
+    that build even if a refresh swaps in a new one meanwhile. Builds and
+    the derived item similarities and SVD factors are guarded by a lock.
     """
     
     def __init__(self):
@@ -28,39 +55,85 @@ class CollaborativeFilter:
         self.svd_model = TruncatedSVD(n_components=50, random_state=42)
         self.user_factors = None
         self.item_factors = None
+        self.state: Optional[CollaborativeState] = None
+        self.refreshed_at: Optional[float] = None
+        self._lock = threading.RLock()
+        # Build the derived matrices above were computed from
+        self._item_similarity_state = None
+        self._factors_state = None
         self.load_models()
+        if self.user_item_matrix is not None:
+            self._publish(
+                self.user_item_matrix, getattr(self, 'user_to_idx', {}), getattr(self, 'item_to_idx', {}),
+                self.user_similarity_matrix
+            )
+            # Pickled item similarities and factors belong to the pickled matrix
+            self._item_similarity_state = self._factors_state = self.state
+    
+    def refresh(self, db: Session) -> bool:
+        """
+        Rebuild the interaction matrix and user similarities from the
+        database and publish them; False if there are no interactions yet.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            built = self._build_user_item_matrix(db)
+            if built is None:
+                return False
+            self._publish(*built)
+            self.refreshed_at = time.time()
+            logger.info(f"Refreshed collaborative filtering state in {time.perf_counter() - start:.2f}s")
+            return True
     
     async def get_user_similarities(self, user_id: int, candidate_items: List[int], db: Session) -> List[float]:
         """
         Get recommendation scores using user-based collaborative filtering.
         """
         try:
-            # Build or load user-item interaction matrix
-            if self.user_item_matrix is None:
-                await self._build_user_item_matrix(db)
-            
-            if self.user_item_matrix is None:
+            state = self._current_state(db)
+        except Exception as e:
+            logger.error(f"Error building collaborative filtering state: {str(e)}")
+            state = None
+        return self._user_scores(state, user_id, candidate_items)
+    
+    def score_candidates(self, user_id: int, candidate_items: List[int]) -> List[float]:
+        """
+        Synchronous ``get_user_similarities`` over the published state, for
+        scoring on a worker thread. Sessions are not thread-safe, so the
+        state is built on a session of its own if warm-up has not run.
+        """
+        state = self.state
+        if state is None:
+            db = SessionLocal()
+            try:
+                state = self._current_state(db)
+            except Exception as e:
+                logger.error(f"Error building collaborative filtering state: {str(e)}")
+            finally:
+                db.close()
+        return self._user_scores(state, user_id, candidate_items)
+    
+    def _user_scores(self, state: Optional[CollaborativeState], user_id: int, candidate_items: List[int]) -> List[float]:
+        """User-based CF scores of ``candidate_items`` from ``state``; random when there is none."""
+        try:
+            if state is None:
                 # Fallback to random scores
                 return [np.random.random() for _ in candidate_items]
             
             # Get user index
-            user_idx = self._get_user_index(user_id)
+            user_idx = state.user_to_idx.get(user_id)
             if user_idx is None:
                 return [np.random.random() for _ in candidate_items]
             
-            # Calculate user similarities if not cached
-            if self.user_similarity_matrix is None:
-                await self._calculate_user_similarities()
-            
             # Get similar users
-            similar_users = self._get_similar_users(user_idx, top_k=50)
+            similar_users = self._get_similar_users(state, user_idx, top_k=50)
             
             # Calculate scores for candidate items
             scores = []
             for item_id in candidate_items:
-                item_idx = self._get_item_index(item_id)
+                item_idx = state.item_to_idx.get(item_id)
                 if item_idx is not None:
-                    score = self._predict_user_item_score(user_idx, item_idx, similar_users)
+                    score = self._predict_user_item_score(state, user_idx, item_idx, similar_users)
                 else:
                     score = 0.0
                 scores.append(score)
@@ -71,33 +144,57 @@ class CollaborativeFilter:
             logger.error(f"Error in collaborative filtering: {str(e)}")
             return [np.random.random() for _ in candidate_items]
     
+    async def get_neighbour_items(self, user_id: int, limit: int, db: Session) -> List[int]:
+        """
+        Items the user has not interacted with, ranked by the similarity-weighted
+        interactions of their nearest neighbours. Used for candidate retrieval.
+        """
+        try:
+            state = self._current_state(db)
+            user_idx = state.user_to_idx.get(user_id) if state is not None else None
+            if user_idx is None:
+                return []
+            
+            similar_users = self._get_similar_users(state, user_idx, top_k=50)
+            if not similar_users:
+                return []
+            
+            # One sparse product over the neighbours' rows
+            neighbour_idx = np.array([idx for idx, _ in similar_users])
+            weights = np.array([similarity for _, similarity in similar_users])
+            scores = np.asarray(state.user_item_matrix[neighbour_idx].T @ weights).ravel()
+            scores[state.user_item_matrix[user_idx].indices] = 0.0
+            
+            ranked = np.flatnonzero(scores > 0)
+            ranked = ranked[np.argsort(-scores[ranked], kind="stable")][:limit]
+            return [state.idx_to_item[idx] for idx in ranked.tolist()]
+            
+        except Exception as e:
+            logger.error(f"Error getting neighbour items: {str(e)}")
+            return []
+    
     async def get_item_similarities(self, item_id: int, candidate_items: List[int], db: Session) -> List[float]:
         """
         Get recommendation scores using item-based collaborative filtering.
         """
         try:
-            # Build or load user-item interaction matrix
-            if self.user_item_matrix is None:
-                await self._build_user_item_matrix(db)
-            
-            if self.user_item_matrix is None:
+            state = self._current_state(db)
+            if state is None:
                 return [np.random.random() for _ in candidate_items]
             
-            # Calculate item similarities if not cached
-            if self.item_similarity_matrix is None:
-                await self._calculate_item_similarities()
+            item_similarity_matrix = self._calculate_item_similarities(state)
             
             # Get item index
-            item_idx = self._get_item_index(item_id)
+            item_idx = state.item_to_idx.get(item_id)
             if item_idx is None:
                 return [np.random.random() for _ in candidate_items]
             
             # Calculate similarities with candidate items
             scores = []
             for candidate_id in candidate_items:
-                candidate_idx = self._get_item_index(candidate_id)
-                if candidate_idx is not None and candidate_idx < len(self.item_similarity_matrix):
-                    similarity = self.item_similarity_matrix[item_idx][candidate_idx]
+                candidate_idx = state.item_to_idx.get(candidate_id)
+                if candidate_idx is not None and candidate_idx < len(item_similarity_matrix):
+                    similarity = item_similarity_matrix[item_idx][candidate_idx]
                 else:
                     similarity = 0.0
                 scores.append(float(similarity))
@@ -113,30 +210,25 @@ class CollaborativeFilter:
         Get recommendation scores using matrix factorization (SVD).
         """
         try:
-            # Build or load user-item interaction matrix
-            if self.user_item_matrix is None:
-                await self._build_user_item_matrix(db)
-            
-            if self.user_item_matrix is None:
+            state = self._current_state(db)
+            if state is None:
                 return [np.random.random() for _ in candidate_items]
             
-            # Perform matrix factorization if not done
-            if self.user_factors is None or self.item_factors is None:
-                await self._perform_matrix_factorization()
+            user_factors, item_factors = self._perform_matrix_factorization(state)
             
             # Get user index
-            user_idx = self._get_user_index(user_id)
-            if user_idx is None or user_idx >= len(self.user_factors):
+            user_idx = state.user_to_idx.get(user_id)
+            if user_idx is None or user_idx >= len(user_factors):
                 return [np.random.random() for _ in candidate_items]
             
             # Calculate scores for candidate items
             scores = []
-            user_vector = self.user_factors[user_idx]
+            user_vector = user_factors[user_idx]
             
             for item_id in candidate_items:
-                item_idx = self._get_item_index(item_id)
-                if item_idx is not None and item_idx < len(self.item_factors):
-                    item_vector = self.item_factors[item_idx]
+                item_idx = state.item_to_idx.get(item_id)
+                if item_idx is not None and item_idx < len(item_factors):
+                    item_vector = item_factors[item_idx]
                     score = np.dot(user_vector, item_vector)
                 else:
                     score = 0.0
@@ -148,9 +240,41 @@ class CollaborativeFilter:
             logger.error(f"Error in matrix factorization: {str(e)}")
             return [np.random.random() for _ in candidate_items]
     
-    async def _build_user_item_matrix(self, db: Session):
+    def _current_state(self, db: Session) -> Optional[CollaborativeState]:
+        """The published build, built on this session first if warm-up has not run."""
+        state = self.state
+        if state is None:
+            with self._lock:
+                state = self.state
+                if state is None and self.refresh(db):
+                    state = self.state
+        return state
+    
+    def _publish(
+        self, 
+        user_item_matrix: csr_matrix, 
+        user_to_idx: Dict[int, int], 
+        item_to_idx: Dict[int, int], 
+        user_similarity_matrix: Optional[np.ndarray] = None
+    ):
+        """Make a build current: the attributes used by save_models, then the state requests read."""
+        if user_similarity_matrix is None:
+            # Calculate cosine similarity between users
+            user_similarity_matrix = cosine_similarity(user_item_matrix)
+        self.user_item_matrix = user_item_matrix
+        self.user_similarity_matrix = user_similarity_matrix
+        self.user_to_idx = user_to_idx
+        self.idx_to_user = {idx: user_id for user_id, idx in user_to_idx.items()}
+        self.item_to_idx = item_to_idx
+        self.idx_to_item = {idx: item_id for item_id, idx in item_to_idx.items()}
+        # A single reference assignment, so requests see all of the build or none of it
+        self.state = CollaborativeState(
+            user_item_matrix, user_to_idx, item_to_idx, self.idx_to_item, user_similarity_matrix
+        )
+    
+    def _build_user_item_matrix(self, db: Session) -> Optional[Tuple[csr_matrix, Dict[int, int], Dict[int, int]]]:
         """
-        Build user-item interaction matrix from database.
+        Build user-item interaction matrix and its index maps from database.
         """
         try:
             # Get all interactions
@@ -158,16 +282,14 @@ class CollaborativeFilter:
             
             if not interactions:
                 logger.warning("No interactions found for building user-item matrix")
-                return
+                return None
             
             # Create mappings
             users = list(set([interaction.user_id for interaction in interactions]))
             items = list(set([interaction.post_id for interaction in interactions]))
             
-            self.user_to_idx = {user_id: idx for idx, user_id in enumerate(users)}
-            self.idx_to_user = {idx: user_id for user_id, idx in self.user_to_idx.items()}
-            self.item_to_idx = {item_id: idx for idx, item_id in enumerate(items)}
-            self.idx_to_item = {idx: item_id for item_id, idx in self.item_to_idx.items()}
+            user_to_idx = {user_id: idx for idx, user_id in enumerate(users)}
+            item_to_idx = {item_id: idx for idx, item_id in enumerate(items)}
             
             # Build interaction matrix
             n_users = len(users)
@@ -179,8 +301,8 @@ class CollaborativeFilter:
             data = []
             
             for interaction in interactions:
-                user_idx = self.user_to_idx[interaction.user_id]
-                item_idx = self.item_to_idx[interaction.post_id]
+                user_idx = user_to_idx[interaction.user_id]
+                item_idx = item_to_idx[interaction.post_id]
                 
                 # Weight different interaction types
                 weight = self._get_interaction_weight(interaction.interaction_type)
@@ -191,90 +313,52 @@ class CollaborativeFilter:
                 col_indices.append(item_idx)
                 data.append(weight)
             
-            self.user_item_matrix = csr_matrix(
+            user_item_matrix = csr_matrix(
                 (data, (row_indices, col_indices)), 
                 shape=(n_users, n_items)
             )
             
             logger.info(f"Built user-item matrix: {n_users} users, {n_items} items, {len(data)} interactions")
+            return user_item_matrix, user_to_idx, item_to_idx
             
         except Exception as e:
             logger.error(f"Error building user-item matrix: {str(e)}")
-            self.user_item_matrix = None
+            return None
     
-    async def _calculate_user_similarities(self):
+    def _calculate_item_similarities(self, state: CollaborativeState) -> np.ndarray:
         """
-        Calculate user-user similarity matrix using cosine similarity.
+        Item-item cosine similarity matrix of ``state``, computed once per build.
         """
-        try:
-            if self.user_item_matrix is None:
-                return
-            
-            # Calculate cosine similarity between users
-            user_similarities = cosine_similarity(self.user_item_matrix)
-            self.user_similarity_matrix = user_similarities
-            
-            logger.info("Calculated user similarity matrix")
-            
-        except Exception as e:
-            logger.error(f"Error calculating user similarities: {str(e)}")
-    
-    async def _calculate_item_similarities(self):
-        """
-        Calculate item-item similarity matrix using cosine similarity.
-        """
-        try:
-            if self.user_item_matrix is None:
-                return
-            
-            # Transpose matrix to get item-user matrix
-            item_user_matrix = self.user_item_matrix.T
-            
-            # Calculate cosine similarity between items
-            item_similarities = cosine_similarity(item_user_matrix)
-            self.item_similarity_matrix = item_similarities
-            
-            logger.info("Calculated item similarity matrix")
-            
-        except Exception as e:
-            logger.error(f"Error calculating item similarities: {str(e)}")
+        with self._lock:
+            if self.item_similarity_matrix is None or self._item_similarity_state is not state:
+                # Transpose matrix to get item-user matrix
+                self.item_similarity_matrix = cosine_similarity(state.user_item_matrix.T)
+                self._item_similarity_state = state
+                logger.info("Calculated item similarity matrix")
+            return self.item_similarity_matrix
     
-    async def _perform_matrix_factorization(self):
+    def _perform_matrix_factorization(self, state: CollaborativeState) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Perform matrix factorization using SVD.
+        User and item factors of ``state`` from an SVD, fitted once per build.
         """
-        try:
-            if self.user_item_matrix is None:
-                return
-            
-            # Fit SVD model
-            self.svd_model.fit(self.user_item_matrix)
-            
-            # Get user and item factors
-            self.user_factors = self.svd_model.transform(self.user_item_matrix)
-            self.item_factors = self.svd_model.components_.T
-            
-            logger.info(f"Performed matrix factorization with {self.svd_model.n_components} components")
-            
-        except Exception as e:
-            logger.error(f"Error in matrix factorization: {str(e)}")
-    
-    def _get_user_index(self, user_id: int) -> Optional[int]:
-        """Get user index from user ID."""
-        return getattr(self, 'user_to_idx', {}).get(user_id)
-    
-    def _get_item_index(self, item_id: int) -> Optional[int]:
-        """Get item index from item ID."""
-        return getattr(self, 'item_to_idx', {}).get(item_id)
+        with self._lock:
+            if self.user_factors is None or self.item_factors is None or self._factors_state is not state:
+                # Fit SVD model
+                self.svd_model.fit(state.user_item_matrix)
+                
+                # Get user and item factors
+                self.user_factors = self.svd_model.transform(state.user_item_matrix)
+                self.item_factors = self.svd_model.components_.T
+                self._factors_state = state
+                
+                logger.info(f"Performed matrix factorization with {self.svd_model.n_components} components")
+            return self.user_factors, self.item_factors
     
-    def _get_similar_users(self, user_idx: int, top_k: int = 50) -> List[Tuple[int, float]]:
+    def _get_similar_users(self, state: CollaborativeState, user_idx: int, top_k: int = 50) -> List[Tuple[int, float]]:
         """
         Get top-k similar users for a given user.
         """
-        if self.user_similarity_matrix is None:
-            return []
-        
-        user_similarities = self.user_similarity_matrix[user_idx]
+        user_similarities = state.user_similarity_matrix[user_idx]
         
         # Get indices of most similar users (excluding self)
         similar_indices = np.argsort(user_similarities)[::-1][1:top_k+1]
@@ -287,7 +371,13 @@ class CollaborativeFilter:
         
         return similar_users
     
-    def _predict_user_item_score(self, user_idx: int, item_idx: int, similar_users: List[Tuple[int, float]]) -> float:
+    def _predict_user_item_score(
+        self, 
+        state: CollaborativeState, 
+        user_idx: int, 
+        item_idx: int, 
+        similar_users: List[Tuple[int, float]]
+    ) -> float:
         """
         Predict user-item interaction score using similar users.
         """
@@ -298,8 +388,8 @@ class CollaborativeFilter:
         denominator = 0.0
         
         for similar_user_idx, similarity in similar_users:
-            if similar_user_idx < self.user_item_matrix.shape[0] and item_idx < self.user_item_matrix.shape[1]:
-                rating = self.user_item_matrix[similar_user_idx, item_idx]
+            if similar_user_idx < state.user_item_matrix.shape[0] and item_idx < state.user_item_matrix.shape[1]:
+                rating = state.user_item_matrix[similar_user_idx, item_idx]
                 if rating > 0:
                     numerator += similarity * rating
                     denominator += abs(similarity)
@@ -313,16 +403,7 @@ class CollaborativeFilter:
         """
         Get weight for different interaction types.
         """
-        weights = {
-            'view': 1.0,
-            'like': 2.0,
-            'share': 3.0,
-            'bookmark': 2.5,
-            'rate': 2.0,
-            'comment': 1.5
-        }
-        
-        return weights.get(interaction_type, 1.0)
+        return INTERACTION_WEIGHTS.get(interaction_type, 1.0)
     
     def save_models(self):
         """
@@ -0,0 +1,60 @@
+import numpy as np
+from datetime import datetime
+from typing import List, Sequence
+
+def ages_in_days(created_at: Sequence[datetime], now: datetime) -> np.ndarray:
+    """Whole days between each ``created_at`` and ``now``, floored like ``timedelta.days``."""
+    # One pass of timedelta.days; converting datetime objects to datetime64 is far slower
+    return np.fromiter(((now - created).days for created in created_at), dtype=np.int64, count=len(created_at))
+
+def engagement_scores(
+    view_counts: Sequence[int],
+    upvote_counts: Sequence[int],
+    average_ratings: Sequence[float],
+) -> np.ndarray:
+    """log(views + 1) / 10 + log(upvotes + 1) / 5 + rating / 25, per post."""
+    views = np.asarray(view_counts, dtype=np.float64)
+    upvotes = np.asarray(upvote_counts, dtype=np.float64)
+    ratings = np.asarray(average_ratings, dtype=np.float64)
+    return np.log(views + 1) / 10 + np.log(upvotes + 1) / 5 + ratings / 25
+
+def content_based_scores(
+    preferred_categories: List[str],
+    category_names: List[str],
+    view_counts: List[int],
+    upvote_counts: List[int],
+    average_ratings: List[float],
+    created_at: List[datetime],
+    now: datetime
+) -> List[float]:
+    """
+    Content-based scores from plain post fields, so the stage can run in
+    another process: +2 for a preferred category, engagement, and +1 for
+    posts under a week old or +0.5 under 30 days.
+    """
+    if not len(category_names):
+        return []
+    preferred = np.isin(np.array(category_names, dtype=object), list(preferred_categories))
+    days_old = ages_in_days(created_at, now)
+    recency = np.where(days_old < 7, 1.0, np.where(days_old < 30, 0.5, 0.0))
+    scores = np.where(preferred, 2.0, 0.0) + engagement_scores(view_counts, upvote_counts, average_ratings) + recency
+    return scores.tolist()
+
+def category_scores(
+    engagement_score: float,
+    view_counts: List[int],
+    upvote_counts: List[int],
+    average_ratings: List[float],
+    created_at: List[datetime],
+    now: datetime
+) -> List[float]:
+    """
+    Scores of posts within one category: engagement plus the user's own
+    engagement score, boosted by up to 2x for new posts (decaying over 30 days).
+    """
+    if not len(view_counts):
+        return []
+    days_old = ages_in_days(created_at, now)
+    recency_factor = np.maximum(0, 1 - days_old / 30)
+    scores = engagement_scores(view_counts, upvote_counts, average_ratings) + engagement_score
+    return (scores * (1 + recency_factor)).tolist()
@@ -10,6 +10,10 @@ import json
 from app.core.config import settings
 from app.database.models import User, Post, Category, Topic, UserInteraction
 from app.schemas.recommendation import PostResponse
+from app.catalog import sync_post_tags
+from app.services.embedding_store import get_embedding_store
+from app.services.ann_index import get_ann_index
+from app.services.trending import refresh_trending_scores
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,7 @@ class DataCollector:
             "Content-Type": "application/json"
         }
         self.client = httpx.AsyncClient(timeout=30.0)
+        self.content_model = None
     
     async def collect_viewed_posts(self, page: int = 1, page_size: int = 1000, db: Session = None):
         """
@@ -277,8 +282,12 @@ class DataCollector:
                 )
                 
                 db.add(post)
+                db.flush()
+                sync_post_tags(db, [post])
+                refresh_trending_scores(db, [post_id])
                 db.commit()
                 logger.debug(f"Created post {post_id}")
+                await self._index_post(post)
             else:
                 # Update existing post with latest data
                 existing_post.view_count = post_data.get("view_count", existing_post.view_count)
@@ -288,7 +297,10 @@ class DataCollector:
                 existing_post.bookmark_count = post_data.get("bookmark_count", existing_post.bookmark_count)
                 existing_post.rating_count = post_data.get("rating_count", existing_post.rating_count)
                 existing_post.average_rating = post_data.get("average_rating", existing_post.average_rating)
+                existing_post.tags = post_data.get("tags", existing_post.tags)
                 existing_post.updated_at = datetime.utcnow()
+                sync_post_tags(db, [existing_post])
+                refresh_trending_scores(db, [post_id])
                 
                 db.commit()
                 logger.debug(f"Updated post {post_id}")
@@ -304,6 +316,18 @@ class DataCollector:
             if db:
                 db.rollback()
     
+    async def _index_post(self, post: Post):
+        """Embed a new post and add it to the similar-content index."""
+        try:
+            if self.content_model is None:
+                from app.services.neural_networks import ContentEmbeddingModel
+                self.content_model = ContentEmbeddingModel()
+            store = get_embedding_store("post", settings.EMBEDDING_MODEL_VERSION)
+            await self.content_model.generate_post_embeddings([post], store=store)
+            get_ann_index(store, "post", settings.EMBEDDING_MODEL_VERSION).sync()
+        except Exception as e:
+            logger.error(f"Error indexing post {post.id}: {str(e)}")
+    
     async def _process_user_data(self, user_data: Dict, db: Session):
         """
         Process and store user data in the database.
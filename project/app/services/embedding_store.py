@@ -0,0 +1,223 @@
+import numpy as np
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+
+from app.core.config import settings
+from app.services.similarity import l2_normalize
+
+logger = logging.getLogger(__name__)
+
+@contextlib.contextmanager
+def file_lock(path: str):
+    """Exclusive lock shared by every process that opens ``path``."""
+    with open(path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def write_json(path: str, data: Dict):
+    """Replace ``path`` atomically, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+class _Mapping(NamedTuple):
+    vectors: np.ndarray
+    ids: np.ndarray
+    live: np.ndarray
+    sorted_ids: np.ndarray
+    sorted_rows: np.ndarray
+
+class EmbeddingStore:
+    """
+    Float32 embedding matrix on disk, one row per entity id, in one
+    directory per kind ("post", "user") and model_version.
+
+    Files:
+        vectors.f32  rows x dim float32, C order
+        ids.i64      entity id of each row
+        live.u8      1 for live rows, 0 for tombstones
+        meta.json    dim and the number of committed rows
+
+    Vectors are L2-normalized when written, so cosine similarity against the
+    matrix is a plain mat-vec. Readers memory-map the files read-only, so
+    every worker process shares the same pages and nothing is decoded at
+    startup. Writers serialize on a file lock.
+
+    Writing a vector for an id with a live row overwrites that row in
+    place; only ids without one (new, or deleted earlier) append rows,
+    published by rewriting meta.json last. Deleting an id clears its live
+    flag in place and the row is never reused. Neither overwrites nor
+    tombstones change the id -> row index, so readers keep their mapping
+    and see the change through the shared pages. A reader copying a row
+    while it is overwritten can get a mix of the old and new vector,
+    never another id's; a tombstone hides the row from the next lookup.
+    """
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta_stat = None
+        self._mapping: Optional[_Mapping] = None
+        if not os.path.exists(self._file("meta.json")):
+            with self._write_lock():
+                if not os.path.exists(self._file("meta.json")):
+                    self._write_meta(0)
+        self.refresh()
+
+    @classmethod
+    def open(cls, kind: str, model_version: str, dim: Optional[int] = None) -> "EmbeddingStore":
+        path = os.path.join(settings.MODEL_PATH, "embeddings", kind, model_version)
+        return cls(path, dim or settings.EMBEDDING_DIM)
+
+    def __len__(self) -> int:
+        return len(self.refresh().sorted_ids)
+
+    def refresh(self) -> _Mapping:
+        """
+        Current mapping of the files, re-mapped when a writer (in any process)
+        has committed rows since the last look.
+        """
+        st = os.stat(self._file("meta.json"))
+        stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat == self._meta_stat and self._mapping is not None:
+            return self._mapping
+        with self._lock:
+            if stat == self._meta_stat and self._mapping is not None:
+                return self._mapping
+            with open(self._file("meta.json")) as f:
+                meta = json.load(f)
+            if meta["dim"] != self.dim:
+                raise ValueError(f"Embedding store {self.path} has dim {meta['dim']}, expected {self.dim}")
+            rows = meta["rows"]
+            if rows:
+                vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, self.dim))
+                ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r", shape=(rows,))
+                live = np.memmap(self._file("live.u8"), dtype=np.uint8, mode="r", shape=(rows,))
+            else:
+                vectors = np.empty((0, self.dim), dtype=np.float32)
+                ids = np.empty(0, dtype=np.int64)
+                live = np.empty(0, dtype=np.uint8)
+            live_rows = np.flatnonzero(live)
+            order = np.argsort(ids[live_rows], kind="stable")
+            # Readers only ever see a complete mapping
+            self._mapping = _Mapping(vectors, ids, live, np.asarray(ids[live_rows][order]), live_rows[order])
+            self._meta_stat = stat
+            return self._mapping
+
+    def rows(self, ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Row of each id and a mask of the ids that have a live vector."""
+        return self._rows(self.refresh(), ids)
+
+    def get(self, ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(len(ids) x dim) float32 vectors, zero where missing, and the found mask."""
+        mapping = self.refresh()
+        rows, found = self._rows(mapping, ids)
+        vectors = np.zeros((len(rows), self.dim), dtype=np.float32)
+        if found.any():
+            vectors[found] = mapping.vectors[rows[found]]
+        return vectors, found
+
+    def get_one(self, entity_id: int) -> Optional[np.ndarray]:
+        vectors, found = self.get([entity_id])
+        return vectors[0] if found[0] else None
+
+    def matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and vectors of every live row, in row order."""
+        mapping = self.refresh()
+        rows = np.flatnonzero(mapping.live)
+        return np.asarray(mapping.ids[rows]), mapping.vectors[rows]
+
+    def put(self, ids: Iterable[int], vectors):
+        """Write vectors for ``ids``, replacing any vector they already had."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        vectors = l2_normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        if not len(ids):
+            return
+        # The last vector wins when an id is repeated
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = np.sort(len(ids) - 1 - last)
+        ids, vectors = ids[keep], vectors[keep]
+        with self._write_lock():
+            rows = self._committed_rows()
+            # Holding the write lock, so the mapping is the committed state
+            existing, found = self._rows(self.refresh(), ids)
+            if found.any():
+                matrix = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(rows, self.dim))
+                matrix[existing[found]] = vectors[found]
+                matrix.flush()
+            ids, vectors = ids[~found], vectors[~found]
+            if not len(ids):
+                return
+            for name, data in (("vectors.f32", vectors), ("ids.i64", ids), ("live.u8", np.ones(len(ids), dtype=np.uint8))):
+                with open(self._file(name), "ab") as f:
+                    f.write(np.ascontiguousarray(data).tobytes())
+            self._write_meta(rows + len(ids))
+        self.refresh()
+
+    def delete(self, ids: Iterable[int]):
+        """Tombstone the vectors of ``ids``."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        with self._write_lock():
+            self._tombstone(ids, self._committed_rows())
+        self.refresh()
+
+    def _rows(self, mapping: _Mapping, ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(mapping.sorted_ids) or not len(ids):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        idx = np.minimum(np.searchsorted(mapping.sorted_ids, ids), len(mapping.sorted_ids) - 1)
+        rows = mapping.sorted_rows[idx]
+        # Tombstones written by other processes show through the shared mapping
+        found = (mapping.sorted_ids[idx] == ids) & (mapping.live[rows] == 1)
+        return rows, found
+
+    def _tombstone(self, ids: np.ndarray, rows: int):
+        if not rows or not len(ids):
+            return
+        # Holding the write lock, so the mapping is the committed state
+        dead, found = self._rows(self.refresh(), ids)
+        dead = dead[found]
+        if len(dead):
+            live = np.memmap(self._file("live.u8"), dtype=np.uint8, mode="r+", shape=(rows,))
+            live[dead] = 0
+            live.flush()
+
+    def _committed_rows(self) -> int:
+        """Rows published in meta.json; drops bytes left behind by an interrupted append."""
+        with open(self._file("meta.json")) as f:
+            rows = json.load(f)["rows"]
+        for name, itemsize in (("vectors.f32", 4 * self.dim), ("ids.i64", 8), ("live.u8", 1)):
+            with open(self._file(name), "ab") as f:
+                f.truncate(rows * itemsize)
+        return rows
+
+    def _write_meta(self, rows: int):
+        write_json(self._file("meta.json"), {"dim": self.dim, "rows": rows})
+
+    def _write_lock(self):
+        return file_lock(self._file(".lock"))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+_stores: Dict[Tuple[str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+def get_embedding_store(kind: str, model_version: str) -> EmbeddingStore:
+    """Process-wide store for ``kind`` ("post" or "user") at ``model_version``."""
+    key = (kind, model_version)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EmbeddingStore.open(kind, model_version)
+        return _stores[key]
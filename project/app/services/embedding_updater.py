@@ -0,0 +1,138 @@
+from typing import Callable, Dict, Hashable, List, Optional
+import asyncio
+import inspect
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _update_user_embeddings(user_ids: List[int]):
+    """Recompute the embeddings of ``user_ids`` with the current engine, on a session of its own."""
+    from app.database.database import SessionLocal
+    from app.services.model_registry import model_registry
+
+    db = SessionLocal()
+    try:
+        asyncio.run(model_registry.get()._update_user_embeddings(user_ids, db))
+    finally:
+        db.close()
+
+class DebouncedUpdater:
+    """
+    Coalesces "dirty" marks per key and hands them to ``handler`` in batches
+    from a background thread.
+
+    A key marked several times within ``window`` seconds of its first mark
+    is handled once, ``window`` seconds after that first mark, so a burst of
+    interactions costs one update and a busy key is still refreshed every
+    window. Keys marked again while their batch is running are handled in
+    a later batch. ``handler`` may be a coroutine function; a failed batch is
+    logged and its keys are marked again.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Hashable]], None] = _update_user_embeddings,
+        window: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.handler = handler
+        self.window = settings.EMBEDDING_UPDATE_WINDOW if window is None else window
+        self.batch_size = batch_size or settings.EMBEDDING_UPDATE_BATCH
+        # key -> monotonic time of its first mark since it was last handled
+        self._dirty: Dict[Hashable, float] = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.metrics = {"marked": 0, "coalesced": 0, "handled": 0, "batches": 0, "failures": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def mark(self, key: Hashable):
+        with self._cond:
+            self.metrics["marked"] += 1
+            if key in self._dirty:
+                self.metrics["coalesced"] += 1
+            else:
+                self._dirty[key] = time.monotonic()
+                self._cond.notify_all()
+
+    def flush(self, force: bool = False) -> int:
+        """Handle the keys whose window has passed (every key with ``force``); the number handled."""
+        handled = 0
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                batch = [key for key, first in self._dirty.items() if force or now - first >= self.window]
+                batch = batch[:self.batch_size]
+                for key in batch:
+                    del self._dirty[key]
+            if not batch:
+                return handled
+            try:
+                result = self.handler(batch)
+                if inspect.isawaitable(result):
+                    asyncio.run(result)
+            except Exception as e:
+                logger.error(f"Error updating {len(batch)} debounced keys: {str(e)}")
+                with self._cond:
+                    self.metrics["failures"] += 1
+                    # Retry after another window
+                    now = time.monotonic()
+                    for key in batch:
+                        self._dirty.setdefault(key, now)
+                return handled
+            handled += len(batch)
+            with self._cond:
+                self.metrics["handled"] += len(batch)
+                self.metrics["batches"] += 1
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="embedding-updater", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        """Stop the worker and handle every pending key."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._worker is not None:
+            # The worker drains the pending keys itself, off the caller's event loop
+            self._worker.join(timeout=30)
+            self._worker = None
+        else:
+            self.flush(force=True)
+
+    def status(self) -> Dict:
+        with self._cond:
+            return {"pending": len(self._dirty), "running": self.running, **self.metrics}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stop.is_set():
+                    timeout = 0
+                elif self._dirty:
+                    # Sleep until the oldest mark is due
+                    due = min(self._dirty.values()) + self.window
+                    timeout = max(due - time.monotonic(), 0)
+                else:
+                    timeout = None
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+            if self._stop.is_set():
+                self.flush(force=True)
+                return
+            failures = self.metrics["failures"]
+            self.flush()
+            if self.metrics["failures"] != failures:
+                self._stop.wait(self.window)
+
+user_embedding_updater = DebouncedUpdater()
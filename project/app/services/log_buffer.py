@@ -0,0 +1,169 @@
+from collections import deque
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# What to do with a new row when the buffer is full
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+def _write_recommendation_logs(rows: List[Dict]):
+    """Insert ``rows`` as RecommendationLog records in one transaction."""
+    from app.database.database import SessionLocal
+    from app.database.models import RecommendationLog
+
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(RecommendationLog, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+class LogBuffer:
+    """
+    Bounded in-process buffer of log rows, written in bulk by a background
+    thread when ``flush_size`` rows are waiting or every ``flush_seconds``.
+
+    The request path only appends to a deque. When ``max_size`` rows are
+    already waiting, the overflow policy either drops the new row, drops the
+    oldest one, or blocks the caller for up to ``block_seconds`` before
+    dropping (backpressure); async callers use ``add_async`` so that wait
+    never runs on the event loop. A failed write is retried on the next flush
+    while it fits in the buffer. ``stop`` flushes whatever is left.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Dict]], None] = _write_recommendation_logs,
+        max_size: Optional[int] = None,
+        flush_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        policy: Optional[str] = None,
+        block_seconds: float = 0.1,
+    ):
+        self.writer = writer
+        self.max_size = max_size or settings.LOG_BUFFER_SIZE
+        self.flush_size = min(flush_size or settings.LOG_FLUSH_SIZE, self.max_size)
+        self.flush_seconds = settings.LOG_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.policy = policy or settings.LOG_BUFFER_POLICY
+        if self.policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log buffer policy {self.policy!r}, expected one of {OVERFLOW_POLICIES}")
+        self.block_seconds = block_seconds
+        self._rows = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.metrics = {"enqueued": 0, "written": 0, "dropped": 0, "blocked": 0, "flushes": 0, "failures": 0}
+
+    def add(self, row: Dict) -> bool:
+        """Queue ``row`` for writing; False if the overflow policy dropped it."""
+        return self._add(row, wait=True)
+
+    async def add_async(self, row: Dict) -> bool:
+        """
+        ``add`` for callers on an event loop: when the block policy has to
+        wait for room, it waits on an executor thread instead of the loop.
+        """
+        added = self._add(row, wait=False)
+        if added is None:
+            added = await asyncio.get_running_loop().run_in_executor(None, self.add, row)
+        return added
+
+    def _add(self, row: Dict, wait: bool) -> Optional[bool]:
+        """``add``; None, with nothing queued, if the block policy would wait and ``wait`` is False."""
+        with self._cond:
+            if len(self._rows) >= self.max_size:
+                if self.policy == "drop_newest":
+                    self.metrics["dropped"] += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._rows.popleft()
+                    self.metrics["dropped"] += 1
+                elif not wait:
+                    return None
+                else:
+                    self.metrics["blocked"] += 1
+                    self._cond.notify_all()
+                    if not self._cond.wait_for(lambda: len(self._rows) < self.max_size, self.block_seconds):
+                        self.metrics["dropped"] += 1
+                        return False
+            self._rows.append(row)
+            self.metrics["enqueued"] += 1
+            if len(self._rows) >= self.flush_size:
+                self._cond.notify_all()
+        if self._worker is None:
+            # Not started (scripts, tests): write through in batches
+            if len(self._rows) >= self.flush_size:
+                self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Write every buffered row now; the number written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch = [self._rows.popleft() for _ in range(min(self.flush_size, len(self._rows)))]
+                    self._cond.notify_all()
+                if not batch:
+                    return written
+                try:
+                    self.writer(batch)
+                except Exception as e:
+                    logger.error(f"Error writing {len(batch)} buffered log rows: {str(e)}")
+                    with self._cond:
+                        self.metrics["failures"] += 1
+                        # Put the batch back in front, as far as it fits
+                        room = max(self.max_size - len(self._rows), 0)
+                        self.metrics["dropped"] += len(batch) - min(room, len(batch))
+                        self._rows.extendleft(reversed(batch[:room]))
+                    return written
+                written += len(batch)
+                with self._cond:
+                    self.metrics["written"] += len(batch)
+                    self.metrics["flushes"] += 1
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="log-buffer", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        """Stop the worker and write what is left."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=10)
+            self._worker = None
+        self.flush()
+
+    def status(self) -> Dict:
+        with self._cond:
+            return {"buffered": len(self._rows), "policy": self.policy, **self.metrics}
+
+    def _run(self):
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.flush_seconds
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stop.is_set() or len(self._rows) >= self.flush_size,
+                    max(deadline - time.monotonic(), 0)
+                )
+                failures = self.metrics["failures"]
+            self.flush()
+            if self.metrics["failures"] != failures:
+                # Back off instead of retrying a failing database in a tight loop
+                self._stop.wait(self.flush_seconds)
+
+recommendation_log_buffer = LogBuffer()
@@ -0,0 +1,176 @@
+from typing import Callable, Dict, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Files whose appearance or change triggers a reload
+MODEL_FILES = (
+    "deep_recommendation_model.pth",
+    "content_embedding_model.h5",
+    "content_scaler.pkl",
+    "collaborative_filtering.pkl",
+    "svd_model.pkl",
+)
+
+def _default_factory():
+    from app.services.recommendation_engine import RecommendationEngine
+    return RecommendationEngine()
+
+class ModelRegistry:
+    """
+    Process-wide owner of the loaded RecommendationEngine.
+
+    The engine (deep model, content model, collaborative filter) is built
+    once and shared by every request. A watcher thread polls the model files
+    under MODEL_PATH; when they change, a new engine is built and warmed up
+    off the request path and then swapped in with a single reference
+    assignment. Requests already holding the old engine finish with it.
+
+    State the engine derives from the database rather than from model files
+    (the collaborative filter's interaction matrix) is built during warm-up
+    and rebuilt by the same thread every ``data_refresh_seconds``, through
+    the engine's ``refresh_data``.
+    """
+
+    def __init__(
+        self,
+        factory: Callable = _default_factory,
+        model_path: Optional[str] = None,
+        poll_seconds: Optional[float] = None,
+        data_refresh_seconds: Optional[float] = None,
+    ):
+        self.factory = factory
+        self.model_path = model_path or settings.MODEL_PATH
+        self.poll_seconds = settings.MODEL_RELOAD_SECONDS if poll_seconds is None else poll_seconds
+        self.data_refresh_seconds = (
+            settings.CF_REFRESH_SECONDS if data_refresh_seconds is None else data_refresh_seconds
+        )
+        self._engine = None
+        self._fingerprint: Optional[Tuple] = None
+        self._loaded_at: Optional[float] = None
+        self._data_refreshed_at: Optional[float] = None
+        self._load_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._engine is not None
+
+    def get(self):
+        """The current engine, loading it on first use if warm-up has not run."""
+        engine = self._engine
+        if engine is None:
+            with self._load_lock:
+                engine = self._engine or self.load()
+        return engine
+
+    def load(self):
+        """Build and warm up a new engine, then publish it."""
+        with self._load_lock:
+            fingerprint = self.fingerprint()
+            start = time.perf_counter()
+            engine = self.factory()
+            self._warm_up(engine)
+            self._engine = engine
+            self._fingerprint = fingerprint
+            self._loaded_at = time.time()
+            logger.info(f"Loaded recommendation models in {time.perf_counter() - start:.2f}s")
+            return engine
+
+    def reload_if_changed(self) -> bool:
+        """Swap in a new engine if the model files changed since the last load."""
+        if self.fingerprint() == self._fingerprint:
+            return False
+        try:
+            self.load()
+            return True
+        except Exception as e:
+            # Keep serving the previous models
+            logger.error(f"Error reloading recommendation models: {str(e)}")
+            return False
+
+    def refresh_data(self) -> bool:
+        """Rebuild the current engine's database-derived state in place."""
+        engine = self._engine
+        refresh = getattr(engine, "refresh_data", None)
+        if refresh is None:
+            return False
+        try:
+            refresh()
+            return True
+        except Exception as e:
+            # Keep serving the previous state
+            logger.error(f"Error refreshing recommendation data: {str(e)}")
+            return False
+        finally:
+            self._data_refreshed_at = time.monotonic()
+
+    def fingerprint(self) -> Tuple:
+        """(name, mtime, size) of each model file present."""
+        entries = []
+        for name in MODEL_FILES:
+            path = os.path.join(self.model_path, name)
+            if os.path.exists(path):
+                st = os.stat(path)
+                entries.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(entries)
+
+    def start(self):
+        """Warm up now and start watching the model files."""
+        if not self.ready:
+            self.load()
+        if (self.poll_seconds or self.data_refresh_seconds) and (self._watcher is None or not self._watcher.is_alive()):
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "loaded_at": self._loaded_at,
+            "model_files": [name for name, _, _ in self._fingerprint or ()],
+        }
+
+    def _watch(self):
+        interval = min(seconds for seconds in (self.poll_seconds, self.data_refresh_seconds) if seconds)
+        while not self._stop.wait(interval):
+            if self.poll_seconds and self.reload_if_changed():
+                # A freshly loaded engine was refreshed during warm-up
+                continue
+            if self.data_refresh_seconds and (
+                self._data_refreshed_at is None
+                or time.monotonic() - self._data_refreshed_at >= self.data_refresh_seconds
+            ):
+                self.refresh_data()
+
+    def _warm_up(self, engine):
+        """Put the models in inference mode and build derived state, so the first request pays no setup cost."""
+        deep_model = getattr(engine, "deep_model", None)
+        if deep_model is not None and hasattr(deep_model, "eval"):
+            deep_model.eval()
+        refresh = getattr(engine, "refresh_data", None)
+        if refresh is not None:
+            try:
+                refresh()
+            except Exception as e:
+                # Requests build it lazily instead
+                logger.error(f"Error building recommendation data during warm-up: {str(e)}")
+            self._data_refreshed_at = time.monotonic()
+
+model_registry = ModelRegistry()
+
+def get_recommendation_engine():
+    """FastAPI dependency returning the shared engine."""
+    return model_registry.get()
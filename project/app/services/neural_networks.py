@@ -90,6 +90,10 @@ class DeepRecommendationModel(nn.Module):
     
     async def predict(self, user_embedding: np.ndarray, item_embeddings: List[np.ndarray], user_profile: Dict) -> List[float]:
         """Make predictions for user-item pairs."""
+        return self.predict_scores(user_embedding, item_embeddings, user_profile)
+    
+    def predict_scores(self, user_embedding: np.ndarray, item_embeddings: List[np.ndarray], user_profile: Dict) -> List[float]:
+        """Synchronous ``predict``, for scoring on a worker thread."""
         try:
             self.eval()
             
@@ -230,6 +234,50 @@ class ContentEmbeddingModel:
             # Return random embedding as fallback
             return np.random.randn(self.embedding_dim)
     
+    async def generate_post_embeddings(self, posts: List, store=None) -> List[np.ndarray]:
+        """
+        Generate embeddings for many posts with one model call (or one random
+        projection in the fallback). Same vectors as generate_post_embedding.
+        With an EmbeddingStore, stored vectors are reused and the generated
+        ones are appended to it.
+        """
+        if not posts:
+            return []
+        
+        if store is not None:
+            vectors, found = store.get([post.id for post in posts])
+            missing = [post for post, hit in zip(posts, found) if not hit]
+            generated = await self.generate_post_embeddings(missing)
+            if missing:
+                store.put([post.id for post in missing], generated)
+            generated = iter(generated)
+            return [vector if hit else next(generated) for vector, hit in zip(vectors, found)]
+        
+        features, failed = [], []
+        for i, post in enumerate(posts):
+            try:
+                features.append(self._extract_post_features(post))
+            except Exception as e:
+                logger.error(f"Error extracting post features: {str(e)}")
+                features.append([0.0] * 50)
+                failed.append(i)
+        
+        try:
+            if self.model is not None:
+                # Scaled row by row, exactly as the single-post path does
+                features_scaled = np.vstack([self.scaler.fit_transform([f]) for f in features])
+                embeddings = list(self.model.predict(features_scaled))
+            else:
+                embeddings = list(self._generate_fallback_embeddings(np.array(features)))
+        except Exception as e:
+            logger.error(f"Error generating post embeddings: {str(e)}")
+            return [np.random.randn(self.embedding_dim) for _ in posts]
+        
+        for i in failed:
+            # Return random embedding as fallback
+            embeddings[i] = np.random.randn(self.embedding_dim)
+        return embeddings
+    
     def _extract_user_features(self, user_profile: Dict) -> List[float]:
         """Extract numerical features from user profile."""
         features = []
@@ -330,6 +378,13 @@ class ContentEmbeddingModel:
         
         return embedding
     
+    def _generate_fallback_embeddings(self, features: np.ndarray) -> np.ndarray:
+        """Row-wise _generate_fallback_embedding for a 2D feature matrix."""
+        np.random.seed(42)  # Same projection as the single-vector path
+        projection_matrix = np.random.randn(features.shape[1], self.embedding_dim)
+        embeddings = features @ projection_matrix
+        return embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+    
     def load_model(self):
         """Load pre-trained content embedding model."""
         model_path = os.path.join(settings.MODEL_PATH, "content_embedding_model.h5")
@@ -0,0 +1,164 @@
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy import and_
+import logging
+import time
+
+from app.cache import LRUCache
+from app.database.models import Post, User, Category, Topic
+from app.schemas.recommendation import PostResponse
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Post ids per IN (...) query
+POST_LOAD_CHUNK = 500
+
+def post_response_options():
+    """
+    Loader options fetching exactly what ``to_post_response`` reads: the post
+    columns and its owner, category, topic and topic owner, all joined into
+    the post query instead of lazy-loaded per post.
+    """
+    return (
+        load_only(
+            Post.id, Post.title, Post.slug, Post.owner_id, Post.category_id, Post.topic_id,
+            Post.video_link, Post.thumbnail_url, Post.gif_thumbnail_url,
+            Post.view_count, Post.upvote_count, Post.comment_count, Post.share_count,
+            Post.bookmark_count, Post.rating_count, Post.average_rating,
+            Post.is_available_in_public_feed, Post.is_locked, Post.tags, Post.created_at
+        ),
+        joinedload(Post.owner).load_only(
+            User.id, User.first_name, User.last_name, User.username, User.picture_url,
+            User.user_type, User.has_evm_wallet, User.has_solana_wallet
+        ),
+        joinedload(Post.category).load_only(
+            Category.id, Category.name, Category.count, Category.description, Category.image_url
+        ),
+        joinedload(Post.topic).load_only(
+            Topic.id, Topic.owner_id, Topic.name, Topic.description, Topic.image_url, Topic.slug,
+            Topic.is_public, Topic.project_code, Topic.posts_count, Topic.language, Topic.created_at
+        ).joinedload(Topic.owner).load_only(
+            User.id, User.first_name, User.last_name, User.username, User.picture_url, User.user_type
+        ),
+    )
+
+def to_post_response(post: Post) -> PostResponse:
+    """Convert database Post model to API response format."""
+    return PostResponse(
+        id=post.id,
+        title=post.title,
+        slug=post.slug,
+        owner={
+            "first_name": post.owner.first_name or "",
+            "last_name": post.owner.last_name or "",
+            "name": f"{post.owner.first_name or ''} {post.owner.last_name or ''}".strip(),
+            "username": post.owner.username,
+            "picture_url": post.owner.picture_url or "",
+            "user_type": post.owner.user_type,
+            "has_evm_wallet": post.owner.has_evm_wallet,
+            "has_solana_wallet": post.owner.has_solana_wallet
+        },
+        category={
+            "id": post.category.id,
+            "name": post.category.name,
+            "count": post.category.count,
+            "description": post.category.description or "",
+            "image_url": post.category.image_url or ""
+        },
+        topic={
+            "id": post.topic.id,
+            "name": post.topic.name,
+            "description": post.topic.description or "",
+            "image_url": post.topic.image_url or "",
+            "slug": post.topic.slug,
+            "is_public": post.topic.is_public,
+            "project_code": post.topic.project_code or "",
+            "posts_count": post.topic.posts_count,
+            "language": post.topic.language,
+            "created_at": post.topic.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "owner": {
+                "first_name": post.topic.owner.first_name or "",
+                "last_name": post.topic.owner.last_name or "",
+                "name": f"{post.topic.owner.first_name or ''} {post.topic.owner.last_name or ''}".strip(),
+                "username": post.topic.owner.username,
+                "profile_url": post.topic.owner.picture_url or "",
+                "user_type": post.topic.owner.user_type or ""
+            }
+        },
+        video_link=post.video_link or "",
+        thumbnail_url=post.thumbnail_url or "",
+        gif_thumbnail_url=post.gif_thumbnail_url,
+        view_count=post.view_count,
+        upvote_count=post.upvote_count,
+        comment_count=post.comment_count,
+        share_count=post.share_count,
+        bookmark_count=post.bookmark_count,
+        rating_count=post.rating_count,
+        average_rating=post.average_rating,
+        is_available_in_public_feed=post.is_available_in_public_feed,
+        is_locked=post.is_locked,
+        tags=post.tags or [],
+        created_at=int(post.created_at.timestamp() * 1000),
+        identifier=post.slug[:7],  # Generate identifier from slug
+        exit_count=0,  # Default value
+        contract_address="",
+        chain_id="",
+        chart_url="",
+        baseToken={}
+    )
+
+class PostResponseCache:
+    """
+    PostResponse per post id, kept for ``ttl`` seconds. Responses carry no
+    per-user fields, so every feed shares them; engagement counts and
+    visibility changes show up once an entry expires.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, maxsize: Optional[int] = None):
+        self.ttl = settings.POST_RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.entries = LRUCache(maxsize or settings.CACHE_LOCAL_SIZE)
+
+    def get_many(self, post_ids: Iterable[int]) -> Dict[int, PostResponse]:
+        now = time.monotonic()
+        found = {}
+        for post_id in post_ids:
+            entry = self.entries.get(post_id)
+            if entry is not None and entry[0] > now:
+                found[post_id] = entry[1]
+        return found
+
+    def put(self, response: PostResponse):
+        if self.ttl > 0:
+            self.entries.set(response.id, (time.monotonic() + self.ttl, response))
+
+    def clear(self):
+        self.entries.clear()
+
+def load_post_responses(
+    db: Session,
+    post_ids: List[int],
+    cache: Optional[PostResponseCache] = None,
+) -> List[PostResponse]:
+    """
+    Responses for the listed (public, unlocked) posts among ``post_ids``, in
+    order: cached ones from ``cache``, the rest with one eager-loading query
+    per chunk.
+    """
+    responses = cache.get_many(post_ids) if cache is not None else {}
+    missing = [post_id for post_id in dict.fromkeys(post_ids) if post_id not in responses]
+    for start in range(0, len(missing), POST_LOAD_CHUNK):
+        chunk = missing[start:start + POST_LOAD_CHUNK]
+        posts = db.query(Post).options(*post_response_options()).filter(
+            and_(
+                Post.id.in_(chunk),
+                Post.is_available_in_public_feed == True,
+                Post.is_locked == False
+            )
+        ).all()
+        for post in posts:
+            response = to_post_response(post)
+            responses[post.id] = response
+            if cache is not None:
+                cache.put(response)
+    return [responses[post_id] for post_id in post_ids if post_id in responses]
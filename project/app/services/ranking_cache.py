@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import base64
+import binascii
+import json
+import logging
+import secrets
+import time
+
+from app.cache import LRUCache, RedisTier
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ranking"
+
+class RankedList(NamedTuple):
+    token: str
+    post_ids: List[int]
+    scores: List[float]
+    algorithm: str
+    expires: float
+
+def encode_cursor(token: str, offset: int) -> str:
+    """Opaque cursor pointing at ``offset`` in the ranked list ``token``."""
+    raw = json.dumps({"t": token, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(token, offset) of a cursor; ValueError if it was not made by encode_cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        token, offset = data["t"], data["o"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(token, str) or not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return token, offset
+
+class RankingCache:
+    """
+    Short-lived store of full ranked feeds, so that later pages of an
+    infinite scroll are slices of the ranking computed for the first page.
+
+    Each ranking gets a random token that cursors refer to, which pins a
+    client to the list it started scrolling even when a newer ranking for
+    the same user and filters replaces it as the "latest". Entries expire
+    after RANKING_CACHE_TTL seconds; an optional shared tier (the redis
+    cache backend) lets any worker continue a scroll.
+    """
+
+    def __init__(self, ttl: int, local_size: int = 10000, shared: Optional[RedisTier] = None):
+        self.ttl = ttl
+        self.local = LRUCache(local_size)
+        self.shared = shared
+        # Prefetched page payloads, keyed by (token, offset, page_size)
+        self.pages = LRUCache(local_size)
+
+    def put(self, user_id: int, filters: Tuple, post_ids: List[int], scores: List[float], algorithm: str) -> RankedList:
+        ranked = RankedList(secrets.token_urlsafe(12), list(post_ids), list(scores), algorithm, time.time() + self.ttl)
+        self._set(self._list_key(ranked.token), ranked._asdict())
+        self._set(self._latest_key(user_id, filters), {"token": ranked.token, "expires": ranked.expires})
+        return ranked
+
+    def get(self, token: str) -> Optional[RankedList]:
+        entry = self._get(self._list_key(token))
+        return RankedList(**entry) if entry is not None else None
+
+    def latest(self, user_id: int, filters: Tuple) -> Optional[RankedList]:
+        """Most recent ranking of ``user_id`` for ``filters``, if still live."""
+        entry = self._get(self._latest_key(user_id, filters))
+        return self.get(entry["token"]) if entry is not None else None
+
+    def get_page(self, token: str, offset: int, page_size: int) -> Optional[Any]:
+        return self.pages.get((token, offset, page_size))
+
+    def put_page(self, token: str, offset: int, page_size: int, page: Any):
+        self.pages.set((token, offset, page_size), page)
+
+    def _get(self, key: str) -> Optional[Dict]:
+        entry = self.local.get(key)
+        if entry is None and self.shared is not None:
+            raw = self.shared.get(key)
+            if raw is not None:
+                entry = json.loads(raw)
+                self.local.set(key, entry)
+        if entry is None or entry["expires"] <= time.time():
+            return None
+        return entry
+
+    def _set(self, key: str, entry: Dict):
+        self.local.set(key, entry)
+        if self.shared is not None:
+            self.shared.set(key, json.dumps(entry), self.ttl)
+
+    def _list_key(self, token: str) -> str:
+        return f"{KEY_PREFIX}:list:{token}"
+
+    def _latest_key(self, user_id: int, filters: Tuple) -> str:
+        return f"{KEY_PREFIX}:latest:{user_id}:{json.dumps(filters)}"
+
+def build_ranking_cache() -> RankingCache:
+    shared = None
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            shared = RedisTier.from_url(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the redis package is not installed; keeping rankings in process")
+    return RankingCache(ttl=settings.RANKING_CACHE_TTL, local_size=settings.CACHE_LOCAL_SIZE, shared=shared)
+
+ranking_cache = build_ranking_cache()
@@ -1,26 +1,69 @@
 import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc, func
 import logging
 from datetime import datetime, timedelta
 import json
 
-from app.database.models import User, Post, UserInteraction, UserEmbedding, PostEmbedding, RecommendationLog
+from app.database.models import User, Post, UserInteraction, UserEmbedding, PostEmbedding
 from app.schemas.recommendation import RecommendationResponse, FeedRequest, PostResponse
 from app.services.neural_networks import DeepRecommendationModel, ContentEmbeddingModel
-from app.services.collaborative_filtering import CollaborativeFilter
+from app.services.collaborative_filtering import INTERACTION_WEIGHTS, CollaborativeFilter
+from app.services.embedding_store import get_embedding_store
+from app.services.ann_index import get_ann_index
+from app.services.similarity import cosine_similarity, l2_normalize
+from app.services.scoring_executor import ScoringStage, get_scoring_executor
+from app.services.candidate_retrieval import CandidateContext, CandidateRetriever
+from app.services.candidate_generation import (
+    CollaborativeCandidateGenerator, EmbeddingCandidateGenerator, TagCandidateGenerator,
+    TrendingCandidateGenerator, feed_query
+)
+from app.services.trending import decode_trending_cursor, encode_trending_cursor, trending_page
+from app.services.post_projection import PostResponseCache, load_post_responses, to_post_response
+from app.services.ranking_cache import RankedList, decode_cursor, encode_cursor, ranking_cache
+from app.database.database import SessionLocal
+from app.services.log_buffer import recommendation_log_buffer
+from app.services.embedding_updater import user_embedding_updater
+from app.services.running_mean import decayed_mean_update
+from app.services.content_scoring import category_scores, content_based_scores
+import time
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Post ids per IN (...) query when fetching stored embeddings
+EMBEDDING_FETCH_CHUNK = 1000
+
 class RecommendationEngine:
     def __init__(self):
         self.deep_model = DeepRecommendationModel()
         self.content_model = ContentEmbeddingModel()
         self.collaborative_filter = CollaborativeFilter()
-        self.model_version = "v1.0"
+        self.model_version = settings.EMBEDDING_MODEL_VERSION
+        # Memory-mapped embedding matrices, shared by every worker process
+        # "profile" regenerates user embeddings from the profile; "running_mean"
+        # folds each interacted item into a decayed mean, kept under its own version
+        self.user_embedding_mode = settings.USER_EMBEDDING_MODE
+        if self.user_embedding_mode not in ("profile", "running_mean"):
+            raise ValueError(f"Unknown USER_EMBEDDING_MODE {self.user_embedding_mode!r}")
+        self.user_embedding_version = (
+            self.model_version if self.user_embedding_mode == "profile"
+            else f"{self.model_version}-{self.user_embedding_mode}"
+        )
+        self.user_embeddings = get_embedding_store("user", self.user_embedding_version)
+        self.post_embeddings = get_embedding_store("post", self.model_version)
+        self.post_index = get_ann_index(self.post_embeddings, "post", self.model_version)
+        # Page payloads shared by every feed, loaded with one eager query
+        self.post_responses = PostResponseCache()
+        # Retrieval stage: only these candidates reach the ranking models
+        self.candidate_retriever = CandidateRetriever([
+            EmbeddingCandidateGenerator(self.post_index),
+            CollaborativeCandidateGenerator(self.collaborative_filter),
+            TrendingCandidateGenerator(),
+            TagCandidateGenerator(),
+        ])
         
     async def get_personalized_recommendations(
         self, 
@@ -30,78 +73,72 @@ class RecommendationEngine:
     ) -> RecommendationResponse:
         """
         Get personalized recommendations using deep neural networks and hybrid filtering.
+        
+        The full ranking is computed once and kept in the ranking cache;
+        ``next_cursor`` (or ``page`` > 1) pages through it without re-ranking.
+        Raises ValueError for a cursor this service did not issue.
         """
+        filters = (request.project_code, request.category)
+        offset = (request.page - 1) * request.page_size
+        ranked = None
+        if request.cursor:
+            token, offset = decode_cursor(request.cursor)
+            # An expired ranking is recomputed and the scroll continues at the same offset
+            ranked = ranking_cache.get(token)
+        
         try:
-            # Get user profile and interaction history
-            user_profile = await self._get_user_profile(user_id, db)
-            
-            # Check if user has enough interaction history
-            interaction_count = db.query(UserInteraction).filter(
-                UserInteraction.user_id == user_id
-            ).count()
-            
-            if interaction_count < settings.COLD_START_THRESHOLD:
-                # Handle cold start problem
-                return await self._get_cold_start_recommendations(user_id, request, db)
-            
-            # Get candidate posts
-            candidate_posts = await self._get_candidate_posts(request, db)
-            
-            # Generate embeddings for user and posts
-            user_embedding = await self._get_or_generate_user_embedding(user_id, db)
-            post_embeddings = await self._get_or_generate_post_embeddings(candidate_posts, db)
-            
-            # Deep learning recommendations
-            deep_scores = await self.deep_model.predict(
-                user_embedding, 
-                post_embeddings, 
-                user_profile
-            )
-            
-            # Collaborative filtering scores
-            cf_scores = await self.collaborative_filter.get_user_similarities(
-                user_id, 
-                [post.id for post in candidate_posts], 
-                db
-            )
-            
-            # Content-based scores
-            content_scores = await self._get_content_based_scores(
-                user_profile, 
-                candidate_posts
-            )
-            
-            # Hybrid scoring (weighted combination)
-            final_scores = self._combine_scores(deep_scores, cf_scores, content_scores)
-            
-            # Rank and filter posts
-            ranked_posts = self._rank_posts(candidate_posts, final_scores)
-            
-            # Apply pagination
-            start_idx = (request.page - 1) * request.page_size
-            end_idx = start_idx + request.page_size
-            paginated_posts = ranked_posts[start_idx:end_idx]
-            
-            # Convert to response format
-            post_responses = [self._convert_to_post_response(post) for post in paginated_posts]
+            if ranked is None and offset > 0:
+                ranked = ranking_cache.latest(user_id, filters)
+            
+            stage_timings = None
+            if ranked is None:
+                # Check if user has enough interaction history
+                interaction_count = db.query(UserInteraction).filter(
+                    UserInteraction.user_id == user_id
+                ).count()
+                
+                if interaction_count < settings.COLD_START_THRESHOLD:
+                    # Handle cold start problem
+                    return await self._get_cold_start_recommendations(user_id, request, db)
+                
+                ranked, stage_timings = await self._rank_feed(user_id, request, filters, db)
+            
+            # Serve the page from the ranked list
+            end_idx = offset + request.page_size
+            page_ids = ranked.post_ids[offset:end_idx]
+            scores_by_id = dict(zip(page_ids, ranked.scores[offset:end_idx]))
+            post_responses = ranking_cache.get_page(ranked.token, offset, request.page_size)
+            if post_responses is None:
+                post_responses = self._load_post_responses(page_ids, db)
+            
+            # Posts hidden or locked since the ranking are left out of the page
+            page_ids = [response.id for response in post_responses]
+            page_scores = [scores_by_id[post_id] for post_id in page_ids]
+            
+            next_cursor = None
+            if end_idx < len(ranked.post_ids):
+                next_cursor = encode_cursor(ranked.token, end_idx)
+                if settings.RANKING_PREFETCH:
+                    self._prefetch_page(ranked, end_idx, request.page_size)
             
             # Log recommendation
             await self._log_recommendation(
                 user_id, 
-                [post.id for post in paginated_posts], 
-                "hybrid_deep_learning",
-                final_scores[start_idx:end_idx],
-                db
+                page_ids, 
+                ranked.algorithm,
+                page_scores
             )
             
             return RecommendationResponse(
                 status="success",
                 post=post_responses,
-                algorithm_used="hybrid_deep_learning",
-                total_count=len(ranked_posts),
-                page=request.page,
+                algorithm_used=ranked.algorithm,
+                total_count=len(ranked.post_ids),
+                page=offset // request.page_size + 1,
                 page_size=request.page_size,
-                confidence_scores=final_scores[start_idx:end_idx]
+                confidence_scores=page_scores,
+                stage_timings=stage_timings,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -109,6 +146,82 @@ class RecommendationEngine:
             # Fallback to trending content
             return await self.get_trending_content(request.page, request.page_size, None, db)
     
+    async def _rank_feed(
+        self, 
+        user_id: int, 
+        request: FeedRequest, 
+        filters: Tuple, 
+        db: Session
+    ) -> Tuple[RankedList, Dict[str, float]]:
+        """Retrieve and score candidates, and store the full ranking in the ranking cache."""
+        # Get user profile and embedding
+        user_profile = await self._get_user_profile(user_id, db)
+        user_embedding = await self._get_or_generate_user_embedding(user_id, db)
+        
+        # Retrieve candidate posts from the fast generators
+        retrieval_start = time.perf_counter()
+        candidate_posts = await self._retrieve_candidates(
+            CandidateContext(user_id, user_profile, user_embedding, request), db
+        )
+        retrieval_ms = round((time.perf_counter() - retrieval_start) * 1000, 2)
+        
+        # Generate embeddings for the candidates
+        post_embeddings = await self._get_or_generate_post_embeddings(candidate_posts, db)
+        
+        # Deep learning, collaborative filtering and content-based
+        # scores are independent, so they run concurrently; stages run
+        # on worker threads and must not touch the request session
+        scores, stage_timings = await get_scoring_executor().run([
+            ScoringStage("deep", self.deep_model.predict_scores, (user_embedding, post_embeddings, user_profile)),
+            ScoringStage(
+                "collaborative",
+                self.collaborative_filter.score_candidates,
+                (user_id, [post.id for post in candidate_posts])
+            ),
+            ScoringStage(
+                "content",
+                content_based_scores,
+                self._content_features(user_profile, candidate_posts),
+                process_safe=True
+            ),
+        ])
+        stage_timings = {"retrieval": retrieval_ms, **stage_timings}
+        
+        # Hybrid scoring (weighted combination)
+        final_scores = self._combine_scores(scores["deep"], scores["collaborative"], scores["content"])
+        
+        # Rank posts, keeping each score next to its post
+        order = sorted(range(len(candidate_posts)), key=lambda i: final_scores[i], reverse=True)
+        ranked = ranking_cache.put(
+            user_id,
+            filters,
+            [candidate_posts[i].id for i in order],
+            [float(final_scores[i]) for i in order],
+            "hybrid_deep_learning"
+        )
+        return ranked, stage_timings
+    
+    def _load_post_responses(self, post_ids: List[int], db: Session) -> List[PostResponse]:
+        """Responses for ``post_ids`` in order, skipping posts hidden since they were ranked."""
+        return load_post_responses(db, post_ids, self.post_responses)
+    
+    def _prefetch_page(self, ranked: RankedList, offset: int, page_size: int):
+        """Load the next page of ``ranked`` in the background, on its own session."""
+        if ranking_cache.get_page(ranked.token, offset, page_size) is not None:
+            return
+        
+        def prefetch():
+            db = SessionLocal()
+            try:
+                page = self._load_post_responses(ranked.post_ids[offset:offset + page_size], db)
+                ranking_cache.put_page(ranked.token, offset, page_size, page)
+            except Exception as e:
+                logger.error(f"Error prefetching feed page: {str(e)}")
+            finally:
+                db.close()
+        
+        get_scoring_executor().threads.submit(prefetch)
+    
     async def get_category_recommendations(
         self, 
         user_id: int, 
@@ -133,7 +246,8 @@ class RecommendationEngine:
                     Post.topic.has(project_code=request.project_code)
                 )
             
-            candidate_posts = query.all()
+            # Scoring reads each post's category
+            candidate_posts = query.options(joinedload(Post.category)).all()
             
             # Get user preferences for personalization
             user_profile = await self._get_user_profile(user_id, db)
@@ -149,7 +263,7 @@ class RecommendationEngine:
             end_idx = start_idx + request.page_size
             paginated_posts = ranked_posts[start_idx:end_idx]
             
-            post_responses = [self._convert_to_post_response(post) for post in paginated_posts]
+            post_responses = self._load_post_responses([post.id for post in paginated_posts], db)
             
             return RecommendationResponse(
                 status="success",
@@ -169,47 +283,40 @@ class RecommendationEngine:
         page: int, 
         page_size: int, 
         category: Optional[str], 
-        db: Session
+        db: Session,
+        cursor: Optional[str] = None
     ) -> RecommendationResponse:
         """
         Get trending content based on engagement metrics.
+        
+        Reads the precomputed, time-decayed trending keys in index order;
+        ``next_cursor`` continues the scan where the page ended.
+        Raises ValueError for a cursor this service did not issue.
         """
+        after = decode_trending_cursor(cursor) if cursor else None
         try:
-            # Calculate trending score based on recent engagement
-            recent_date = datetime.utcnow() - timedelta(days=7)
-            
-            query = db.query(Post).filter(
-                and_(
-                    Post.is_available_in_public_feed == True,
-                    Post.is_locked == False,
-                    Post.created_at >= recent_date
-                )
+            # Only posts from the last week are trending
+            recent_date = datetime.utcnow() - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+            
+            rows = trending_page(
+                db,
+                page_size,
+                category=category,
+                after=after,
+                since=recent_date,
+                offset=0 if after else (page - 1) * page_size
             )
             
-            if category:
-                query = query.join(Post.category).filter(
-                    Post.category.has(name=category)
-                )
-            
-            # Order by trending score (combination of views, likes, shares, recency)
-            posts = query.order_by(
-                desc(
-                    (Post.view_count * 0.3 + 
-                     Post.upvote_count * 0.4 + 
-                     Post.share_count * 0.3) / 
-                    func.extract('epoch', func.now() - Post.created_at) * 86400
-                )
-            ).offset((page - 1) * page_size).limit(page_size).all()
-            
-            post_responses = [self._convert_to_post_response(post) for post in posts]
+            post_responses = self._load_post_responses([row.post_id for row in rows], db)
             
             return RecommendationResponse(
                 status="success",
                 post=post_responses,
                 algorithm_used="trending",
-                total_count=len(posts),
+                total_count=len(post_responses),
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=encode_trending_cursor(rows[-1]) if len(rows) == page_size else None
             )
             
         except Exception as e:
@@ -236,50 +343,42 @@ class RecommendationEngine:
             # Get post embedding
             reference_embedding = await self._get_or_generate_post_embeddings([reference_post], db)
             
-            # Find similar posts using content embeddings
-            candidate_posts = db.query(Post).filter(
-                and_(
-                    Post.id != post_id,
-                    Post.is_available_in_public_feed == True,
-                    Post.is_locked == False
-                )
-            ).all()
-            
-            candidate_embeddings = await self._get_or_generate_post_embeddings(candidate_posts, db)
-            
-            # Calculate similarity scores
-            similarity_scores = self._calculate_cosine_similarity(
-                reference_embedding[0], 
-                candidate_embeddings
+            # Nearest posts from the ANN index; over-fetch so that filtering
+            # locked/private posts and the threshold still fills the page
+            wanted = page * page_size * settings.ANN_OVERFETCH
+            neighbour_ids, similarity_scores = self.post_index.search(
+                reference_embedding[0], k=wanted, exclude=[post_id]
             )
-            
-            # Filter by similarity threshold
-            similar_posts = [
-                (post, score) for post, score in zip(candidate_posts, similarity_scores)
-                if score >= settings.SIMILARITY_THRESHOLD
-            ]
-            
-            # Sort by similarity score
-            similar_posts.sort(key=lambda x: x[1], reverse=True)
+            keep = similarity_scores >= settings.SIMILARITY_THRESHOLD
+            neighbour_ids = neighbour_ids[keep].tolist()
+            scores_by_id = dict(zip(neighbour_ids, similarity_scores[keep].tolist()))
+            
+            listed = {
+                listed_id for listed_id, in db.query(Post.id).filter(
+                    and_(
+                        Post.id.in_(neighbour_ids),
+                        Post.is_available_in_public_feed == True,
+                        Post.is_locked == False
+                    )
+                ).all()
+            } if neighbour_ids else set()
+            
+            # Search order is by similarity already
+            similar_ids = [similar_id for similar_id in neighbour_ids if similar_id in listed]
             
             # Apply pagination
             start_idx = (page - 1) * page_size
             end_idx = start_idx + page_size
-            paginated_posts = similar_posts[start_idx:end_idx]
-            
-            post_responses = [
-                self._convert_to_post_response(post) 
-                for post, _ in paginated_posts
-            ]
+            post_responses = self._load_post_responses(similar_ids[start_idx:end_idx], db)
             
             return RecommendationResponse(
                 status="success",
                 post=post_responses,
                 algorithm_used="content_similarity",
-                total_count=len(similar_posts),
+                total_count=len(similar_ids),
                 page=page,
                 page_size=page_size,
-                confidence_scores=[score for _, score in paginated_posts]
+                confidence_scores=[scores_by_id[response.id] for response in post_responses]
             )
             
         except Exception as e:
@@ -308,10 +407,21 @@ class RecommendationEngine:
             )
             
             db.add(interaction)
-            db.commit()
             
-            # Update user embedding asynchronously
-            await self._update_user_embedding(user_id, db)
+            if self.user_embedding_mode == "running_mean":
+                # Constant-time update, committed together with the interaction
+                embedding = self._fold_interaction(user_id, interaction, db)
+                db.commit()
+                if embedding is not None:
+                    self.user_embeddings.put([user_id], [embedding])
+            else:
+                db.commit()
+                # The background updater coalesces bursts of interactions into one
+                # embedding update; without it, update inline
+                if user_embedding_updater.running:
+                    user_embedding_updater.mark(user_id)
+                else:
+                    await self._update_user_embedding(user_id, db)
             
             logger.info(f"Recorded {interaction_type} interaction for user {user_id} on post {post_id}")
             
@@ -320,6 +430,26 @@ class RecommendationEngine:
             db.rollback()
             raise
     
+    def refresh_data(self):
+        """
+        Rebuild the state derived from interactions (the collaborative
+        filter's matrices), so new users and interactions reach it, and
+        assign posts embedded since the last sync to the similar-content
+        index. Called by the model registry at warm-up and on a schedule.
+        """
+        db = SessionLocal()
+        try:
+            self.collaborative_filter.refresh(db)
+        finally:
+            db.close()
+        
+        self.post_index.sync()
+        if not self.post_index.trained:
+            logger.warning(
+                f"Post ANN index is not trained: /similar scans all {len(self.post_embeddings)} "
+                f"post embeddings exactly. Run build_ann_index.py to train it."
+            )
+    
     # Private helper methods
     
     async def _get_user_profile(self, user_id: int, db: Session) -> Dict:
@@ -369,17 +499,17 @@ class RecommendationEngine:
                 pass
             
             # Order by engagement score
-            posts = query.order_by(
+            post_ids = [post_id for post_id, in query.order_by(
                 desc(Post.view_count + Post.upvote_count * 2 + Post.share_count * 3)
-            ).offset((request.page - 1) * request.page_size).limit(request.page_size).all()
+            ).with_entities(Post.id).offset((request.page - 1) * request.page_size).limit(request.page_size).all()]
             
-            post_responses = [self._convert_to_post_response(post) for post in posts]
+            post_responses = self._load_post_responses(post_ids, db)
             
             return RecommendationResponse(
                 status="success",
                 post=post_responses,
                 algorithm_used="cold_start_popular",
-                total_count=len(posts),
+                total_count=len(post_responses),
                 page=request.page,
                 page_size=request.page_size
             )
@@ -388,86 +518,212 @@ class RecommendationEngine:
             logger.error(f"Error in cold start recommendations: {str(e)}")
             raise
     
-    async def _get_candidate_posts(self, request: FeedRequest, db: Session) -> List[Post]:
-        """Get candidate posts for recommendation."""
-        query = db.query(Post).filter(
-            and_(
-                Post.is_available_in_public_feed == True,
-                Post.is_locked == False
-            )
-        )
+    async def _retrieve_candidates(self, context: CandidateContext, db: Session) -> List[Post]:
+        """Merged candidates of the retrieval stage that pass the request filters, in merge order."""
+        candidate_ids, sources = await self.candidate_retriever.retrieve(context, db)
+        logger.debug(f"Retrieved {len(candidate_ids)} candidates for user {context.user_id}: {sources}")
         
-        # Apply filters
-        if request.project_code:
-            query = query.join(Post.topic).filter(
-                Post.topic.has(project_code=request.project_code)
-            )
+        posts = {}
+        for start in range(0, len(candidate_ids), EMBEDDING_FETCH_CHUNK):
+            chunk = candidate_ids[start:start + EMBEDDING_FETCH_CHUNK]
+            for post in feed_query(context.request, db).options(joinedload(Post.category)).filter(Post.id.in_(chunk)).all():
+                posts[post.id] = post
         
-        if request.category:
-            query = query.join(Post.category).filter(
-                Post.category.has(name=request.category)
-            )
-        
-        return query.limit(settings.MAX_RECOMMENDATIONS * 2).all()
+        if not posts:
+            # Nothing indexed or interacted with yet
+            return await self._get_candidate_posts(context.request, db)
+        return [posts[post_id] for post_id in candidate_ids if post_id in posts]
+    
+    async def _get_candidate_posts(self, request: FeedRequest, db: Session) -> List[Post]:
+        """Fallback candidates: the first posts matching the request filters."""
+        return feed_query(request, db).options(joinedload(Post.category)).limit(settings.MAX_RECOMMENDATIONS * 2).all()
     
     async def _get_or_generate_user_embedding(self, user_id: int, db: Session) -> np.ndarray:
         """Get or generate user embedding vector."""
+        stored = self.user_embeddings.get_one(user_id)
+        if stored is not None:
+            return stored
+        
         # Check if embedding exists
         embedding_record = db.query(UserEmbedding).filter(
             and_(
                 UserEmbedding.user_id == user_id,
-                UserEmbedding.model_version == self.model_version
+                UserEmbedding.model_version == self.user_embedding_version
             )
         ).first()
         
         if embedding_record:
-            return np.array(embedding_record.embedding_vector)
+            embedding = l2_normalize(embedding_record.embedding_vector)
+            self.user_embeddings.put([user_id], [embedding])
+            return embedding
+        
+        if self.user_embedding_mode == "running_mean":
+            embedding = self._bootstrap_running_mean(user_id, db)
+            if embedding is not None:
+                return embedding
+            # No embedded items yet: use the profile embedding without keeping it
+            user_profile = await self._get_user_profile(user_id, db)
+            return l2_normalize(await self.content_model.generate_user_embedding(user_profile))
         
         # Generate new embedding
         user_profile = await self._get_user_profile(user_id, db)
-        embedding = await self.content_model.generate_user_embedding(user_profile)
+        embedding = l2_normalize(await self.content_model.generate_user_embedding(user_profile))
+        self.user_embeddings.put([user_id], [embedding])
         
         # Save embedding
         embedding_record = UserEmbedding(
             user_id=user_id,
             embedding_vector=embedding.tolist(),
-            model_version=self.model_version
+            model_version=self.user_embedding_version
         )
         db.add(embedding_record)
         db.commit()
         
         return embedding
     
+    def _fold_interaction(self, user_id: int, interaction: UserInteraction, db: Session) -> Optional[np.ndarray]:
+        """
+        Fold the interacted post's embedding into the user's running mean
+        (O(dim)); the new unit user embedding, or None if the post has no
+        embedding yet. The caller commits.
+        """
+        item = self.post_embeddings.get_one(interaction.post_id)
+        if item is None:
+            return None
+        
+        # Row lock, so concurrent interactions of one user do not lose updates
+        embedding_record = db.query(UserEmbedding).filter(
+            and_(
+                UserEmbedding.user_id == user_id,
+                UserEmbedding.model_version == self.user_embedding_version
+            )
+        ).with_for_update().first()
+        
+        if embedding_record:
+            state = (embedding_record.embedding_vector, embedding_record.accumulated_weight or 0.0,
+                     embedding_record.updated_at)
+        else:
+            # First update in this mode: start from the user's history, not from this item alone
+            state = self._running_mean_from_history(user_id, db, exclude=interaction)
+        mean, weight, updated_at = decayed_mean_update(
+            *state, item, self._interaction_weight(interaction), interaction.timestamp,
+            settings.USER_EMBEDDING_HALF_LIFE_DAYS
+        )
+        
+        if embedding_record:
+            embedding_record.embedding_vector = mean.tolist()
+            embedding_record.accumulated_weight = weight
+            embedding_record.updated_at = updated_at
+        else:
+            db.add(UserEmbedding(
+                user_id=user_id,
+                embedding_vector=mean.tolist(),
+                accumulated_weight=weight,
+                updated_at=updated_at,
+                model_version=self.user_embedding_version
+            ))
+        return l2_normalize(mean)
+    
+    def _running_mean_from_history(
+        self, 
+        user_id: int, 
+        db: Session, 
+        exclude: Optional[UserInteraction] = None
+    ) -> Tuple[Optional[np.ndarray], float, Optional[datetime]]:
+        """Running-mean state (mean, weight, updated_at) of the last 30 days of interactions, without ``exclude``."""
+        interactions = db.query(UserInteraction).filter(
+            and_(
+                UserInteraction.user_id == user_id,
+                UserInteraction.timestamp >= datetime.utcnow() - timedelta(days=30)
+            )
+        ).order_by(UserInteraction.timestamp).all()
+        interactions = [interaction for interaction in interactions if interaction is not exclude]
+        
+        items, found = self.post_embeddings.get([interaction.post_id for interaction in interactions])
+        mean, weight, updated_at = None, 0.0, None
+        for interaction, item, has_item in zip(interactions, items, found):
+            if has_item:
+                mean, weight, updated_at = decayed_mean_update(
+                    mean, weight, updated_at, item, self._interaction_weight(interaction),
+                    interaction.timestamp, settings.USER_EMBEDDING_HALF_LIFE_DAYS
+                )
+        return mean, weight, updated_at
+    
+    def _bootstrap_running_mean(self, user_id: int, db: Session) -> Optional[np.ndarray]:
+        """Build a missing running mean once from the last 30 days of interactions."""
+        mean, weight, updated_at = self._running_mean_from_history(user_id, db)
+        if mean is None:
+            return None
+        
+        db.add(UserEmbedding(
+            user_id=user_id,
+            embedding_vector=mean.tolist(),
+            accumulated_weight=weight,
+            updated_at=updated_at,
+            model_version=self.user_embedding_version
+        ))
+        db.commit()
+        embedding = l2_normalize(mean)
+        self.user_embeddings.put([user_id], [embedding])
+        return embedding
+    
+    def _interaction_weight(self, interaction: UserInteraction) -> float:
+        """Interaction-type weight, scaled by the interaction value (e.g. a rating)."""
+        weight = INTERACTION_WEIGHTS.get(interaction.interaction_type, 1.0)
+        if interaction.interaction_value:
+            weight *= interaction.interaction_value
+        return weight
+    
     async def _get_or_generate_post_embeddings(self, posts: List[Post], db: Session) -> List[np.ndarray]:
-        """Get or generate post embedding vectors."""
-        embeddings = []
+        """
+        Get or generate post embedding vectors. The embedding store is read
+        first; the rest are fetched from the database with one IN query per
+        EMBEDDING_FETCH_CHUNK ids (and copied into the store), and misses are
+        generated in a single batch and written with one bulk insert.
+        """
+        if not posts:
+            return []
+        
+        post_ids = list(dict.fromkeys(post.id for post in posts))
+        vectors, found = self.post_embeddings.get(post_ids)
+        embeddings: Dict[int, np.ndarray] = {
+            post_id: vector for post_id, vector, hit in zip(post_ids, vectors, found) if hit
+        }
         
-        for post in posts:
-            # Check if embedding exists
-            embedding_record = db.query(PostEmbedding).filter(
+        post_ids = [post_id for post_id, hit in zip(post_ids, found) if not hit]
+        fetched: Dict[int, np.ndarray] = {}
+        for start in range(0, len(post_ids), EMBEDDING_FETCH_CHUNK):
+            rows = db.query(PostEmbedding.post_id, PostEmbedding.content_embedding).filter(
                 and_(
-                    PostEmbedding.post_id == post.id,
+                    PostEmbedding.post_id.in_(post_ids[start:start + EMBEDDING_FETCH_CHUNK]),
                     PostEmbedding.model_version == self.model_version
                 )
-            ).first()
-            
-            if embedding_record:
-                embeddings.append(np.array(embedding_record.content_embedding))
-            else:
-                # Generate new embedding
-                embedding = await self.content_model.generate_post_embedding(post)
-                
-                # Save embedding
-                embedding_record = PostEmbedding(
-                    post_id=post.id,
-                    content_embedding=embedding.tolist(),
-                    model_version=self.model_version
-                )
-                db.add(embedding_record)
-                embeddings.append(embedding)
+            ).all()
+            for post_id, content_embedding in rows:
+                fetched[post_id] = np.array(content_embedding)
+        if fetched:
+            vectors = l2_normalize(np.vstack(list(fetched.values())))
+            self.post_embeddings.put(list(fetched), vectors)
+            embeddings.update(zip(fetched, vectors))
         
-        db.commit()
-        return embeddings
+        missing = list({post.id: post for post in posts if post.id not in embeddings}.values())
+        if missing:
+            # Normalized at write time, matching the embedding store
+            generated = list(l2_normalize(
+                await self.content_model.generate_post_embeddings(missing, store=self.post_embeddings)
+            ))
+            db.bulk_insert_mappings(PostEmbedding, [
+                {
+                    "post_id": post.id,
+                    "content_embedding": embedding.tolist(),
+                    "model_version": self.model_version
+                }
+                for post, embedding in zip(missing, generated)
+            ])
+            db.commit()
+            embeddings.update((post.id, embedding) for post, embedding in zip(missing, generated))
+        
+        return [embeddings[post.id] for post in posts]
     
     def _combine_scores(
         self, 
@@ -501,89 +757,24 @@ class RecommendationEngine:
     
     def _convert_to_post_response(self, post: Post) -> PostResponse:
         """Convert database Post model to API response format."""
-        return PostResponse(
-            id=post.id,
-            title=post.title,
-            slug=post.slug,
-            owner={
-                "first_name": post.owner.first_name or "",
-                "last_name": post.owner.last_name or "",
-                "name": f"{post.owner.first_name or ''} {post.owner.last_name or ''}".strip(),
-                "username": post.owner.username,
-                "picture_url": post.owner.picture_url or "",
-                "user_type": post.owner.user_type,
-                "has_evm_wallet": post.owner.has_evm_wallet,
-                "has_solana_wallet": post.owner.has_solana_wallet
-            },
-            category={
-                "id": post.category.id,
-                "name": post.category.name,
-                "count": post.category.count,
-                "description": post.category.description or "",
-                "image_url": post.category.image_url or ""
-            },
-            topic={
-                "id": post.topic.id,
-                "name": post.topic.name,
-                "description": post.topic.description or "",
-                "image_url": post.topic.image_url or "",
-                "slug": post.topic.slug,
-                "is_public": post.topic.is_public,
-                "project_code": post.topic.project_code or "",
-                "posts_count": post.topic.posts_count,
-                "language": post.topic.language,
-                "created_at": post.topic.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "owner": {
-                    "first_name": post.topic.owner.first_name or "",
-                    "last_name": post.topic.owner.last_name or "",
-                    "name": f"{post.topic.owner.first_name or ''} {post.topic.owner.last_name or ''}".strip(),
-                    "username": post.topic.owner.username,
-                    "profile_url": post.topic.owner.picture_url or "",
-                    "user_type": post.topic.owner.user_type or ""
-                }
-            },
-            video_link=post.video_link or "",
-            thumbnail_url=post.thumbnail_url or "",
-            gif_thumbnail_url=post.gif_thumbnail_url,
-            view_count=post.view_count,
-            upvote_count=post.upvote_count,
-            comment_count=post.comment_count,
-            share_count=post.share_count,
-            bookmark_count=post.bookmark_count,
-            rating_count=post.rating_count,
-            average_rating=post.average_rating,
-            is_available_in_public_feed=post.is_available_in_public_feed,
-            is_locked=post.is_locked,
-            tags=post.tags or [],
-            created_at=int(post.created_at.timestamp() * 1000),
-            identifier=post.slug[:7],  # Generate identifier from slug
-            exit_count=0,  # Default value
-            contract_address="",
-            chain_id="",
-            chart_url="",
-            baseToken={}
-        )
+        return to_post_response(post)
     
     async def _log_recommendation(
         self, 
         user_id: int, 
         post_ids: List[int], 
         algorithm: str, 
-        scores: List[float], 
-        db: Session
+        scores: List[float]
     ):
-        """Log recommendation for analysis and improvement."""
+        """Log recommendation for analysis and improvement (buffered, written in bulk)."""
         try:
-            log_entry = RecommendationLog(
-                user_id=user_id,
-                recommended_posts=post_ids,
-                algorithm_used=algorithm,
-                confidence_scores=scores,
-                timestamp=datetime.utcnow()
-            )
-            
-            db.add(log_entry)
-            db.commit()
+            await recommendation_log_buffer.add_async({
+                "user_id": user_id,
+                "recommended_posts": post_ids,
+                "algorithm_used": algorithm,
+                "confidence_scores": scores,
+                "timestamp": datetime.utcnow()
+            })
             
         except Exception as e:
             logger.error(f"Error logging recommendation: {str(e)}")
@@ -625,117 +816,93 @@ class RecommendationEngine:
     
     async def _get_content_based_scores(self, user_profile: Dict, posts: List[Post]) -> List[float]:
         """Calculate content-based recommendation scores."""
-        scores = []
-        
-        for post in posts:
-            score = 0.0
-            
-            # Category preference
-            user_prefs = user_profile.get("preferences", {})
-            preferred_categories = user_prefs.get("categories", [])
-            if post.category.name in preferred_categories:
-                score += 2.0
-            
-            # Engagement metrics
-            score += np.log(post.view_count + 1) / 10
-            score += np.log(post.upvote_count + 1) / 5
-            score += post.average_rating / 25
-            
-            # Recency boost
-            days_old = (datetime.utcnow() - post.created_at).days
-            if days_old < 7:
-                score += 1.0
-            elif days_old < 30:
-                score += 0.5
-            
-            scores.append(score)
-        
-        return scores
+        return content_based_scores(*self._content_features(user_profile, posts))
+    
+    def _content_features(self, user_profile: Dict, posts: List[Post]) -> Tuple:
+        """Plain (picklable) inputs of content_based_scores, read from the ORM objects."""
+        user_prefs = user_profile.get("preferences", {})
+        return (
+            list(user_prefs.get("categories", [])),
+            [post.category.name for post in posts],
+            [post.view_count for post in posts],
+            [post.upvote_count for post in posts],
+            [post.average_rating for post in posts],
+            [post.created_at for post in posts],
+            datetime.utcnow()
+        )
     
     async def _score_category_posts(self, user_profile: Dict, posts: List[Post]) -> List[float]:
         """Score posts within a specific category."""
-        scores = []
-        
-        for post in posts:
-            score = 0.0
-            
-            # Base engagement score
-            score += np.log(post.view_count + 1) / 10
-            score += np.log(post.upvote_count + 1) / 5
-            score += post.average_rating / 25
-            
-            # User interaction history bonus
-            interaction_patterns = user_profile.get("interaction_patterns", {})
-            engagement_score = interaction_patterns.get("engagement_score", 0)
-            score += engagement_score
-            
-            # Recency factor
-            days_old = (datetime.utcnow() - post.created_at).days
-            recency_factor = max(0, 1 - days_old / 30)  # Decay over 30 days
-            score *= (1 + recency_factor)
-            
-            scores.append(score)
-        
-        return scores
+        interaction_patterns = user_profile.get("interaction_patterns", {})
+        return category_scores(
+            interaction_patterns.get("engagement_score", 0),
+            [post.view_count for post in posts],
+            [post.upvote_count for post in posts],
+            [post.average_rating for post in posts],
+            [post.created_at for post in posts],
+            datetime.utcnow()
+        )
     
     def _calculate_cosine_similarity(self, vec1: np.ndarray, vec_list: List[np.ndarray]) -> List[float]:
-        """Calculate cosine similarity between one vector and a list of vectors."""
-        similarities = []
-        
-        for vec2 in vec_list:
-            # Calculate cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                similarity = 0.0
-            else:
-                similarity = dot_product / (norm1 * norm2)
-            
-            similarities.append(similarity)
-        
-        return similarities
+        """Calculate cosine similarity between one vector and a list of vectors (0.0 for zero vectors)."""
+        if not len(vec_list):
+            return []
+        return cosine_similarity(vec1, np.vstack(vec_list)).tolist()
     
     async def _update_user_embedding(self, user_id: int, db: Session):
         """Update user embedding based on recent interactions."""
+        await self._update_user_embeddings([user_id], db)
+    
+    async def _update_user_embeddings(self, user_ids: List[int], db: Session):
+        """Regenerate the embeddings of users with enough recent interactions and write them in bulk."""
         try:
-            # Get recent interactions
-            recent_interactions = db.query(UserInteraction).filter(
+            # Recent interaction counts of the whole batch in one query
+            recent_counts = db.query(
+                UserInteraction.user_id,
+                func.count(UserInteraction.id)
+            ).filter(
                 and_(
-                    UserInteraction.user_id == user_id,
+                    UserInteraction.user_id.in_(user_ids),
                     UserInteraction.timestamp >= datetime.utcnow() - timedelta(days=30)
                 )
-            ).all()
-            
-            if len(recent_interactions) < 5:
-                return  # Not enough data for update
-            
-            # Generate new embedding
-            user_profile = await self._get_user_profile(user_id, db)
-            new_embedding = await self.content_model.generate_user_embedding(user_profile)
-            
-            # Update or create embedding record
-            embedding_record = db.query(UserEmbedding).filter(
-                and_(
-                    UserEmbedding.user_id == user_id,
-                    UserEmbedding.model_version == self.model_version
-                )
-            ).first()
-            
-            if embedding_record:
-                embedding_record.embedding_vector = new_embedding.tolist()
-                embedding_record.updated_at = datetime.utcnow()
-            else:
-                embedding_record = UserEmbedding(
-                    user_id=user_id,
-                    embedding_vector=new_embedding.tolist(),
-                    model_version=self.model_version
-                )
-                db.add(embedding_record)
+            ).group_by(UserInteraction.user_id).all()
+            
+            # Users with too little data keep their embedding
+            eligible = [user_id for user_id, count in recent_counts if count >= 5]
+            if not eligible:
+                return
+            
+            # Generate new embeddings
+            new_embeddings = {}
+            for user_id in eligible:
+                user_profile = await self._get_user_profile(user_id, db)
+                new_embeddings[user_id] = l2_normalize(await self.content_model.generate_user_embedding(user_profile))
+            
+            # Update or create embedding records, in one transaction
+            existing = {
+                record.user_id: record for record in db.query(UserEmbedding).filter(
+                    and_(
+                        UserEmbedding.user_id.in_(eligible),
+                        UserEmbedding.model_version == self.user_embedding_version
+                    )
+                ).all()
+            }
+            now = datetime.utcnow()
+            for user_id, embedding in new_embeddings.items():
+                embedding_record = existing.get(user_id)
+                if embedding_record:
+                    embedding_record.embedding_vector = embedding.tolist()
+                    embedding_record.updated_at = now
+                else:
+                    db.add(UserEmbedding(
+                        user_id=user_id,
+                        embedding_vector=embedding.tolist(),
+                        model_version=self.user_embedding_version
+                    ))
             
             db.commit()
+            self.user_embeddings.put(list(new_embeddings), list(new_embeddings.values()))
             
         except Exception as e:
-            logger.error(f"Error updating user embedding: {str(e)}")
-            db.rollback()
\ No newline at end of file
+            logger.error(f"Error updating user embeddings: {str(e)}")
+            db.rollback()
@@ -0,0 +1,40 @@
+import numpy as np
+from datetime import datetime
+from typing import Optional, Tuple
+
+def decay_factor(elapsed_seconds: float, half_life_days: float) -> float:
+    """Weight left after ``elapsed_seconds`` under exponential decay with the given half-life."""
+    if half_life_days <= 0:
+        return 1.0
+    return float(0.5 ** (max(elapsed_seconds, 0.0) / (half_life_days * 86400)))
+
+def decayed_mean_update(
+    mean: Optional[np.ndarray],
+    weight: float,
+    updated_at: Optional[datetime],
+    item: np.ndarray,
+    item_weight: float,
+    at: datetime,
+    half_life_days: float,
+) -> Tuple[np.ndarray, float, datetime]:
+    """
+    Fold one item embedding into a time-decayed weighted running mean, in
+    O(dim) time regardless of how many items the mean already holds.
+
+    The state is ``(mean, weight, updated_at)``: the weighted mean of every
+    item folded in so far and the sum of their weights, both as of
+    ``updated_at``. Weights halve every ``half_life_days``. Items older than
+    the state (out-of-order events) are decayed instead of the state.
+    """
+    item = np.asarray(item, dtype=np.float32)
+    if mean is None or weight <= 0 or updated_at is None:
+        return item.copy(), float(item_weight), at
+
+    now = max(updated_at, at)
+    kept = weight * decay_factor((now - updated_at).total_seconds(), half_life_days)
+    added = item_weight * decay_factor((now - at).total_seconds(), half_life_days)
+    total = kept + added
+    if total <= 0:
+        return np.asarray(mean, dtype=np.float32), kept, now
+    new_mean = (kept * np.asarray(mean, dtype=np.float32) + added * item) / total
+    return new_mean.astype(np.float32), float(total), now
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import inspect
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ScoringStage(NamedTuple):
+    """
+    One independent scorer of the candidate set. ``fn`` is a synchronous
+    callable run on a worker thread, so it must not share the request's
+    database session. Stages marked ``process_safe`` (a module-level
+    function with picklable arguments) run in the process pool when it is
+    enabled.
+    """
+    name: str
+    fn: Callable
+    args: Sequence[Any] = ()
+    process_safe: bool = False
+
+def _run_stage(fn: Callable, args: Sequence[Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+class ScoringExecutor:
+    """
+    Runs the scorer stages of a request concurrently on a bounded thread
+    pool (NumPy, PyTorch and the database driver release the GIL), with an
+    optional process pool for process-safe stages. Reports per-stage
+    wall-clock time.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, process_workers: Optional[int] = None):
+        self.threads = ThreadPoolExecutor(
+            max_workers=max_workers or settings.SCORING_WORKERS, thread_name_prefix="scoring"
+        )
+        process_workers = settings.SCORING_PROCESS_WORKERS if process_workers is None else process_workers
+        self.processes = ProcessPoolExecutor(max_workers=process_workers) if process_workers else None
+
+    async def run(self, stages: Sequence[ScoringStage]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Results and timings (ms) keyed by stage name. The first failing stage's error is raised."""
+        loop = asyncio.get_running_loop()
+        for stage in stages:
+            if inspect.iscoroutinefunction(stage.fn):
+                raise TypeError(f"Scoring stage {stage.name} must be synchronous")
+        futures = []
+        for stage in stages:
+            executor = self.processes if stage.process_safe and self.processes else self.threads
+            futures.append(loop.run_in_executor(executor, _run_stage, stage.fn, tuple(stage.args)))
+        outcomes = await asyncio.gather(*futures)
+        results = {stage.name: result for stage, (result, _) in zip(stages, outcomes)}
+        timings = {stage.name: round(elapsed * 1000, 2) for stage, (_, elapsed) in zip(stages, outcomes)}
+        logger.debug(f"Scoring stage timings (ms): {timings}")
+        return results, timings
+
+    def shutdown(self):
+        self.threads.shutdown(wait=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=True)
+
+_executor: Optional[ScoringExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_scoring_executor() -> ScoringExecutor:
+    """Process-wide executor, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ScoringExecutor()
+        return _executor
@@ -0,0 +1,44 @@
+import numpy as np
+from typing import Optional
+
+# Matrix rows per block in blocked mode
+SIMILARITY_BLOCK_ROWS = 65536
+
+def l2_normalize(vectors) -> np.ndarray:
+    """float32 copy of ``vectors`` scaled to unit length along the last axis; zero vectors stay zero."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def cosine_similarity(
+    query: np.ndarray,
+    matrix: np.ndarray,
+    normalized: bool = False,
+    block_rows: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Cosine similarity of one vector against every row of ``matrix`` as a
+    single mat-vec. Pass ``normalized=True`` when the rows are already unit
+    length (as in the embedding store); ``block_rows`` bounds the temporary
+    memory to that many rows at a time.
+    """
+    return cosine_similarity_matrix(np.asarray(query)[None, :], matrix, normalized, block_rows)[0]
+
+def cosine_similarity_matrix(
+    queries: np.ndarray,
+    matrix: np.ndarray,
+    normalized: bool = False,
+    block_rows: Optional[int] = None,
+) -> np.ndarray:
+    """(len(queries) x len(matrix)) cosine similarities as a single matmul, optionally blocked."""
+    queries = l2_normalize(queries)
+    if not block_rows and normalized:
+        return queries @ np.asarray(matrix, dtype=np.float32).T
+    block_rows = block_rows or len(matrix)
+    out = np.empty((len(queries), len(matrix)), dtype=np.float32)
+    for start in range(0, len(matrix), max(block_rows, 1)):
+        block = np.asarray(matrix[start:start + block_rows], dtype=np.float32)
+        if not normalized:
+            block = l2_normalize(block)
+        out[:, start:start + len(block)] = queries @ block.T
+    return out
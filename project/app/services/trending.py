@@ -0,0 +1,143 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+import base64
+import binascii
+import json
+import logging
+import math
+from datetime import datetime
+
+from app.database.models import Post, TrendingScore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Posts read per chunk when rebuilding every score
+TRENDING_REFRESH_CHUNK = 1000
+
+_EPOCH = datetime(1970, 1, 1)
+
+def engagement(post: Post) -> float:
+    """Weighted engagement of a post: views, upvotes and shares."""
+    return (post.view_count or 0) * 0.3 + (post.upvote_count or 0) * 0.4 + (post.share_count or 0) * 0.3
+
+def trending_key(engagement_value: float, created_at: datetime, half_life_hours: Optional[float] = None) -> float:
+    """
+    Sort key of a post under exponential time decay.
+
+    The trending score at time ``now`` is
+        (1 + engagement) * 2 ** (-(now - created_at) / half_life)
+    (the 1 keeps posts without engagement finite) and its logarithm is
+        log1p(engagement) + created_at * ln 2 / half_life - now * ln 2 / half_life.
+    The last term is the same for every post, so ordering by the first two
+    terms is ordering by the decayed score at any ``now``. The stored key
+    therefore never goes stale as posts age; it only changes when a post's
+    engagement does.
+    """
+    half_life = (half_life_hours or settings.TRENDING_HALF_LIFE_HOURS) * 3600
+    age_term = (created_at - _EPOCH).total_seconds() * math.log(2) / half_life
+    return math.log1p(max(engagement_value, 0.0)) + age_term
+
+def refresh_trending_scores(db: Session, post_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the stored trending keys of ``post_ids`` (every post when None)
+    after their engagement or visibility changed. The caller commits.
+    """
+    if post_ids is not None:
+        post_ids = list(post_ids)
+        chunks = [post_ids[i:i + TRENDING_REFRESH_CHUNK] for i in range(0, len(post_ids), TRENDING_REFRESH_CHUNK)]
+    refreshed = 0
+    last_id = None
+    while True:
+        query = db.query(Post)
+        if post_ids is not None:
+            if not chunks:
+                break
+            posts = query.filter(Post.id.in_(chunks.pop())).all()
+        else:
+            # Keyset over the primary key, so a full rebuild reads bounded chunks
+            if last_id is not None:
+                query = query.filter(Post.id > last_id)
+            posts = query.order_by(Post.id).limit(TRENDING_REFRESH_CHUNK).all()
+            if not posts:
+                break
+            last_id = posts[-1].id
+
+        existing = {
+            row.post_id: row for row in db.query(TrendingScore).filter(
+                TrendingScore.post_id.in_([post.id for post in posts])
+            ).all()
+        }
+        for post in posts:
+            row = existing.get(post.id) or TrendingScore(post_id=post.id)
+            row.category = post.category.name if post.category else None
+            row.listed = bool(post.is_available_in_public_feed and not post.is_locked)
+            row.score = trending_key(engagement(post), post.created_at)
+            row.created_at = post.created_at
+            if post.id not in existing:
+                db.add(row)
+        refreshed += len(posts)
+    return refreshed
+
+def backfill_trending_scores(db: Session) -> int:
+    """
+    Compute the trending keys of posts that have none yet: posts written
+    outside the collector (seeding scripts) or before trending keys were
+    stored. One anti-join when nothing is missing. The caller commits.
+    """
+    missing = db.query(Post.id).outerjoin(TrendingScore, TrendingScore.post_id == Post.id).filter(
+        TrendingScore.post_id == None
+    ).all()
+    if not missing:
+        return 0
+    return refresh_trending_scores(db, [post_id for post_id, in missing])
+
+def trending_page(
+    db: Session,
+    limit: int,
+    category: Optional[str] = None,
+    after: Optional[Tuple[float, int]] = None,
+    since: Optional[datetime] = None,
+    offset: int = 0,
+) -> List[TrendingScore]:
+    """
+    One page of listed posts, best trending key first, read as a range scan
+    of the (category, listed, score, post_id) index. ``after`` is the
+    (score, post_id) of the last row of the previous page.
+    """
+    query = db.query(TrendingScore).filter(TrendingScore.listed == True)
+    if category:
+        query = query.filter(TrendingScore.category == category)
+    if after is not None:
+        score, post_id = after
+        query = query.filter(
+            # The plain bound lets the index seek to the cursor; the OR settles ties
+            TrendingScore.score <= score,
+            or_(
+                TrendingScore.score < score,
+                and_(TrendingScore.score == score, TrendingScore.post_id < post_id)
+            )
+        )
+    if since is not None:
+        query = query.filter(TrendingScore.created_at >= since)
+    query = query.order_by(TrendingScore.score.desc(), TrendingScore.post_id.desc())
+    if offset:
+        query = query.offset(offset)
+    return query.limit(limit).all()
+
+def encode_trending_cursor(row: TrendingScore) -> str:
+    """Opaque cursor continuing after ``row``."""
+    raw = json.dumps({"s": row.score, "p": row.post_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_trending_cursor(cursor: str) -> Tuple[float, int]:
+    """(score, post_id) of a cursor; ValueError if it was not made by encode_trending_cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        score, post_id = data["s"], data["p"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(score, (int, float)) or not isinstance(post_id, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return float(score), post_id
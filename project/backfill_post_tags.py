@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Populate the tags/post_tags side tables for posts that were stored before
+tags were normalized at ingest time
+"""
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from app.database.database import SessionLocal, engine, Base
+from app.database import models
+from app.catalog import sync_post_tags
+
+BATCH_SIZE = 1000
+
+def backfill_post_tags():
+    """Re-sync normalized tags for every post, in id order"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        last_id = 0
+        synced = 0
+        while True:
+            posts = db.execute(
+                select(models.Post).where(models.Post.id > last_id).order_by(models.Post.id).limit(BATCH_SIZE)
+            ).scalars().all()
+            if not posts:
+                break
+            sync_post_tags(db, posts)
+            db.commit()
+            last_id = posts[-1].id
+            synced += len(posts)
+            db.expunge_all()
+        print(f"Synced tags for {synced} posts")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    load_dotenv()
+    backfill_post_tags()
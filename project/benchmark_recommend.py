@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized feed scoring in app/recommend.py against the
+original per-post score_post_for_user loop on a synthetic catalog
+"""
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database.database import Base
+from app.database import models
+from app import recommend, catalog, profiles
+
+def build_database(n_posts: int, n_tags: int, n_interactions: int, seed: int = 42):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(seed)
+    tags = [f"tag{i}" for i in range(n_tags)]
+    db = SessionLocal()
+    db.add(models.User(id=1, username="bench"))
+    db.bulk_insert_mappings(models.Post, [{
+        "id": i + 1,
+        "title": f"Post {i}",
+        "slug": f"post-{i}",
+        "tags": rng.sample(tags, rng.randint(1, 6)),
+        "view_count": rng.randint(0, 10000),
+        "upvote_count": rng.randint(0, 500),
+        "bookmark_count": rng.randint(0, 100),
+    } for i in range(n_posts)])
+    db.bulk_insert_mappings(models.Interaction, [{
+        "user_id": 1,
+        "post_id": rng.randint(1, n_posts),
+        "type": rng.choice(list(profiles.WEIGHTS)),
+        "value": rng.uniform(0, 5),
+    } for _ in range(n_interactions)])
+    db.commit()
+    db.close()
+    return SessionLocal
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--interactions", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'posts':>8} {'loop (ms)':>12} {'vectorized (ms)':>16} {'speedup':>8}  same top_k")
+    for n_posts in args.posts:
+        SessionLocal = build_database(n_posts, args.tags, args.interactions)
+        db = SessionLocal()
+        posts = recommend.fetch_posts(db)
+        profile = recommend.get_user_profile(db, 1)
+        seen_counts = recommend.get_seen_counts(db, 1)
+        snapshot = catalog.PostCatalog.load(db)
+        tag_weights = recommend.profile_tag_weights(snapshot, profile)
+
+        def loop():
+            scored = [(recommend.score_post_for_user(db, 1, p, profile, seen_counts=seen_counts), p.id) for p in posts]
+            scored.sort(key=lambda x: x[0], reverse=True)
+            return [post_id for _, post_id in scored[:args.top_k]]
+
+        def vectorized():
+            snapshot._tag_matrix = None  # include matrix construction
+            scores = recommend.score_catalog_for_user(snapshot, tag_weights, seen_counts)
+            return snapshot.ids[recommend.select_top_k(scores, args.top_k, snapshot.ids)].tolist()
+
+        loop_s, expected = timed(loop, args.repeat)
+        vec_s, actual = timed(vectorized, args.repeat)
+        print(f"{n_posts:>8} {loop_s * 1000:>12.1f} {vec_s * 1000:>16.1f} {loop_s / vec_s:>7.1f}x  {expected == actual}")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Train the similar-content IVF index over the post embedding store and
+report recall@k against an exact scan for a range of nprobe values
+"""
+import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import numpy as np
+from dotenv import load_dotenv
+from app.core.config import settings
+from app.services.embedding_store import get_embedding_store
+from app.services.ann_index import IVFIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-version", default=settings.EMBEDDING_MODEL_VERSION)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--sample", type=int, default=None)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    store = get_embedding_store("post", args.model_version)
+    index = IVFIndex.open(store, "post", args.model_version)
+    start = time.perf_counter()
+    index.train(nlist=args.nlist, sample_size=args.sample, iterations=args.iterations)
+    print(f"Trained {len(index.centroids)} lists over {len(store)} posts in {time.perf_counter() - start:.1f}s")
+
+    ids, vectors = store.matrix()
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.choice(len(ids), min(args.queries, len(ids)), replace=False)]
+    exact = IVFIndex(store, index.path)
+    exact.centroids = None  # scan every row
+    truth = [set(exact.search(q, args.k)[0].tolist()) for q in queries]
+    print(f"{'nprobe':>8} {'recall@k':>10} {'ms/query':>10}")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found = [index.search(q, args.k, nprobe=nprobe)[0] for q in queries]
+        elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([len(t & set(f.tolist())) / max(len(t), 1) for t, f in zip(truth, found)])
+        print(f"{nprobe:>8} {recall:>10.3f} {elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Copy user and post embeddings of one model version from the database into
+the memory-mapped embedding stores, so API workers start without reading
+embeddings from the database
+"""
+import os
+import sys
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+from dotenv import load_dotenv
+from app.database.database import SessionLocal
+from app.database.models import UserEmbedding, PostEmbedding
+from app.services.embedding_store import get_embedding_store
+
+BATCH_SIZE = 10000
+
+def export_embeddings(db, model, id_column, vector_column, kind: str, model_version: str) -> int:
+    store = get_embedding_store(kind, model_version)
+    last_id, exported = 0, 0
+    while True:
+        rows = db.query(id_column, vector_column).filter(
+            model.model_version == model_version, id_column > last_id
+        ).order_by(id_column).limit(BATCH_SIZE).all()
+        if not rows:
+            break
+        store.put([row[0] for row in rows], [row[1] for row in rows])
+        last_id = rows[-1][0]
+        exported += len(rows)
+    return exported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-version", default="v1.0")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        users = export_embeddings(db, UserEmbedding, UserEmbedding.user_id, UserEmbedding.embedding_vector,
+                                  "user", args.model_version)
+        posts = export_embeddings(db, PostEmbedding, PostEmbedding.post_id, PostEmbedding.content_embedding,
+                                  "post", args.model_version)
+        print(f"Exported {users} user and {posts} post embeddings for {args.model_version}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()
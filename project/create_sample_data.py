@@ -9,6 +9,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 from dotenv import load_dotenv
 from app.database.database import SessionLocal
 from app.database import models
+from app.catalog import sync_post_tags
+from app.profiles import apply_interaction
 import json
 
 def create_sample_data():
@@ -119,6 +121,7 @@ def create_sample_data():
             db.add(post)
             posts.append(post)
         
+        sync_post_tags(db, posts)
         db.commit()
         print(f"Created {len(posts)} posts")
         
@@ -155,6 +158,7 @@ def create_sample_data():
         for interaction_data in interactions_data:
             interaction = models.Interaction(**interaction_data)
             db.add(interaction)
+            apply_interaction(db, interaction)
             interactions.append(interaction)
         
         db.commit()
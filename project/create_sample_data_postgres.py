@@ -12,8 +12,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database.models import (
     User, Post, Category, Topic, UserInteraction, 
-    UserEmbedding, PostEmbedding, RecommendationLog, Base
+    UserEmbedding, PostEmbedding, RecommendationLog, TrendingScore, Base
 )
+from app.services.trending import refresh_trending_scores
 from datetime import datetime, timedelta
 import random
 import json
@@ -516,6 +517,7 @@ def main():
         print("📝 Clearing existing data...")
         try:
             db.query(RecommendationLog).delete()
+            db.query(TrendingScore).delete()
             db.query(PostEmbedding).delete()
             db.query(UserEmbedding).delete()
             db.query(UserInteraction).delete()
@@ -561,6 +563,11 @@ def main():
         update_counts(categories, topics, posts)
         print("   ✅ Updated all counts")
         
+        print("📈 Computing trending scores...")
+        trending = refresh_trending_scores(db, [post.id for post in posts])
+        db.commit()
+        print(f"   ✅ Computed trending scores for {trending} posts")
+        
         print("\n🎉 Sample data creation completed successfully!")
         print("\n📊 Summary:")
         print(f"   • {len(users)} Users with diverse profiles")
@@ -14,6 +14,7 @@ from app.database.models import (
     User, Post, Category, Topic, UserInteraction, 
     UserEmbedding, PostEmbedding, RecommendationLog, Base
 )
+from app.services.trending import refresh_trending_scores
 from datetime import datetime, timedelta
 import random
 import json
@@ -398,6 +399,11 @@ def main():
         interactions = create_user_interactions(users, posts)
         print(f"   ✅ Created {len(interactions)} interactions")
         
+        print("📈 Computing trending scores...")
+        trending = refresh_trending_scores(db, [post.id for post in posts])
+        db.commit()
+        print(f"   ✅ Computed trending scores for {trending} posts")
+        
         print("\n🎉 Sample data creation completed successfully!")
         print(f"\n📊 Summary:")
         print(f"   • {len(users)} Users with diverse profiles")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Rebuild the stored user tag profiles from interaction history.
+Run this after changing WEIGHTS in app/profiles.py.
+"""
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+from dotenv import load_dotenv
+from app.database.database import SessionLocal, engine, Base
+from app.profiles import rebuild_user_profiles
+
+def main():
+    load_dotenv()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rebuilt = rebuild_user_profiles(db)
+        db.commit()
+        print(f"Rebuilt profiles for {rebuilt} users")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
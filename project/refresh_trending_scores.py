@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Rebuild the precomputed trending keys of every post.
+Run this after changing TRENDING_HALF_LIFE_HOURS; new engagement is picked up
+as posts are collected.
+"""
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+from dotenv import load_dotenv
+from app.database.database import SessionLocal, engine, Base
+from app.services.trending import refresh_trending_scores
+
+def main():
+    load_dotenv()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        refreshed = refresh_trending_scores(db)
+        db.commit()
+        print(f"Refreshed trending scores for {refreshed} posts")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import pytest
+
+from app.services.embedding_store import EmbeddingStore
+from app.services.ann_index import IVFIndex
+
+DIM = 16
+
+def clustered(n, n_clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, DIM))
+    return centers[rng.integers(0, n_clusters, n)] + 0.1 * rng.standard_normal((n, DIM))
+
+def exact_top_k(ids, vectors, query, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    return ids[np.argsort(-scores)[:k]].tolist()
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"), dim=DIM)
+    store.put(np.arange(1, 2001), clustered(2000))
+    return store
+
+def test_untrained_index_scans_exactly(store, tmp_path):
+    index = IVFIndex(store, str(tmp_path / "ann"))
+    ids, vectors = store.matrix()
+    query = vectors[5]
+    found, scores = index.search(query, 10)
+    assert found.tolist() == exact_top_k(ids, vectors, query, 10)
+    assert np.all(np.diff(scores) <= 0)
+
+def test_trained_index_recall(store, tmp_path):
+    index = IVFIndex(store, str(tmp_path / "ann"), nprobe=8)
+    index.train(nlist=40)
+    ids, vectors = store.matrix()
+    recalls = []
+    for row in range(0, 2000, 100):
+        expected = set(exact_top_k(ids, vectors, vectors[row], 10))
+        recalls.append(len(expected & set(index.search(vectors[row], 10)[0].tolist())) / 10)
+    assert np.mean(recalls) >= 0.9
+
+def test_new_rows_tombstones_and_exclusions(store, tmp_path):
+    index = IVFIndex(store, str(tmp_path / "ann"), nprobe=40)
+    index.train(nlist=40)
+    query = np.ones(DIM)
+    store.put([5000], [query * 3])
+    assert index.search(query, 1)[0].tolist() == [5000]
+    assert 5000 not in index.search(query, 5, exclude=[5000])[0].tolist()
+    store.delete([5000])
+    assert 5000 not in index.search(query, 5)[0].tolist()
+
+def test_persisted_index_is_reloaded(store, tmp_path):
+    index = IVFIndex(store, str(tmp_path / "ann"))
+    index.train(nlist=10)
+    store.put([9000], [np.ones(DIM)])
+    index.sync()
+    reopened = IVFIndex(store, str(tmp_path / "ann"))
+    assert reopened.trained
+    np.testing.assert_array_equal(reopened.centroids, index.centroids)
+    assert sum(len(l) for l in reopened._lists) == 2001
+
+def test_search_leaves_new_rows_to_sync(store, tmp_path):
+    index = IVFIndex(store, str(tmp_path / "ann"), nprobe=1)
+    index.train(nlist=40)
+    lists_path = os.path.join(index.path, "lists.i32")
+    size = os.path.getsize(lists_path)
+    store.put([7000], [np.ones(DIM)])
+    assert index.search(np.ones(DIM), 1)[0].tolist() == [7000]
+    assert os.path.getsize(lists_path) == size
+    index.sync()
+    assert os.path.getsize(lists_path) == size + 4
+    assert index.search(np.ones(DIM), 1, nprobe=40)[0].tolist() == [7000]
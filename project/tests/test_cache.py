@@ -0,0 +1,125 @@
+import time
+import threading
+
+from app import cache as cache_module
+from app.cache import LRUCache, RedisTier, ResultCache, build_cache
+from app.core.config import settings
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py calls used by RedisTier."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and time.time() >= expires:
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.calls += 1
+        self.data[key] = (value.encode() if isinstance(value, str) else value,
+                          time.time() + ex if ex else None)
+
+    def incr(self, key):
+        self.calls += 1
+        value = int(self.get(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("down")
+        return fail
+
+class Counter:
+    def __init__(self, value="v"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [self.value, self.calls]
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1 and cache.get("b") is None and cache.get("c") == 3
+
+def test_hits_skip_compute_and_keys_include_params():
+    cache = ResultCache(ttl=60)
+    compute = Counter()
+    assert cache.get_or_compute(1, ("feed", 5), compute) == ["v", 1]
+    assert cache.get_or_compute(1, ("feed", 5), compute) == ["v", 1]
+    assert cache.get_or_compute(1, ("feed", 10), compute) == ["v", 2]
+    assert cache.get_or_compute(2, ("feed", 5), compute) == ["v", 3]
+
+def test_invalidate_user_drops_only_that_user():
+    cache = ResultCache(ttl=60)
+    compute = Counter()
+    cache.get_or_compute(1, ("feed", 5), compute)
+    cache.get_or_compute(2, ("feed", 5), compute)
+    cache.invalidate_user(1)
+    assert cache.get_or_compute(1, ("feed", 5), compute) == ["v", 3]
+    assert cache.get_or_compute(2, ("feed", 5), compute) == ["v", 2]
+
+def test_stale_entry_is_served_while_refreshing(monkeypatch):
+    cache = ResultCache(ttl=10, stale_ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    refreshed = threading.Event()
+    compute = Counter()
+
+    def slow_compute():
+        result = compute()
+        refreshed.set()
+        return result
+
+    cache.get_or_compute(1, ("feed",), slow_compute)
+    refreshed.clear()
+    now[0] += 15  # stale but within the grace period
+    assert cache.get_or_compute(1, ("feed",), slow_compute) == ["v", 1]
+    assert refreshed.wait(5)
+    cache._executor.shutdown(wait=True)
+    assert cache.get_or_compute(1, ("feed",), slow_compute) == ["v", 2]
+    now[0] += 100  # past the grace period: recomputed inline
+    assert cache.get_or_compute(1, ("feed",), slow_compute) == ["v", 3]
+
+def test_shared_tier_is_used_across_instances():
+    store = FakeRedis()
+    first = ResultCache(ttl=60, shared=RedisTier(store))
+    second = ResultCache(ttl=60, shared=RedisTier(store))
+    compute = Counter()
+    first.get_or_compute(1, ("feed", 5), compute)
+    assert second.get_or_compute(1, ("feed", 5), compute) == ["v", 1]
+    # An interaction written through one worker invalidates the other
+    first.invalidate_user(1)
+    assert second.get_or_compute(1, ("feed", 5), compute) == ["v", 2]
+
+def test_unavailable_shared_tier_falls_back_to_compute():
+    cache = ResultCache(ttl=60, shared=RedisTier(BrokenRedis()))
+    compute = Counter()
+    assert cache.get_or_compute(1, ("feed",), compute) == ["v", 1]
+    assert cache.get_or_compute(1, ("feed",), compute) == ["v", 1]
+    cache.invalidate_user(1)
+    assert cache.get_or_compute(1, ("feed",), compute) == ["v", 2]
+
+def test_local_backend_caps_entry_lifetime(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "local")
+    monkeypatch.setattr(settings, "CACHE_LOCAL_TTL", 30)
+    cache = build_cache()
+    # Invalidations from the collection scripts cannot reach this process
+    assert (cache.ttl, cache.stale_ttl) == (30, 30)
+
+def test_shared_backend_keeps_full_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "redis")
+    monkeypatch.setattr(cache_module.RedisTier, "from_url", classmethod(lambda cls, url: cls(FakeRedis())))
+    cache = build_cache()
+    assert (cache.ttl, cache.stale_ttl) == (settings.CACHE_TTL, settings.CACHE_STALE_TTL)
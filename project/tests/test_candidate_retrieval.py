@@ -0,0 +1,45 @@
+import asyncio
+
+from app.services.candidate_retrieval import CandidateGenerator, CandidateRetriever
+
+class FixedGenerator(CandidateGenerator):
+    def __init__(self, name, ids, fail=False):
+        self.name = name
+        self.ids = ids
+        self.fail = fail
+        self.limits = []
+
+    async def generate(self, context, limit, db):
+        self.limits.append(limit)
+        if self.fail:
+            raise RuntimeError("index unavailable")
+        return self.ids[:limit]
+
+def retrieve(generators, quotas):
+    return asyncio.run(CandidateRetriever(generators, quotas).retrieve(None, None))
+
+def test_sources_are_deduplicated_within_their_quotas():
+    candidates, sources = retrieve(
+        [FixedGenerator("ann", [1, 2, 3, 4]), FixedGenerator("trending", [2, 5, 6, 7])],
+        {"ann": 2, "trending": 2},
+    )
+    assert candidates == [1, 2, 5, 6]
+    assert sources == {"ann": 2, "trending": 2}
+
+def test_unused_quota_is_backfilled_from_other_sources():
+    candidates, sources = retrieve(
+        [FixedGenerator("ann", [1, 2, 3, 4]), FixedGenerator("collaborative", [9])],
+        {"ann": 2, "collaborative": 3},
+    )
+    assert candidates == [1, 2, 9, 3, 4]
+    assert sources == {"ann": 4, "collaborative": 1}
+
+def test_failing_and_disabled_generators_contribute_nothing():
+    disabled = FixedGenerator("tags", [7])
+    candidates, sources = retrieve(
+        [FixedGenerator("ann", [1], fail=True), FixedGenerator("trending", [3, 4]), disabled],
+        {"ann": 2, "trending": 2, "tags": 0},
+    )
+    assert candidates == [3, 4]
+    assert sources == {"ann": 0, "trending": 2}
+    assert disabled.limits == []
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from app.services.content_scoring import ages_in_days, category_scores, content_based_scores
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+def _posts(n, seed=7):
+    rng = random.Random(seed)
+    return (
+        [rng.choice(["Memes", "Tech", "Music", "Art"]) for _ in range(n)],
+        [rng.randint(0, 100000) for _ in range(n)],
+        [rng.randint(0, 5000) for _ in range(n)],
+        [rng.uniform(0, 5) for _ in range(n)],
+        [NOW - timedelta(seconds=rng.randint(0, 60 * 86400)) for _ in range(n)],
+    )
+
+def _content_loop(preferred, names, views, upvotes, ratings, created, now):
+    scores = []
+    for name, v, u, r, c in zip(names, views, upvotes, ratings, created):
+        score = 2.0 if name in preferred else 0.0
+        score += np.log(v + 1) / 10 + np.log(u + 1) / 5 + r / 25
+        days_old = (now - c).days
+        score += 1.0 if days_old < 7 else 0.5 if days_old < 30 else 0.0
+        scores.append(score)
+    return scores
+
+def _category_loop(engagement, views, upvotes, ratings, created, now):
+    scores = []
+    for v, u, r, c in zip(views, upvotes, ratings, created):
+        score = np.log(v + 1) / 10 + np.log(u + 1) / 5 + r / 25 + engagement
+        scores.append(score * (1 + max(0, 1 - (now - c).days / 30)))
+    return scores
+
+def test_ages_match_timedelta_days():
+    created = [NOW, NOW - timedelta(hours=23), NOW - timedelta(days=1), NOW - timedelta(days=6, hours=23),
+               NOW + timedelta(hours=1)]
+    assert ages_in_days(created, NOW).tolist() == [(NOW - c).days for c in created]
+
+def test_content_scores_match_per_post_loop():
+    names, views, upvotes, ratings, created = _posts(500)
+    preferred = ["Tech", "Art"]
+    scores = content_based_scores(preferred, names, views, upvotes, ratings, created, NOW)
+    assert isinstance(scores, list)
+    assert scores == pytest.approx(_content_loop(preferred, names, views, upvotes, ratings, created, NOW))
+
+def test_category_scores_match_per_post_loop():
+    _, views, upvotes, ratings, created = _posts(500, seed=11)
+    scores = category_scores(0.4, views, upvotes, ratings, created, NOW)
+    assert scores == pytest.approx(_category_loop(0.4, views, upvotes, ratings, created, NOW))
+
+def test_no_preferences_and_empty_candidates():
+    names, views, upvotes, ratings, created = _posts(20)
+    assert content_based_scores([], names, views, upvotes, ratings, created, NOW) == pytest.approx(
+        _content_loop([], names, views, upvotes, ratings, created, NOW)
+    )
+    assert content_based_scores(["Tech"], [], [], [], [], [], NOW) == []
+    assert category_scores(0.0, [], [], [], [], NOW) == []
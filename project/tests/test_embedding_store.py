@@ -0,0 +1,73 @@
+import os
+import json
+import numpy as np
+import pytest
+
+from app.services.embedding_store import EmbeddingStore
+from app.services.similarity import l2_normalize
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path / "post" / "v1"), dim=4)
+
+def vectors(*rows):
+    return np.array(rows, dtype=np.float32)
+
+def test_get_returns_vectors_and_found_mask(store):
+    store.put([3, 1], vectors([1, 0, 0, 0], [0, 1, 0, 0]))
+    got, found = store.get([1, 2, 3])
+    assert found.tolist() == [True, False, True]
+    assert got.dtype == np.float32
+    assert got.tolist() == [[0, 1, 0, 0], [0, 0, 0, 0], [1, 0, 0, 0]]
+    assert len(store) == 2
+
+def test_put_replaces_and_delete_tombstones(store):
+    store.put([1, 2], vectors([1, 0, 0, 0], [0, 1, 0, 0]))
+    store.put([1, 1], vectors([0, 0, 1, 0], [0, 0, 0, 1]))
+    assert store.get_one(1).tolist() == [0, 0, 0, 1]
+    store.delete([2])
+    assert store.get_one(2) is None
+    ids, matrix = store.matrix()
+    assert ids.tolist() == [1] and matrix.tolist() == [[0, 0, 0, 1]]
+
+def test_other_instances_see_appends_and_tombstones(store):
+    reader = EmbeddingStore(store.path, dim=4)
+    assert reader.get_one(7) is None
+    store.put([7, 8], vectors([1, 0, 0, 0], [0, 0, 1, 0]))
+    assert reader.get_one(7).tolist() == [1, 0, 0, 0]
+    store.delete([8])
+    assert reader.get_one(8) is None
+
+def test_updates_overwrite_rows_in_place(store):
+    reader = EmbeddingStore(store.path, dim=4)
+    store.put([1, 2], vectors([1, 0, 0, 0], [0, 1, 0, 0]))
+    mapping = reader.refresh()
+    meta = os.stat(os.path.join(store.path, "meta.json"))
+    for i in range(5):
+        store.put([2], vectors([0, 0, i + 1, 1]))
+    assert os.stat(os.path.join(store.path, "meta.json")).st_ino == meta.st_ino
+    assert os.path.getsize(os.path.join(store.path, "ids.i64")) == 2 * 8
+    # Same mapping, new vector
+    assert reader.refresh() is mapping
+    assert reader.get_one(2).tolist() == pytest.approx(l2_normalize(np.array([0, 0, 5, 1], dtype=np.float32)).tolist())
+    store.put([2, 3], vectors([0, 1, 0, 0], [0, 0, 1, 0]))
+    assert os.path.getsize(os.path.join(store.path, "ids.i64")) == 3 * 8
+    assert reader.get([1, 2, 3])[0].tolist() == [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0]]
+
+def test_uncommitted_bytes_are_dropped(store):
+    store.put([1], vectors([1, 0, 0, 0]))
+    with open(os.path.join(store.path, "vectors.f32"), "ab") as f:
+        f.write(b"\0" * 10)  # interrupted append
+    store.put([2], vectors([0, 0, 0, 1]))
+    assert store.get_one(2).tolist() == [0, 0, 0, 1]
+    with open(os.path.join(store.path, "meta.json")) as f:
+        assert json.load(f)["rows"] == 2
+
+def test_vectors_are_normalized_on_write(store):
+    store.put([1, 2], vectors([3, 0, 4, 0], [0, 0, 0, 0]))
+    assert store.get_one(1).tolist() == pytest.approx([0.6, 0, 0.8, 0])
+    assert store.get_one(2).tolist() == [0, 0, 0, 0]
+
+def test_dimension_mismatch_is_rejected(store):
+    with pytest.raises(ValueError):
+        EmbeddingStore(store.path, dim=8)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from app.services.embedding_updater import DebouncedUpdater
+
+class Handler:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, keys):
+        if self.fail:
+            raise ConnectionError("database down")
+        self.batches.append(sorted(keys))
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_burst_of_marks_is_one_update():
+    handler = Handler()
+    updater = DebouncedUpdater(handler, window=0.1, batch_size=10)
+    updater.start()
+    try:
+        for _ in range(50):
+            updater.mark(7)
+        updater.mark(8)
+        assert handler.batches == []
+        assert wait_for(lambda: handler.batches)
+    finally:
+        updater.stop()
+    assert handler.batches == [[7, 8]]
+    status = updater.status()
+    assert status["marked"] == 51
+    assert status["coalesced"] == 49
+    assert status["handled"] == 2
+
+def test_keys_are_handled_in_bounded_batches():
+    handler = Handler()
+    updater = DebouncedUpdater(handler, window=0, batch_size=3)
+    for key in range(7):
+        updater.mark(key)
+    assert updater.flush() == 7
+    assert [len(batch) for batch in handler.batches] == [3, 3, 1]
+
+def test_keys_inside_the_window_wait_unless_forced():
+    handler = Handler()
+    updater = DebouncedUpdater(handler, window=60, batch_size=10)
+    updater.mark(1)
+    assert updater.flush() == 0
+    updater.stop()
+    assert handler.batches == [[1]]
+
+def test_coroutine_handlers_are_awaited():
+    seen = []
+
+    async def handler(keys):
+        await asyncio.sleep(0)
+        seen.extend(keys)
+
+    updater = DebouncedUpdater(handler, window=0, batch_size=10)
+    updater.mark(3)
+    updater.flush()
+    assert seen == [3]
+
+def test_failed_batches_are_retried():
+    handler = Handler(fail=True)
+    updater = DebouncedUpdater(handler, window=0, batch_size=10)
+    updater.mark(1)
+    updater.mark(2)
+    assert updater.flush() == 0
+    assert updater.status()["failures"] == 1
+    handler.fail = False
+    assert updater.flush() == 2
+    assert handler.batches == [[1, 2]]
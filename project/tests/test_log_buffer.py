@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.log_buffer import LogBuffer
+
+class Writer:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, rows):
+        if self.fail:
+            raise ConnectionError("database down")
+        self.batches.append(list(rows))
+
+def rows(n):
+    return [{"user_id": i} for i in range(n)]
+
+def test_rows_are_written_in_bulk_batches():
+    writer = Writer()
+    buffer = LogBuffer(writer, max_size=100, flush_size=4, flush_seconds=60)
+    for row in rows(10):
+        assert buffer.add(row)
+    assert [len(batch) for batch in writer.batches] == [4, 4]
+    assert buffer.flush() == 2
+    assert sum(writer.batches, []) == rows(10)
+    assert buffer.status()["written"] == 10
+
+def test_worker_flushes_on_interval_and_stop_drains():
+    writer = Writer()
+    buffer = LogBuffer(writer, max_size=100, flush_size=50, flush_seconds=0.05)
+    buffer.start()
+    buffer.add({"user_id": 1})
+    deadline = time.time() + 2
+    while not writer.batches and time.time() < deadline:
+        time.sleep(0.01)
+    assert writer.batches == [[{"user_id": 1}]]
+    buffer.add({"user_id": 2})
+    buffer.stop()
+    assert sum(writer.batches, []) == rows(3)[1:]
+
+@pytest.mark.parametrize("policy,kept", [("drop_newest", [0, 1]), ("drop_oldest", [2, 3])])
+def test_full_buffer_drops_by_policy(policy, kept):
+    writer = Writer()
+    buffer = LogBuffer(writer, max_size=2, flush_size=2, flush_seconds=60, policy=policy)
+    buffer._worker = threading.current_thread()  # keep rows buffered, as with a busy worker
+    results = [buffer.add(row) for row in rows(4)]
+    assert results == ([True, True, False, False] if policy == "drop_newest" else [True] * 4)
+    assert buffer.status()["dropped"] == 2
+    buffer._worker = None
+    buffer.flush()
+    assert [row["user_id"] for row in sum(writer.batches, [])] == kept
+
+def test_block_policy_applies_backpressure_until_flushed():
+    writer = Writer()
+    buffer = LogBuffer(writer, max_size=2, flush_size=2, flush_seconds=60, policy="block", block_seconds=2)
+    buffer._worker = threading.current_thread()
+    buffer.add({"user_id": 0})
+    buffer.add({"user_id": 1})
+    threading.Timer(0.05, buffer.flush).start()
+    assert buffer.add({"user_id": 2})
+    assert buffer.status()["blocked"] == 1
+    assert buffer.status()["dropped"] == 0
+
+def test_async_add_waits_for_room_off_the_event_loop():
+    writer = Writer()
+    buffer = LogBuffer(writer, max_size=2, flush_size=2, flush_seconds=60, policy="block", block_seconds=2)
+    buffer._worker = threading.current_thread()
+    buffer.add({"user_id": 0})
+    buffer.add({"user_id": 1})
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        threading.Timer(0.2, buffer.flush).start()
+        added = await buffer.add_async({"user_id": 2})
+        task.cancel()
+        return added, ticks
+
+    added, ticks = asyncio.run(main())
+    assert added
+    # The loop kept running while the row waited for room
+    assert ticks >= 5
+    assert buffer.status()["blocked"] == 1
+
+def test_async_add_does_not_leave_the_loop_when_there_is_room():
+    buffer = LogBuffer(Writer(), max_size=10, flush_size=10, flush_seconds=60, policy="block")
+    buffer._worker = threading.current_thread()
+    assert asyncio.run(buffer.add_async({"user_id": 0}))
+    assert buffer.status()["buffered"] == 1
+    assert buffer.status()["blocked"] == 0
+
+def test_failed_writes_are_kept_for_the_next_flush():
+    writer = Writer(fail=True)
+    buffer = LogBuffer(writer, max_size=100, flush_size=10, flush_seconds=60)
+    for row in rows(3):
+        buffer.add(row)
+    assert buffer.flush() == 0
+    assert buffer.status()["failures"] == 1
+    writer.fail = False
+    assert buffer.flush() == 3
+    assert writer.batches == [rows(3)]
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        LogBuffer(Writer(), policy="spill")
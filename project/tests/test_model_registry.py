@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+
+from app.services.model_registry import ModelRegistry
+
+class FakeEngine:
+    built = 0
+
+    def __init__(self):
+        FakeEngine.built += 1
+        self.generation = FakeEngine.built
+
+def test_engine_is_built_once_and_shared(tmp_path):
+    registry = ModelRegistry(factory=FakeEngine, model_path=str(tmp_path), poll_seconds=0)
+    assert not registry.ready
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(registry.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert registry.ready
+    assert len({id(e) for e in engines}) == 1
+
+def test_changed_model_files_swap_the_engine(tmp_path):
+    registry = ModelRegistry(factory=FakeEngine, model_path=str(tmp_path), poll_seconds=0)
+    registry.start()
+    first = registry.get()
+    assert not registry.reload_if_changed()
+    (tmp_path / "deep_recommendation_model.pth").write_bytes(b"weights")
+    assert registry.reload_if_changed()
+    assert registry.get() is not first
+    assert registry.status()["model_files"] == ["deep_recommendation_model.pth"]
+
+def test_failed_reload_keeps_serving_previous_engine(tmp_path):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("corrupt checkpoint")
+        return FakeEngine()
+
+    registry = ModelRegistry(factory=factory, model_path=str(tmp_path), poll_seconds=0)
+    first = registry.get()
+    (tmp_path / "svd_model.pkl").write_bytes(b"x")
+    assert not registry.reload_if_changed()
+    assert registry.get() is first
+
+class RefreshingEngine(FakeEngine):
+    def __init__(self):
+        super().__init__()
+        self.refreshes = 0
+
+    def refresh_data(self):
+        self.refreshes += 1
+
+def test_warm_up_and_schedule_refresh_engine_data(tmp_path):
+    registry = ModelRegistry(factory=RefreshingEngine, model_path=str(tmp_path), poll_seconds=0, data_refresh_seconds=0.05)
+    registry.start()
+    try:
+        engine = registry.get()
+        # Built during warm-up, before the first request
+        assert engine.refreshes >= 1
+        deadline = time.monotonic() + 5
+        while engine.refreshes < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert engine.refreshes >= 3
+        assert registry.get() is engine
+    finally:
+        registry.stop()
+
+def test_failed_data_refresh_keeps_serving(tmp_path):
+    class FailingEngine(FakeEngine):
+        def refresh_data(self):
+            raise RuntimeError("database unavailable")
+
+    registry = ModelRegistry(factory=FailingEngine, model_path=str(tmp_path), poll_seconds=0, data_refresh_seconds=0)
+    engine = registry.get()
+    assert not registry.refresh_data()
+    assert registry.get() is engine
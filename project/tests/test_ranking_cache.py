@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from app.cache import RedisTier
+from app.services.ranking_cache import RankingCache, decode_cursor, encode_cursor
+from tests.test_cache import FakeRedis
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("abc", 40)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("abc", 40)
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor("abc", 0)[:-3], "eyJ0IjoxfQ"])
+def test_foreign_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_rankings_are_found_by_token_and_as_latest():
+    cache = RankingCache(ttl=60)
+    first = cache.put(1, ("p", None), [3, 1, 2], [0.9, 0.5, 0.1], "hybrid")
+    second = cache.put(1, ("p", None), [2, 3], [0.8, 0.2], "hybrid")
+    # A scroll keeps the list it started on
+    assert cache.get(first.token).post_ids == [3, 1, 2]
+    assert cache.latest(1, ("p", None)).token == second.token
+    assert cache.latest(1, (None, None)) is None
+    assert cache.latest(2, ("p", None)) is None
+
+def test_rankings_expire():
+    cache = RankingCache(ttl=0)
+    ranked = cache.put(1, (None, None), [1], [1.0], "hybrid")
+    time.sleep(0.01)
+    assert cache.get(ranked.token) is None
+    assert cache.latest(1, (None, None)) is None
+
+def test_shared_tier_lets_other_workers_continue_a_scroll():
+    redis = FakeRedis()
+    ranked = RankingCache(ttl=60, shared=RedisTier(redis)).put(7, (None, "music"), [5, 4], [0.7, 0.3], "hybrid")
+    other = RankingCache(ttl=60, shared=RedisTier(redis))
+    assert other.get(ranked.token) == ranked
+    assert other.latest(7, (None, "music")).token == ranked.token
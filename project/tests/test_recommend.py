@@ -0,0 +1,350 @@
+import pytest
+import numpy as np
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import recommend, catalog, profiles
+from app.recommend import select_top_k
+from app.database.database import Base
+from app.database import models
+
+# In-memory database shared by every session of the test
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+POSTS = [
+    # title, tags, category, project_code, views, upvotes, bookmarks
+    ("Intro to ML", ["ML", "ai", "tutorial"], {"name": "Tech"}, "LEARN", 500, 40, 10),
+    ("Morning workout", ["fitness", "health"], {"name": "Wellness"}, "WELL", 900, 60, 5),
+    ("Pasta basics", '["cooking", "tutorial"]', "Food", "COOK", 120, 3, 1),
+    ("Advanced Python", "python, programming, ai", {"name": "Tech"}, "LEARN", 300, 30, 20),
+    ("Breathing", ["meditation", "health"], {"name": "Wellness"}, "well", 50, 1, 0),
+    ("Untagged", None, None, None, 0, 0, 0),
+]
+
+INTERACTIONS = [
+    # username, post index, type, value
+    ("alice", 0, "view", None),
+    ("alice", 0, "like", None),
+    ("alice", 3, "bookmark", None),
+    ("alice", 3, "rating", 4.0),
+    ("bob", 1, "like", None),
+    ("bob", 4, "rating", 80.0),
+]
+
+@contextmanager
+def count_queries():
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+def reference_ranking(db, user_id, posts):
+    """Ranking produced by the original per-post ORM scoring path."""
+    profile = recommend.get_user_profile(db, user_id)
+    scored = [(recommend.score_post_for_user(db, user_id, p, profile), p.id) for p in posts]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [(post_id, round(s, 4)) for s, post_id in scored]
+
+def test_select_top_k_breaks_ties_by_id():
+    """select_top_k returns the best scores first and orders ties by id."""
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 2.0, 0.5])
+    ids = np.array([10, 40, 30, 20, 50, 60])
+    assert select_top_k(scores, 3, ids).tolist() == [3, 1, 2]
+    assert select_top_k(scores, 10, ids).tolist() == [3, 1, 2, 4, 0, 5]
+    assert select_top_k(scores, 0, ids).tolist() == []
+
+class TestCatalogFeed:
+    """Catalog-backed feed functions in app.recommend."""
+
+    def setup_method(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        self.users = {}
+        for name in ("alice", "bob"):
+            user = models.User(username=name)
+            self.db.add(user)
+            self.users[name] = user
+        self.posts = []
+        for i, (title, tags, category, pc, views, upvotes, bookmarks) in enumerate(POSTS):
+            post = models.Post(
+                title=title, slug=f"post-{i}", tags=tags, category=category, project_code=pc,
+                view_count=views, upvote_count=upvotes, bookmark_count=bookmarks,
+            )
+            self.db.add(post)
+            self.posts.append(post)
+        self.db.commit()
+        for name, idx, typ, value in INTERACTIONS:
+            self.db.add(models.Interaction(
+                user_id=self.users[name].id, post_id=self.posts[idx].id, type=typ, value=value
+            ))
+        self.db.commit()
+        self._session_local = recommend.SessionLocal
+        recommend.SessionLocal = TestingSessionLocal
+        catalog.reset_catalog()
+
+    def teardown_method(self):
+        recommend.SessionLocal = self._session_local
+        catalog.reset_catalog()
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.mark.parametrize("username", ["alice", "bob"])
+    def test_matches_reference_ranking(self, username):
+        """Catalog scoring ranks posts exactly like score_post_for_user."""
+        user_id = self.users[username].id
+        expected = reference_ranking(self.db, user_id, recommend.fetch_posts(self.db))
+        results = recommend.recommend_for_user(user_id, top_k=len(POSTS))
+        assert [(r["post_id"], r["score"]) for r in results] == expected
+
+    def test_category_filter_matches_reference(self):
+        """Filtered feeds score the same candidates as filter_posts_by_category."""
+        user_id = self.users["alice"].id
+        posts = recommend.filter_posts_by_category(
+            recommend.fetch_posts(self.db), category="tech", tag="AI", project_code="learn"
+        )
+        expected = reference_ranking(self.db, user_id, posts)
+        results = recommend.recommend_for_user_by_category(
+            user_id, top_k=10, category="tech", tag="AI", project_code="learn"
+        )
+        assert [(r["post_id"], r["score"]) for r in results] == expected
+
+    def test_project_code_filter_is_case_insensitive(self):
+        """project_code filters match regardless of stored case."""
+        results = recommend.recommend_for_username_by_category("nobody", top_k=10, project_code="WELL")
+        assert sorted(r["post_id"] for r in results) == [self.posts[1].id, self.posts[4].id]
+
+    def test_cold_start_orders_by_popularity(self):
+        """Unknown users get the most popular posts."""
+        results = recommend.recommend_for_username("nobody", top_k=3)
+        assert [r["post_id"] for r in results] == [self.posts[1].id, self.posts[0].id, self.posts[3].id]
+
+    def test_result_shape(self):
+        """Feed results keep the response fields of the ORM-based implementation."""
+        result = recommend.recommend_for_username("nobody", top_k=1)[0]
+        post = self.posts[1]
+        assert result == {
+            "post_id": post.id,
+            "title": post.title,
+            "slug": post.slug,
+            "score": round(recommend.popularity_score_for_post(post), 4),
+            "tags": ["fitness", "health"],
+            "view_count": post.view_count,
+            "upvote_count": post.upvote_count,
+            "bookmark_count": post.bookmark_count,
+            "average_rating": post.average_rating,
+            "project_code": post.project_code,
+            "video_link": post.video_link,
+            "thumbnail_url": post.thumbnail_url,
+            "category": post.category,
+            "topic": post.topic,
+        }
+
+    def test_new_posts_are_polled(self, monkeypatch):
+        """Posts inserted after the snapshot show up without a full reload."""
+        recommend.recommend_for_username("nobody", top_k=1)
+        snapshot = catalog.get_catalog(self.db)
+        post = models.Post(title="Viral", slug="viral", tags=["ai"], view_count=10**6)
+        self.db.add(post)
+        self.db.commit()
+        monkeypatch.setattr(catalog, "CATALOG_POLL_SECONDS", 0)
+        results = recommend.recommend_for_username("nobody", top_k=1)
+        assert results[0]["post_id"] == post.id
+        assert catalog.get_catalog(self.db).loaded_at == snapshot.loaded_at
+        assert len(snapshot) == len(POSTS)
+
+    def test_upsert_posts_updates_loaded_catalog(self):
+        """upsert_posts refreshes counters and popularity of known posts."""
+        snapshot = catalog.get_catalog(self.db)
+        post = self.posts[5]
+        post.view_count = 10**6
+        self.db.commit()
+        catalog.upsert_posts([post])
+        current = catalog.get_catalog(self.db)
+        pos = current.position(post.id)
+        assert current.popularity[pos] == pytest.approx(recommend.popularity_score_for_post(post))
+        assert snapshot.popularity[pos] == 0.0
+
+    def test_seen_counts_match_per_post_penalty(self):
+        """get_seen_counts yields the same penalties as seen_penalty."""
+        user_id = self.users["alice"].id
+        counts = recommend.get_seen_counts(self.db, user_id)
+        for post in self.posts:
+            assert 0.5 * counts.get(post.id, 0) == recommend.seen_penalty(self.db, user_id, post.id)
+
+    def test_feed_query_count_is_independent_of_catalog_size(self):
+        """Scoring a user issues no per-post queries."""
+        user_id = self.users["alice"].id
+        catalog.get_catalog(self.db)
+        with count_queries() as before:
+            recommend.recommend_for_user(user_id, top_k=3)
+        for i in range(20):
+            self.db.add(models.Post(title=f"extra {i}", slug=f"extra-{i}", tags=["ai"]))
+        self.db.commit()
+        catalog.get_catalog(self.db, force=True)
+        with count_queries() as after:
+            recommend.recommend_for_user(user_id, top_k=3)
+        assert len(after) == len(before)
+
+    @pytest.mark.parametrize("top_k", [1, 2, 3])
+    def test_tag_candidates_keep_full_scan_top_k(self, top_k):
+        """Candidate generation returns the full-scan top_k."""
+        user_id = self.users["alice"].id
+        expected = reference_ranking(self.db, user_id, recommend.fetch_posts(self.db))[:top_k]
+        results = recommend.recommend_for_user(user_id, top_k=top_k)
+        assert [(r["post_id"], r["score"]) for r in results] == expected
+
+    def test_tag_candidates_cover_every_profile_tag(self):
+        """Posts carrying only a light profile tag are still candidates."""
+        for i in range(60):
+            self.db.add(models.Post(title=f"Niche {i}", slug=f"niche-{i}", tags=[f"niche{i}"]))
+        self.db.commit()
+        feed = catalog.get_catalog(self.db, force=True)
+        profile = {f"niche{i}": 3.0 for i in range(59)}
+        profile["niche59"] = 2.5
+        top_k = len(profile)
+        full_scan = recommend.rank_for_user(feed, profile, {}, top_k, np.arange(len(feed)))
+        assert recommend.rank_for_user(feed, profile, {}, top_k) == full_scan
+        assert "niche-59" in [r["slug"] for r in full_scan]
+
+    def test_postings_follow_upserted_tags(self):
+        """The inverted tag index is maintained when posts are upserted."""
+        catalog.get_catalog(self.db)
+        post = self.posts[0]
+        post.tags = ["ai", "robotics"]
+        self.db.commit()
+        catalog.upsert_posts([post])
+        current = catalog.get_catalog(self.db)
+        pos = current.position(post.id)
+        assert pos in current.postings[current.tags.get("robotics")]
+        assert pos not in current.postings[current.tags.get("tutorial")]
+        assert pos in current.tag_candidates([current.tags.get("ai")])
+
+    def test_catalog_reads_synced_post_tags(self):
+        """Once synced, tags come from post_tags rather than Post.tags."""
+        catalog.sync_post_tags(self.db, self.posts)
+        self.db.commit()
+        assert catalog.load_post_tags(self.db)[self.posts[3].id] == {"python", "programming", "ai"}
+        # Raw column edits are ignored until the post is re-synced
+        self.posts[0].tags = ["stale"]
+        self.db.commit()
+        snapshot = catalog.get_catalog(self.db, force=True)
+        assert snapshot.records[snapshot.position(self.posts[0].id)]["tags"] == ["ai", "ml", "tutorial"]
+        catalog.sync_post_tags(self.db, [self.posts[0]])
+        self.db.commit()
+        snapshot = catalog.get_catalog(self.db, force=True)
+        assert snapshot.records[snapshot.position(self.posts[0].id)]["tags"] == ["stale"]
+
+    def test_stored_profile_matches_full_recompute(self):
+        """Incremental profile updates agree with recomputing from history."""
+        alice = self.users["alice"].id
+        profiles.rebuild_user_profiles(self.db)
+        self.db.commit()
+        interaction = models.Interaction(user_id=alice, post_id=self.posts[1].id, type="like")
+        self.db.add(interaction)
+        profiles.apply_interaction(self.db, interaction)
+        self.db.commit()
+        catalog.get_catalog(self.db, force=True)
+        stored = profiles.load_user_profile(self.db, alice)
+        expected = recommend.compute_user_profile(self.db, alice)
+        assert stored.keys() == expected.keys()
+        for tag, weight in expected.items():
+            assert stored[tag] == pytest.approx(weight)
+        assert stored["fitness"] == pytest.approx(profiles.WEIGHTS["like"])
+
+    def test_first_interaction_builds_profile_from_history(self):
+        """Users without a stored profile are rebuilt on their next interaction."""
+        bob = self.users["bob"].id
+        assert profiles.load_user_profile(self.db, bob) is None
+        interaction = models.Interaction(user_id=bob, post_id=self.posts[2].id, type="view")
+        self.db.add(interaction)
+        profiles.apply_interaction(self.db, interaction)
+        self.db.commit()
+        catalog.get_catalog(self.db, force=True)
+        assert profiles.load_user_profile(self.db, bob) == pytest.approx(recommend.compute_user_profile(self.db, bob))
+
+    def test_profile_built_with_other_weights_is_ignored(self, monkeypatch):
+        """Changing WEIGHTS invalidates stored profiles until they are rebuilt."""
+        alice = self.users["alice"].id
+        profiles.rebuild_user_profiles(self.db, [alice])
+        self.db.commit()
+        monkeypatch.setattr(profiles, "WEIGHTS_KEY", "changed")
+        assert profiles.load_user_profile(self.db, alice) is None
+        assert recommend.get_user_profile(self.db, alice) == recommend.compute_user_profile(self.db, alice)
+
+    @pytest.mark.parametrize("filters", [
+        {"category": "Wellness"},
+        {"tag": "health"},
+        {"tag": "TUTORIAL", "category": "food"},
+        {"project_code": "well", "tag": "health"},
+        {"category": "tech", "project_code": "learn", "tag": "missing"},
+    ])
+    def test_bitmap_filters_match_scan(self, filters):
+        """Bitset filtering selects the same posts as filter_posts_by_category."""
+        expected = {p.id for p in recommend.filter_posts_by_category(recommend.fetch_posts(self.db), **filters)}
+        snapshot = catalog.get_catalog(self.db)
+        positions = recommend.filter_catalog_positions(snapshot, **filters)
+        assert set(snapshot.ids[positions].tolist()) == expected
+
+    @pytest.mark.parametrize("filters", [{}, {"tag": "health"}, {"category": "tech"}, {"tag": "missing"}])
+    def test_batch_feed_matches_single_user_feeds(self, filters):
+        """recommend_for_usernames returns what the per-user feed functions return."""
+        profiles.rebuild_user_profiles(self.db, [self.users["alice"].id])
+        self.db.commit()
+        usernames = ["alice", "bob", "newcomer", "alice"]
+        feeds = recommend.recommend_for_usernames(usernames, top_k=3, **filters)
+        for username in usernames:
+            if filters:
+                expected = recommend.recommend_for_username_by_category(username, top_k=3, **filters)
+            else:
+                expected = recommend.recommend_for_username(username, top_k=3)
+            assert feeds[username] == expected
+
+    def test_batch_feed_query_count_is_independent_of_batch_size(self):
+        """User ids, profiles and seen counts are loaded in bulk."""
+        for i in range(20):
+            self.db.add(models.User(username=f"user{i}"))
+        self.db.commit()
+        catalog.get_catalog(self.db)
+        with count_queries() as small:
+            recommend.recommend_for_usernames(["alice", "bob"], top_k=3)
+        with count_queries() as large:
+            recommend.recommend_for_usernames(["alice", "bob"] + [f"user{i}" for i in range(20)], top_k=3)
+        assert len(large) == len(small)
+
+    @pytest.mark.parametrize("popular_tags", [0, 200])
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"category": "Wellness"},
+        {"tag": "health"},
+        {"tag": "tutorial", "category": "food"},
+        {"project_code": "learn", "tag": "ai"},
+        {"category": "missing"},
+    ])
+    def test_precomputed_rankings_match_filtered_sort(self, monkeypatch, filters, popular_tags):
+        """Cold-start slices of the precomputed rankings equal a full filtered sort."""
+        monkeypatch.setattr(catalog, "POPULAR_TAG_RANKINGS", popular_tags)
+        snapshot = catalog.get_catalog(self.db)
+        positions = recommend.filter_catalog_positions(snapshot, **filters)
+        expected = positions[select_top_k(snapshot.popularity[positions], 3, snapshot.ids[positions])]
+        results = recommend.rank_by_popularity(snapshot, 3, recommend.catalog_filters(**filters))
+        assert [r["post_id"] for r in results] == snapshot.ids[expected].tolist()
+
+    def test_upsert_refreshes_rankings(self):
+        """A post that becomes the most viewed leads its category ranking after upsert."""
+        snapshot = catalog.get_catalog(self.db)
+        post = self.posts[4]
+        post.view_count = 10 ** 6
+        self.db.commit()
+        catalog.upsert_posts([post])
+        assert snapshot.popular_positions({"category": "wellness"}, 1).tolist() != [snapshot.position(post.id)]
+        fresh = catalog.get_catalog(self.db)
+        assert fresh.ids[fresh.popular_positions({"category": "wellness"}, 1)].tolist() == [post.id]
+        assert recommend.recommend_popular(top_k=1)[0]["post_id"] == post.id
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.running_mean import decay_factor, decayed_mean_update
+
+T0 = datetime(2024, 1, 1)
+
+def test_first_item_starts_the_mean():
+    mean, weight, updated_at = decayed_mean_update(None, 0.0, None, [1.0, 0.0], 2.0, T0, 14)
+    assert np.allclose(mean, [1.0, 0.0])
+    assert weight == 2.0
+    assert updated_at == T0
+
+def test_weighted_mean_without_decay():
+    state = decayed_mean_update(None, 0.0, None, [1.0, 0.0], 1.0, T0, 0)
+    state = decayed_mean_update(*state, [0.0, 1.0], 3.0, T0 + timedelta(days=30), 0)
+    mean, weight, _ = state
+    assert np.allclose(mean, [0.25, 0.75])
+    assert weight == 4.0
+
+def test_older_items_fade_with_the_half_life():
+    state = decayed_mean_update(None, 0.0, None, [1.0, 0.0], 1.0, T0, 7)
+    mean, weight, updated_at = decayed_mean_update(*state, [0.0, 1.0], 1.0, T0 + timedelta(days=7), 7)
+    # The first item kept half its weight
+    assert np.isclose(weight, 1.5)
+    assert np.allclose(mean, [1 / 3, 2 / 3])
+    assert updated_at == T0 + timedelta(days=7)
+
+def test_out_of_order_items_are_decayed_instead_of_the_state():
+    state = decayed_mean_update(None, 0.0, None, [1.0, 0.0], 1.0, T0 + timedelta(days=7), 7)
+    mean, weight, updated_at = decayed_mean_update(*state, [0.0, 1.0], 1.0, T0, 7)
+    assert np.isclose(weight, 1.5)
+    assert np.allclose(mean, [2 / 3, 1 / 3])
+    assert updated_at == T0 + timedelta(days=7)
+
+def test_matches_the_full_recomputation():
+    rng = np.random.default_rng(0)
+    items = rng.normal(size=(50, 8)).astype(np.float32)
+    weights = rng.uniform(0.5, 3.0, size=50)
+    times = [T0 + timedelta(hours=int(h)) for h in np.sort(rng.integers(0, 24 * 60, size=50))]
+    state = (None, 0.0, None)
+    for item, w, t in zip(items, weights, times):
+        state = decayed_mean_update(*state, item, w, t, 10)
+    mean, weight, updated_at = state
+    decayed = np.array([w * decay_factor((times[-1] - t).total_seconds(), 10) for w, t in zip(weights, times)])
+    assert np.isclose(weight, decayed.sum())
+    assert np.allclose(mean, (decayed[:, None] * items).sum(axis=0) / decayed.sum(), atol=1e-5)
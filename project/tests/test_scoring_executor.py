@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.scoring_executor import ScoringExecutor, ScoringStage
+
+def _double(values):
+    return [v * 2 for v in values]
+
+def test_stages_run_concurrently_and_report_timings():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def stage(value):
+        # Only returns if all three stages are running at once
+        barrier.wait()
+        time.sleep(0.01)
+        return value
+
+    executor = ScoringExecutor(max_workers=3, process_workers=0)
+    try:
+        results, timings = asyncio.run(executor.run([
+            ScoringStage("deep", stage, (1,)),
+            ScoringStage("collaborative", stage, (2,)),
+            ScoringStage("content", stage, (3,)),
+        ]))
+    finally:
+        executor.shutdown()
+    assert results == {"deep": 1, "collaborative": 2, "content": 3}
+    assert set(timings) == set(results)
+    assert all(ms >= 10 for ms in timings.values())
+
+def test_process_safe_stages_use_the_process_pool():
+    executor = ScoringExecutor(max_workers=1, process_workers=1)
+    try:
+        results, _ = asyncio.run(executor.run([ScoringStage("content", _double, ([1, 2],), process_safe=True)]))
+    finally:
+        executor.shutdown()
+    assert results == {"content": [2, 4]}
+
+def test_stage_errors_propagate():
+    def broken():
+        raise RuntimeError("model failed")
+
+    executor = ScoringExecutor(max_workers=2, process_workers=0)
+    try:
+        with pytest.raises(RuntimeError, match="model failed"):
+            asyncio.run(executor.run([ScoringStage("deep", broken), ScoringStage("content", _double, ([1],))]))
+    finally:
+        executor.shutdown()
+
+def test_coroutine_stages_are_rejected():
+    async def async_stage():
+        return []
+
+    executor = ScoringExecutor(max_workers=1, process_workers=0)
+    try:
+        with pytest.raises(TypeError, match="collaborative"):
+            asyncio.run(executor.run([ScoringStage("collaborative", async_stage)]))
+    finally:
+        executor.shutdown()
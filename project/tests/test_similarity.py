@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from app.services.similarity import cosine_similarity, cosine_similarity_matrix, l2_normalize
+
+def reference(query, vectors):
+    """The per-vector loop formerly in RecommendationEngine._calculate_cosine_similarity."""
+    out = []
+    for vec in vectors:
+        n1, n2 = np.linalg.norm(query), np.linalg.norm(vec)
+        out.append(0.0 if n1 == 0 or n2 == 0 else np.dot(query, vec) / (n1 * n2))
+    return np.array(out)
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 32))
+    vectors[7] = 0
+    return rng.standard_normal(32), vectors
+
+def test_l2_normalize_keeps_zero_rows(data):
+    _, vectors = data
+    unit = l2_normalize(vectors)
+    assert unit.dtype == np.float32
+    norms = np.linalg.norm(unit, axis=1)
+    assert norms[7] == 0
+    np.testing.assert_allclose(np.delete(norms, 7), 1, rtol=1e-5)
+
+@pytest.mark.parametrize("block_rows", [None, 1, 64, 1000])
+@pytest.mark.parametrize("normalized", [False, True])
+def test_cosine_similarity_matches_loop(data, block_rows, normalized):
+    query, vectors = data
+    matrix = l2_normalize(vectors) if normalized else vectors
+    got = cosine_similarity(query, matrix, normalized=normalized, block_rows=block_rows)
+    np.testing.assert_allclose(got, reference(query, vectors), atol=1e-5)
+
+def test_cosine_similarity_matrix_matches_rows(data):
+    _, vectors = data
+    queries = vectors[:5]
+    got = cosine_similarity_matrix(queries, vectors, block_rows=128)
+    for i, query in enumerate(queries):
+        np.testing.assert_allclose(got[i], reference(query, vectors), atol=1e-5)
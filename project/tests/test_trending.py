@@ -0,0 +1,88 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database.database import Base
+from app.database.models import TrendingScore
+from app.services.trending import (
+    decode_trending_cursor, encode_trending_cursor, trending_key, trending_page
+)
+
+NOW = datetime(2024, 6, 1)
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+def decayed(engagement, created_at, now, half_life_hours=24):
+    return engagement * 2 ** (-(now - created_at).total_seconds() / (half_life_hours * 3600))
+
+def test_key_order_matches_decayed_score_at_any_time():
+    posts = [(100, NOW - timedelta(hours=h)) for h in (1, 30, 60)] + [(5000, NOW - timedelta(days=6)), (10, NOW)]
+    by_key = sorted(range(len(posts)), key=lambda i: -trending_key(*posts[i], half_life_hours=24))
+    for later in (timedelta(0), timedelta(hours=7), timedelta(days=3)):
+        by_score = sorted(range(len(posts)), key=lambda i: -decayed(math.expm1(math.log1p(posts[i][0])), posts[i][1], NOW + later))
+        assert by_key == by_score
+
+def test_more_engagement_and_newer_posts_rank_higher():
+    assert trending_key(200, NOW) > trending_key(100, NOW)
+    assert trending_key(100, NOW) > trending_key(100, NOW - timedelta(hours=1))
+    # A post one half-life newer needs half the engagement to tie
+    assert trending_key(1000, NOW + timedelta(hours=24), 24) == pytest.approx(trending_key(2000, NOW, 24), abs=0.01)
+
+def add_rows(db):
+    rows = [
+        TrendingScore(post_id=i, category="Tech" if i % 2 else "Food", listed=i != 4,
+                      score=float(i // 2), created_at=NOW - timedelta(days=i))
+        for i in range(1, 10)
+    ]
+    db.add_all(rows)
+    db.commit()
+
+def test_keyset_pages_cover_every_listed_post_once(db):
+    add_rows(db)
+    seen, after = [], None
+    while True:
+        page = trending_page(db, 3, after=after)
+        seen.extend(row.post_id for row in page)
+        if len(page) < 3:
+            break
+        after = decode_trending_cursor(encode_trending_cursor(page[-1]))
+    # Score desc, ties by post id desc; post 4 is unlisted
+    assert seen == [9, 8, 7, 6, 5, 3, 2, 1]
+
+def test_category_and_window_filters(db):
+    add_rows(db)
+    assert [row.post_id for row in trending_page(db, 10, category="Tech")] == [9, 7, 5, 3, 1]
+    assert [row.post_id for row in trending_page(db, 10, since=NOW - timedelta(days=3))] == [3, 2, 1]
+    assert [row.post_id for row in trending_page(db, 2, offset=2)] == [7, 6]
+
+def test_pages_are_index_range_scans(db):
+    add_rows(db)
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        trending_page(db, 3, after=(3.0, 7))
+        trending_page(db, 3, category="Tech", after=(3.0, 7))
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    for statement, parameters in statements:
+        plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)))
+        assert "INDEX ix_trending_scores_" in plan and "score<?" in plan
+        assert "TEMP B-TREE" not in plan
+
+@pytest.mark.parametrize("cursor", ["", "garbage", "eyJzIjoiYSIsInAiOjF9"])
+def test_foreign_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_trending_cursor(cursor)